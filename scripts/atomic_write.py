@@ -0,0 +1,71 @@
+import contextlib
+import errno
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO, Any
+
+
+@contextlib.contextmanager
+def atomic_write(path: Path, mode: str = "w") -> Iterator[IO[Any]]:
+    """
+    Open a file that replaces a path in a single step once the block succeeds.
+
+    The content is written to a temporary file in the same directory and renamed over
+    the path, so concurrent readers see either the old or the new file but never a
+    partially written one. If the block raises, the temporary file is removed and the
+    path is left as it was. A replaced file keeps its permissions, a new file gets the
+    usual ones.
+
+    Args:
+        path (Path): File to write
+        mode (str, optional): Mode to open the temporary file with, 'w' or 'wb'
+
+    Yields:
+        IO: The open temporary file
+    """
+    fd, temp_path = tempfile.mkstemp(prefix=f".{path.name}-", dir=path.parent)
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        try:
+            permissions = path.stat().st_mode
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            permissions = 0o666 & ~umask
+        os.chmod(temp_path, permissions)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+@contextlib.contextmanager
+def atomic_write_tree(path: Path) -> Iterator[Path]:
+    """
+    Fill a staging directory that is renamed to a path once the block succeeds.
+
+    Like atomic_write for directories, such as cache entries: the staging directory is
+    created next to the path, so concurrent readers never see a partially written
+    tree. If another process stored the path first, its tree is kept and the staging
+    directory is discarded, as it is when the block raises.
+
+    Args:
+        path (Path): Directory to write, which must not exist yet
+
+    Yields:
+        Path: The empty staging directory
+    """
+    staging_path = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+    try:
+        yield staging_path
+        try:
+            os.rename(staging_path, path)
+        except OSError as e:
+            if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                raise
+    finally:
+        shutil.rmtree(staging_path, ignore_errors=True)
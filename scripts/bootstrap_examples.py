@@ -1,8 +1,29 @@
+import math
+import shutil
+import sqlite3
 import subprocess
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
-import yaml
+from typing import Any
+
 import fire  # type: ignore[import-untyped]
+import yaml
+from environment_pool import find_projects, restore_environments, store_environments
+from example_sources import get_examples_changed_since
+from stream_output import run_streamed
+from timing_history import DEFAULT_SLOWDOWN_FACTOR, record_command_run
+from timings import format_table, run_measured
+
+BOOTSTRAP_COMMAND = ["algokit", "project", "bootstrap", "all"]
+# Directory with the output of each example's bootstrap when bootstrapping in parallel
+LOGS_DIR = Path("bootstrap_examples_logs")
+# Seconds between refreshes of the live status line
+STATUS_INTERVAL = 1.0
 
 
 def load_examples_config():
@@ -20,25 +41,303 @@ def bootstrap_example(example_path: Path) -> None:
     """
 
     print(f"Bootstrapping example at: {example_path}")
+    restore_pooled_environments(example_path)
+    returncode, usage = run_measured(BOOTSTRAP_COMMAND, cwd=example_path)
+    record_bootstrap(
+        example_path, returncode, usage["wall"], {"max_rss": int(usage["max_rss"])}
+    )
+    if returncode == 0:
+        store_pooled_environments(example_path)
+        print(f"Bootstrap completed successfully for: {example_path}")
+    else:
+        error = subprocess.CalledProcessError(returncode, BOOTSTRAP_COMMAND)
+        print(f"Bootstrap failed for {example_path}: {error}")
+
+
+def record_bootstrap(
+    example_path: Path,
+    returncode: int,
+    wall: float,
+    resources: dict[str, Any],
+    log: Callable[[str], None] = print,
+) -> None:
+    """Record a bootstrap in the timing history and warn if it got slower."""
     try:
-        subprocess.run(
-            ["algokit", "project", "bootstrap", "all"],
-            cwd=example_path,
-            check=True,
+        median = record_command_run(
+            "bootstrap_examples",
+            Path(example_path).name,
+            "bootstrap",
+            wall,
+            returncode,
+            **resources,
         )
-        print(f"Bootstrap completed successfully for: {example_path}")
-    except subprocess.CalledProcessError as e:
-        print(f"Bootstrap failed for {example_path}: {e}")
+    except sqlite3.Error as e:
+        log(f"Couldn't record the bootstrap timing of {example_path}: {e}")
+        return
+    if median is not None:
+        log(
+            f"Bootstrap of {example_path} took {wall:.1f}s, more than "
+            f"{DEFAULT_SLOWDOWN_FACTOR}x its rolling median of {median:.1f}s"
+        )
+
+
+def restore_pooled_environments(
+    example_path: Path, log: Callable[[str], None] = print
+) -> None:
+    """Restore pooled environments into an example, falling back to installing them."""
+    try:
+        restored = restore_environments(example_path)
+    except (OSError, ValueError) as e:
+        log(f"Couldn't restore pooled environments into {example_path}: {e}")
+        return
+    for environment_path in restored:
+        log(f"Restored {environment_path} from the environment pool")
+
+
+def store_pooled_environments(
+    example_path: Path, log: Callable[[str], None] = print
+) -> None:
+    """Add the environments of a bootstrapped example to the pool."""
+    try:
+        stored = store_environments(example_path)
+    except (OSError, ValueError) as e:
+        log(f"Couldn't add the environments of {example_path} to the pool: {e}")
+        return
+    for environment_path in stored:
+        log(f"Added {environment_path} to the environment pool")
+
+
+def get_package_managers(example_path: Path) -> list[str]:
+    """Return the package managers an example downloads its dependencies with."""
+    return sorted({manager for _, manager in find_projects(example_path)})
+
+
+class BootstrapStatus:
+    """Track which examples are bootstrapping and show it on a live status line."""
+
+    def __init__(self, example_ids: list[str]) -> None:
+        self.states = {example_id: "waiting" for example_id in example_ids}
+        self.started: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._live = sys.stdout.isatty()
+
+    def update(self, example_id: str, state: str) -> None:
+        with self._lock:
+            self.states[example_id] = state
+            if state == "installing":
+                self.started[example_id] = time.monotonic()
+            if not self._live:
+                print(f"{example_id}: {state}", flush=True)
+        self.render()
+
+    def print(self, message: str) -> None:
+        """Print a message above the status line."""
+        with self._lock:
+            if self._live:
+                sys.stdout.write("\r\033[K")
+            print(message, flush=True)
+        self.render()
+
+    def render(self) -> None:
+        if not self._live:
+            return
+        with self._lock:
+            now = time.monotonic()
+            installing = [
+                f"{example_id} ({now - self.started[example_id]:.0f}s)"
+                for example_id, state in self.states.items()
+                if state == "installing"
+            ]
+            finished = sum(
+                state in ("done", "failed") for state in self.states.values()
+            )
+            line = (
+                f"[{finished}/{len(self.states)}] installing: "
+                f"{', '.join(installing) or '-'}"
+            )
+            columns = shutil.get_terminal_size().columns
+            sys.stdout.write(f"\r\033[K{line[: columns - 1]}")
+            sys.stdout.flush()
 
+    def close(self) -> None:
+        if self._live:
+            sys.stdout.write("\r\033[K")
+            sys.stdout.flush()
 
-def bootstrap_examples(example_id: Optional[str] = None) -> None:
+
+def bootstrap_examples_in_parallel(
+    example_paths: list[Path], jobs: int, download_jobs: int = 1
+) -> list[dict[str, Any]]:
+    """
+    Bootstrap examples at the same time, each logging to its own file.
+
+    Bootstrapping mostly downloads and installs packages into the npm and poetry caches
+    shared by all examples. So beyond the overall limit of jobs, at most download_jobs
+    examples using the same package manager bootstrap at once. Examples using different
+    package managers, or none, still run side by side. The next example started is the
+    first waiting one whose package managers all have a free slot.
+
+    Args:
+        example_paths (list): Directories of the examples to bootstrap
+        jobs (int): Maximum number of examples to bootstrap at the same time
+        download_jobs (int, optional): Maximum number of examples installing with the
+            same package manager at the same time
+
+    Returns:
+        list: Result of each example with its 'example_id', 'returncode' (None if
+            bootstrapping raised an error), 'wall', 'max_rss' and 'log' path, in the
+            order of example_paths
+    """
+    pending = [(path, get_package_managers(path)) for path in example_paths]
+    busy: dict[str, int] = {}
+    condition = threading.Condition()
+    results: dict[Path, dict[str, Any]] = {}
+    status = BootstrapStatus([path.name for path in example_paths])
+
+    def take_next() -> tuple[Path, list[str]] | None:
+        with condition:
+            while pending:
+                for item in pending:
+                    if all(busy.get(m, 0) < download_jobs for m in item[1]):
+                        pending.remove(item)
+                        for manager in item[1]:
+                            busy[manager] = busy.get(manager, 0) + 1
+                        return item
+                condition.wait()
+            return None
+
+    def worker() -> None:
+        while (item := take_next()) is not None:
+            example_path, managers = item
+            start = time.monotonic()
+            try:
+                results[example_path] = bootstrap_example_logged(example_path, status)
+            except Exception:  # noqa: BLE001
+                # Keep bootstrapping the other examples and report this one as failed
+                results[example_path] = record_bootstrap_error(
+                    example_path, time.monotonic() - start, status
+                )
+            finally:
+                with condition:
+                    for manager in managers:
+                        busy[manager] -= 1
+                    condition.notify_all()
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(worker) for _ in range(min(jobs, len(pending)))]
+        while not all(future.done() for future in futures):
+            status.render()
+            time.sleep(STATUS_INTERVAL)
+        for future in futures:
+            future.result()
+    status.close()
+    return [results[path] for path in example_paths]
+
+
+def bootstrap_example_logged(
+    example_path: Path, status: BootstrapStatus
+) -> dict[str, Any]:
+    """Bootstrap an example with its output streamed to its own log file."""
+    example_id = example_path.name
+    log_path = LOGS_DIR / f"{example_id}.log"
+    log_path.unlink(missing_ok=True)
+    status.update(example_id, "installing")
+    restore_pooled_environments(example_path, status.print)
+    result = run_streamed(BOOTSTRAP_COMMAND, example_path, math.inf, log_path)
+    record_bootstrap(
+        example_path, result.returncode, result.wall, result.resources, status.print
+    )
+    if result.returncode == 0:
+        store_pooled_environments(example_path, status.print)
+    status.update(example_id, "done" if result.returncode == 0 else "failed")
+    if result.returncode != 0:
+        status.print(
+            f"Bootstrap failed for {example_path} with exit code "
+            f"{result.returncode}, see {log_path}:\n{_last_lines(result.stderr)}"
+        )
+    return {
+        "example_id": example_id,
+        "returncode": result.returncode,
+        "wall": result.wall,
+        "max_rss": result.max_rss,
+        "log": str(log_path),
+    }
+
+
+def record_bootstrap_error(
+    example_path: Path, wall: float, status: BootstrapStatus
+) -> dict[str, Any]:
+    """Log the exception being handled to an example's log and return a failed result."""
+    example_id = example_path.name
+    log_path = LOGS_DIR / f"{example_id}.log"
+    error = traceback.format_exc()
+    try:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a") as f:
+            f.write(error)
+    except OSError:
+        pass
+    status.update(example_id, "failed")
+    status.print(
+        f"Bootstrap failed for {example_path} with an error, see {log_path}:\n"
+        f"{_last_lines(error)}"
+    )
+    return {
+        "example_id": example_id,
+        "returncode": None,
+        "wall": wall,
+        "max_rss": 0,
+        "log": str(log_path),
+    }
+
+
+def format_bootstrap_summary(results: list[dict[str, Any]]) -> str:
+    """Format the results of a parallel bootstrap as a table."""
+    header = ["Example", "Status", "Wall (s)", "Peak RSS (MiB)", "Log"]
+    rows = [
+        [
+            result["example_id"],
+            "ok"
+            if result["returncode"] == 0
+            else "failed (error)"
+            if result["returncode"] is None
+            else f"failed ({result['returncode']})",
+            f"{result['wall']:.1f}",
+            f"{result['max_rss'] / 2**20:.0f}",
+            result["log"],
+        ]
+        for result in results
+    ]
+    return format_table(header, rows, left_columns=(0, 1, 4))
+
+
+def _last_lines(text: str, count: int = 10) -> str:
+    return "\n".join(text.rstrip().splitlines()[-count:])
+
+
+def bootstrap_examples(
+    example_id: str | None = None,
+    changed_since: str | None = None,
+    jobs: int = 1,
+    download_jobs: int = 1,
+) -> None:
     """
     Bootstrap existing examples without recreating them.
 
     Args:
         example_id (str, optional): Specific example ID to bootstrap. If None, all examples will be bootstrapped.
+        changed_since (str, optional): Only bootstrap the examples whose template or generator sources changed since this git revision.
+        jobs (int, optional): Number of examples to bootstrap at the same time, each logging to bootstrap_examples_logs/<id>.log. Defaults to 1.
+        download_jobs (int, optional): With jobs, number of examples installing with the same package manager (npm or poetry) at the same time. Defaults to 1.
     """
     config = load_examples_config()
+    if changed_since:
+        affected = get_examples_changed_since(changed_since, config)
+        config["examples"] = [ex for ex in config["examples"] if ex["id"] in affected]
+        print(
+            f"{len(affected)} example(s) affected by changes since {changed_since}: "
+            f"{', '.join(affected) or 'none'}"
+        )
     examples_dir = Path("examples")
 
     if example_id:
@@ -48,6 +347,21 @@ def bootstrap_examples(example_id: Optional[str] = None) -> None:
             bootstrap_example(example_path)
         else:
             print(f"Example directory not found: {example_path}")
+    elif jobs > 1:
+        # Bootstrap all examples in parallel and summarize at the end
+        example_paths = [
+            examples_dir / example["id"]
+            for example in config["examples"]
+            if (examples_dir / example["id"]).is_dir()
+        ]
+        results = bootstrap_examples_in_parallel(example_paths, jobs, download_jobs)
+        print(format_bootstrap_summary(results))
+        failed = [r["example_id"] for r in results if r["returncode"] != 0]
+        if failed:
+            print(
+                f"\nFailed to bootstrap {len(failed)} example(s): {', '.join(failed)}"
+            )
+            sys.exit(1)
     else:
         # Bootstrap all examples
         for example in config["examples"]:
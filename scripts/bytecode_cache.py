@@ -0,0 +1,98 @@
+from functools import cache
+from pathlib import Path
+from types import CodeType
+from typing import Any
+
+from atomic_write import atomic_write
+from fingerprint import get_cache_dir, get_package_version, hash_data
+from jinja2 import Environment
+from jinja2.bccache import Bucket, BytecodeCache
+
+
+class ContentHashBytecodeCache(BytecodeCache):
+    """
+    Jinja bytecode cache keyed by template content and shared between processes.
+
+    Jinja's own FileSystemBytecodeCache keys entries by template file name, so renders of
+    a template from another checkout or a staging copy miss the cache. Here the key is
+    the hash of the template source, its name and the settings of the environment it's
+    compiled for, so identical templates share one entry wherever they live. Entries are
+    written with atomic_write, and are also kept in memory for the other renders of the
+    process.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Args:
+            directory (Path): Directory to store the compiled templates in
+        """
+        self.directory = Path(directory)
+        self._memory: dict[str, CodeType] = {}
+
+    def get_bucket(
+        self,
+        environment: Environment,
+        name: str | None,  # type: ignore[override]
+        filename: str | None,
+        source: str,
+    ) -> Bucket:
+        # The template name is compiled into the code, the file name isn't part of the key
+        key = hash_data([get_environment_key(environment), name, source])
+        bucket = Bucket(environment, key, key)
+        self.load_bytecode(bucket)
+        return bucket
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        if bucket.key in self._memory:
+            bucket.code = self._memory[bucket.key]
+            return
+        try:
+            with open(self.directory / f"{bucket.key}.cache", "rb") as f:
+                bucket.load_bytecode(f)
+        except FileNotFoundError:
+            return
+        if bucket.code is not None:
+            self._memory[bucket.key] = bucket.code
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        if bucket.code is not None:
+            self._memory[bucket.key] = bucket.code
+        with atomic_write(self.directory / f"{bucket.key}.cache", "wb") as f:
+            bucket.write_bytecode(f)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        for entry in self.directory.glob("*.cache"):
+            entry.unlink(missing_ok=True)
+
+
+@cache
+def get_bytecode_cache() -> ContentHashBytecodeCache:
+    """Return the bytecode cache in .cache/jinja-bytecode shared by the renders of a process."""
+    return ContentHashBytecodeCache(get_cache_dir("jinja-bytecode"))
+
+
+def get_environment_key(environment: Environment) -> list[Any]:
+    """Return the environment settings that change the code a template compiles to."""
+    return [
+        get_package_version("jinja2"),
+        type(environment).__name__,
+        sorted(getattr(environment, "intercepted_binops", ())),
+        sorted(getattr(environment, "intercepted_unops", ())),
+        environment.block_start_string,
+        environment.block_end_string,
+        environment.variable_start_string,
+        environment.variable_end_string,
+        environment.comment_start_string,
+        environment.comment_end_string,
+        environment.line_statement_prefix,
+        environment.line_comment_prefix,
+        environment.trim_blocks,
+        environment.lstrip_blocks,
+        environment.newline_sequence,
+        environment.keep_trailing_newline,
+        environment.optimized,
+        environment.is_async,
+        repr(environment.autoescape),
+        sorted(environment.extensions),
+    ]
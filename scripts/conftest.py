@@ -0,0 +1,131 @@
+import os
+import sqlite3
+
+import pytest
+import yaml
+from example_shards import assign_shards, parse_shard
+from example_sources import EXAMPLES_CONFIG_PATH, REPO_ROOT, get_examples_changed_since
+from timing_history import get_example_durations
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--changed-since",
+        action="store",
+        default=None,
+        metavar="REV",
+        help="Only test the examples whose template or generator sources changed since this git revision",
+    )
+    parser.addoption(
+        "--example-jobs",
+        action="store",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="Number of example commands to run at the same time, defaults to the number of CPUs",
+    )
+    parser.addoption(
+        "--download-jobs",
+        action="store",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Number of bootstraps installing with the same package manager (npm or poetry) at the same time",
+    )
+    parser.addoption(
+        "--no-result-cache",
+        action="store_true",
+        default=False,
+        help="Run every example command even if it passed before with the same example content and toolchain",
+    )
+    parser.addoption(
+        "--shard",
+        action="store",
+        default=None,
+        metavar="I/N",
+        help="Only test the examples of shard I out of N, balanced by the durations in the timing history",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    # Every process would run the whole command graph, so don't distribute the tests
+    if getattr(config.option, "numprocesses", None):
+        raise pytest.UsageError(
+            "Example commands are scheduled by test_examples.py, use --example-jobs instead of -n"
+        )
+    shard = config.getoption("--shard")
+    if shard:
+        try:
+            parse_shard(shard)
+        except ValueError as e:
+            raise pytest.UsageError(str(e))
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    """Deselect the example tests outside of --changed-since and --shard."""
+    changed_since = config.getoption("--changed-since")
+    if changed_since:
+        with open(REPO_ROOT / EXAMPLES_CONFIG_PATH, "r") as f:
+            examples_config = yaml.safe_load(f)
+        affected = set(get_examples_changed_since(changed_since, examples_config))
+        _deselect_examples(config, items, affected)
+
+    # Shard what's left, so every shard gets a fair part of the affected examples
+    shard = config.getoption("--shard")
+    if shard:
+        index, count = parse_shard(shard)
+        example_folders = {
+            folder for item in items if (folder := _get_example_folder(item))
+        }
+        try:
+            durations = get_example_durations()
+        except sqlite3.Error:
+            # Without a readable history every example weighs the same
+            durations = {}
+        shards = assign_shards(example_folders, durations, count)
+        _deselect_examples(config, items, set(shards[index]))
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    """Succeed when --changed-since or --shard left no example to test."""
+    config = session.config
+    if exitstatus == pytest.ExitCode.NO_TESTS_COLLECTED and (
+        config.getoption("--changed-since") or config.getoption("--shard")
+    ):
+        print("\nNo examples selected by --changed-since or --shard, nothing to test")
+        session.exitstatus = pytest.ExitCode.OK
+
+
+def pytest_report_teststatus(
+    report: pytest.TestReport, config: pytest.Config
+) -> tuple[str, str, str] | None:
+    """Report example commands served from the result cache as cached passes."""
+    if (
+        report.when == "call"
+        and report.passed
+        and dict(report.user_properties).get("cached_result")
+    ):
+        return "cached", "c", "CACHED PASS"
+    return None
+
+
+def _get_example_folder(item: pytest.Item) -> str | None:
+    callspec = getattr(item, "callspec", None)
+    return callspec.params.get("example_folder") if callspec else None
+
+
+def _deselect_examples(
+    config: pytest.Config, items: list[pytest.Item], example_folders: set[str]
+) -> None:
+    selected, deselected = [], []
+    for item in items:
+        example_folder = _get_example_folder(item)
+        if example_folder is None or example_folder in example_folders:
+            selected.append(item)
+        else:
+            deselected.append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
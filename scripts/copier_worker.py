@@ -0,0 +1,292 @@
+import re
+import shlex
+import subprocess
+import sys
+import traceback
+from collections.abc import Callable, Mapping, MutableMapping, Sequence
+from functools import cache, cached_property
+from pathlib import Path
+from typing import (
+    Any,
+)
+
+import fire  # type: ignore[import-untyped]
+from copier.jinja_ext import YieldEnvironment
+from copier.main import Worker
+from copier.template import Task
+from copier.tools import cast_to_bool
+from fingerprint import get_package_version
+from jinja2 import BytecodeCache, Template
+from merge_dependencies import merge_dependencies
+from merge_engine import merge_batch
+from merge_package_json import merge_package_json
+from merge_pyproject import merge_pyproject
+from plumbum import colors
+from plumbum.machines import local
+from timings import measure, run_measured
+
+SCRIPTS_DIR = Path(__file__).parent.resolve()
+# Copier release whose private Worker._execute_tasks TaskWorker mirrors. Other releases
+# run their own task loop, with the tasks measured as a whole.
+MIRRORED_COPIER_VERSION = "9.5"
+# Repo scripts that _tasks may call and that are run in-process instead of in a new
+# interpreter. They must behave the same when called through fire with the task's args.
+IN_PROCESS_SCRIPTS: dict[str, Callable[..., Any]] = {
+    "merge_dependencies.py": merge_dependencies,
+    "merge_engine.py": merge_batch,
+    "merge_package_json.py": merge_package_json,
+    "merge_pyproject.py": merge_pyproject,
+}
+PYTHON_COMMANDS = {"python", "python3", sys.executable}
+ASSIGNMENT_PATTERN = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)=(.*)$")
+VARIABLE_PATTERN = re.compile(
+    r"\$(?:\{([A-Za-z_][A-Za-z0-9_]*)\}|([A-Za-z_][A-Za-z0-9_]*))"
+)
+# Shell syntax that the in-process runner doesn't interpret
+UNSUPPORTED_SYNTAX = ["'", "`", "$(", "|", "&", ";", "<", ">", "*", "?", "\\"]
+
+
+class CachingYieldEnvironment(YieldEnvironment):
+    """
+    Copier's Jinja environment, loading templates from strings through the bytecode cache.
+
+    Jinja only uses the bytecode cache for templates from a loader, but copier renders
+    most of its strings (paths, questions, defaults and tasks) with from_string, and the
+    same strings come up in many templates.
+    """
+
+    def from_string(
+        self,
+        source: Any,
+        globals: MutableMapping[str, Any] | None = None,
+        template_class: type[Template] | None = None,
+    ) -> Template:
+        if self.bytecode_cache is None or not isinstance(source, str):
+            return super().from_string(source, globals, template_class)
+        bucket = self.bytecode_cache.get_bucket(self, None, None, source)  # type: ignore[arg-type]
+        if bucket.code is None:
+            bucket.code = self.compile(source)
+            self.bytecode_cache.set_bucket(bucket)
+        cls = template_class or self.template_class
+        return cls.from_code(self, bucket.code, self.make_globals(globals), None)
+
+
+class TaskWorker(Worker):
+    """
+    Copier worker that measures each of the template's _tasks.
+
+    The task loop mirrors copier's own Worker._execute_tasks, with the subprocess call
+    factored out into _run_task. Tasks that only call the repo's merge scripts are run
+    in-process instead of starting a shell and a new interpreter for each of them.
+    Templates are compiled through bytecode_cache, if set, so they're only compiled once
+    across workers and runs.
+
+    Both rely on copier internals. With another copier release than
+    MIRRORED_COPIER_VERSION, copier's own loop runs with the tasks measured as a whole,
+    and templates are compiled without the bytecode cache.
+    """
+
+    task_timings: list[dict[str, Any]]
+    bytecode_cache: BytecodeCache | None
+
+    @cached_property
+    def jinja_env(self) -> YieldEnvironment:
+        env = super().jinja_env
+        # Copier builds the environment itself, so only its class can be swapped, and
+        # only when it's the exact class CachingYieldEnvironment extends. Otherwise
+        # templates are compiled without the cache.
+        if (
+            self.bytecode_cache is not None
+            and is_copier_mirrored()
+            and type(env) is YieldEnvironment
+        ):
+            env.__class__ = CachingYieldEnvironment
+            env.bytecode_cache = self.bytecode_cache
+        return env
+
+    def _execute_tasks(self, tasks: Sequence[Task]) -> None:
+        if not is_copier_mirrored():
+            with measure() as usage:
+                super()._execute_tasks(tasks)
+            if tasks:
+                self.task_timings.append(
+                    {"command": f"{len(tasks)} task(s)", "in_process": False, **usage}
+                )
+            return
+        for i, task in enumerate(tasks):
+            extra_context = {f"_{k}": v for k, v in task.extra_vars.items()}
+
+            if not cast_to_bool(self._render_value(task.condition, extra_context)):
+                continue
+
+            task_cmd = task.cmd
+            if isinstance(task_cmd, str):
+                task_cmd = self._render_string(task_cmd, extra_context)
+                use_shell = True
+            else:
+                task_cmd = [
+                    self._render_string(str(part), extra_context) for part in task_cmd
+                ]
+                use_shell = False
+
+            if not self.quiet:
+                print(
+                    colors.info
+                    | f" > Running task {i + 1} of {len(tasks)}: {task_cmd}",
+                    file=sys.stderr,
+                )
+            if self.pretend:
+                continue
+
+            working_directory = (
+                self.subproject.local_abspath
+                / Path(self._render_string(str(task.working_directory), extra_context))
+            ).absolute()
+
+            extra_env = {k.upper(): str(v) for k, v in task.extra_vars.items()}
+            with local.cwd(working_directory), local.env(**extra_env):
+                self._run_task(task_cmd, use_shell)
+
+    def _run_task(self, task_cmd: str | list[str], use_shell: bool) -> None:
+        script = parse_task_script(task_cmd, use_shell, local.env.getdict())
+        if script is not None:
+            with measure() as usage:
+                returncode = run_script_in_process(script)
+            in_process = True
+        else:
+            returncode, usage = run_measured(task_cmd, shell=use_shell, env=local.env)
+            in_process = False
+        self.task_timings.append(
+            {"command": task_cmd, "in_process": in_process, **usage}
+        )
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, task_cmd)
+
+
+@cache
+def is_copier_mirrored() -> bool:
+    """Check whether the installed copier is the release TaskWorker mirrors."""
+    version = get_package_version("copier")
+    return version.split(".")[:2] == MIRRORED_COPIER_VERSION.split(".")
+
+
+def parse_task_script(
+    task_cmd: str | list[str], use_shell: bool, env: Mapping[str, str]
+) -> list[tuple[str, list[str]]] | None:
+    """
+    Parse a task that only calls the repo's merge scripts into in-process calls.
+
+    Shell tasks are understood when every line is empty, a comment, a plain variable
+    assignment, an echo or a python call of one of IN_PROCESS_SCRIPTS, and only use
+    double quotes and $VAR or ${VAR} expansions. Anything else returns None and runs in a
+    shell as before.
+
+    Args:
+        task_cmd (str | list): Rendered task command
+        use_shell (bool): Whether the task runs in a shell
+        env (Mapping): Environment the task would run with
+
+    Returns:
+        list: ('echo' or script file name, args) per line to run, or None
+    """
+    lines = (
+        task_cmd.splitlines() if isinstance(task_cmd, str) else [shlex.join(task_cmd)]
+    )
+    variables = dict(env)
+    script: list[tuple[str, list[str]]] = []
+    calls_script = False
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if use_shell:
+            if any(syntax in line for syntax in UNSUPPORTED_SYNTAX):
+                return None
+            line = VARIABLE_PATTERN.sub(
+                lambda match: variables.get(match.group(1) or match.group(2), ""),
+                line,
+            )
+        try:
+            args = shlex.split(line)
+        except ValueError:
+            return None
+        if not args:
+            continue
+        assignment = ASSIGNMENT_PATTERN.match(args[0]) if len(args) == 1 else None
+        if assignment:
+            variables[assignment.group(1)] = assignment.group(2)
+        elif args[0] == "echo" and not any(arg.startswith("-") for arg in args[1:2]):
+            script.append(("echo", args[1:]))
+        elif (
+            args[0] in PYTHON_COMMANDS
+            and len(args) > 1
+            and Path(args[1]).parent.resolve() == SCRIPTS_DIR
+            and Path(args[1]).name in IN_PROCESS_SCRIPTS
+        ):
+            script.append((Path(args[1]).name, args[2:]))
+            calls_script = True
+        else:
+            return None
+    return script if calls_script else None
+
+
+def run_script_in_process(script: list[tuple[str, list[str]]]) -> int:
+    """
+    Run a task parsed by parse_task_script in the current process.
+
+    Args:
+        script (list): ('echo' or script file name, args) per line to run
+
+    Returns:
+        int: Exit code the task would have had as a subprocess
+    """
+    try:
+        for command, args in script:
+            if command == "echo":
+                print(" ".join(args))
+            else:
+                fire.Fire(IN_PROCESS_SCRIPTS[command], command=args, name=command)
+    except SystemExit as e:
+        # Exit like the interpreter: no code is success and any other object is printed
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception:  # noqa: BLE001
+        # Report the failure like the script's interpreter would have
+        traceback.print_exc()
+        return 1
+    finally:
+        # Keep the output ordered with the output of tasks run as subprocesses
+        sys.stdout.flush()
+    return 0
+
+
+def run_copy_measured(
+    src_path: str,
+    dst_path: str,
+    data: dict[str, Any],
+    bytecode_cache: BytecodeCache | None = None,
+    **kwargs: Any,
+) -> list[dict[str, Any]]:
+    """
+    Copy a template to a destination like copier's run_copy, measuring its _tasks.
+
+    Args:
+        src_path (str): Path to the template source
+        dst_path (str): Path to render the template into
+        data (dict): Answers passed to copier
+        bytecode_cache (BytecodeCache, optional): Cache for the compiled templates
+        **kwargs: Other Worker settings, as accepted by run_copy
+
+    Returns:
+        list: Command, wall time, CPU time and peak RSS of each task that ran
+    """
+    worker = TaskWorker(src_path=src_path, dst_path=Path(dst_path), data=data, **kwargs)
+    worker.task_timings = []
+    worker.bytecode_cache = bytecode_cache
+    with worker:
+        worker.run_copy()
+    return worker.task_timings
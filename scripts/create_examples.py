@@ -1,24 +1,132 @@
+import contextlib
+import copy
+import json
 import os
+import shutil
+import sys
+import tempfile
+import traceback
+from collections.abc import Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any
+
 import fire  # type: ignore[import-untyped]
 import yaml
-from pathlib import Path
-from copier import run_copy
-import json
-from typing import Dict, Optional, Any
-from update_workspace import update_workspace
 from bootstrap_examples import bootstrap_example
+from bytecode_cache import get_bytecode_cache
+from copier_worker import run_copy_measured
+from example_archive import (
+    ARCHIVE_SUFFIX,
+    check_archive_support,
+    export_archive,
+    write_archive,
+)
+from example_sources import (
+    get_affected_examples,
+    get_examples_changed_since,
+    get_source_paths,
+    to_repo_path,
+)
+from fingerprint import (
+    get_cache_dir,
+    get_package_version,
+    hash_data,
+    hash_rendering_scripts,
+    hash_tree,
+    list_files,
+)
+from sync_tree import DEFAULT_PRESERVE_PATTERNS, sync_tree
+from template_cache import (
+    find_copier_config,
+    get_cache_key,
+    get_cached_render,
+    is_cacheable,
+    materialize_tree,
+    store_render,
+)
+from timings import format_summary, measure, write_report
+from update_workspace import Workspace
+from watch_tree import TreeWatcher
 
 BACKEND_TEMPLATES_NAME = "contracts"
 FRONTEND_TEMPLATES_NAME = "frontend"
+REPO_ROOT = Path(__file__).parent.parent
+MANIFEST_FILE_NAME = ".example-manifest.json"
 
 
-def load_examples_config() -> Dict[str, Any]:
+def load_examples_config() -> dict[str, Any]:
     file_path = Path(__file__).parent.parent / "examples" / "examples.yml"
     with open(file_path, "r") as f:
         return yaml.safe_load(f)
 
 
-def get_template_type(path: Path) -> Optional[str]:
+def get_example_fingerprint(
+    example: dict[str, Any], tree_hashes: dict[str, str] | None = None
+) -> dict[str, Any]:
+    """
+    Compute the fingerprint of everything that affects the generated output of an example.
+
+    The fingerprint covers the content of every template and generator source tree the
+    example references, the data passed to them, the RENDERING_SCRIPTS that drive the
+    generation and the installed copier version.
+
+    Args:
+        example (dict): Example configuration from examples.yml
+        tree_hashes (dict, optional): Memo of source path to tree hash shared between
+            examples so each source tree is only hashed once per run
+
+    Returns:
+        dict: Manifest content with the overall fingerprint and its inputs
+    """
+    tree_hashes = {} if tree_hashes is None else tree_hashes
+    for template in example["templates"]:
+        if template["source"] not in tree_hashes:
+            tree_hashes[template["source"]] = hash_tree(REPO_ROOT / template["source"])
+    if "scripts" not in tree_hashes:
+        tree_hashes["scripts"] = hash_rendering_scripts()
+
+    inputs = {
+        "project_name": example["project_name"],
+        "templates": [
+            {
+                "source": template["source"],
+                "tree_hash": tree_hashes[template["source"]],
+                "data": template.get("data", {}),
+            }
+            for template in example["templates"]
+        ],
+        "scripts_hash": tree_hashes["scripts"],
+        "copier_version": get_package_version("copier"),
+    }
+    return {"fingerprint": hash_data(inputs), **inputs}
+
+
+def read_example_manifest(example_path: Path) -> dict[str, Any] | None:
+    """Read the manifest of a previously generated example, if there is one."""
+    manifest_file = example_path / MANIFEST_FILE_NAME
+    if not manifest_file.exists():
+        return None
+    try:
+        return json.loads(manifest_file.read_text())
+    except json.JSONDecodeError:
+        return None
+
+
+def write_example_manifest(example_path: Path, manifest: dict[str, Any]) -> None:
+    """Write the manifest of a generated example."""
+    manifest_file = example_path / MANIFEST_FILE_NAME
+    manifest_file.write_text(json.dumps(manifest, indent=2) + "\n")
+
+
+def get_template_type(path: Path) -> str | None:
     template_type = "example"
     path_str = str(path)
     if path_str.startswith("templates/base/workspace"):
@@ -30,70 +138,58 @@ def get_template_type(path: Path) -> Optional[str]:
     return template_type
 
 
-def read_workspace_config(workspace_file: Path | None) -> Dict[str, Any]:
+def get_template_answer(template: dict[str, Any], key: str) -> Any:
     """
-    Read the workspace file and extract configuration values.
+    Resolve the answer a template will receive for a question.
 
     Args:
-        workspace_file (Path): Path to the workspace file
+        template (dict): Template configuration from examples.yml
+        key (str): Name of the copier question
 
     Returns:
-        dict: Dictionary containing workspace configuration values including:
-            - projects_root_path: Base path for projects
-            - projects: Dictionary mapping project names to their paths
+        Any: The value from the template data, or the question's default in the copier config
     """
-    config: Dict[str, Any] = {"projects_root_path": None, "projects": {}}
-
-    if workspace_file and workspace_file.exists():
-        with open(workspace_file, "r") as f:
-            workspace_data = json.loads(f.read())
-            files_exclude = workspace_data.get("settings", {}).get("files.exclude", {})
-            # Get the first key that ends with '/'
-            projects_root_path = next(
-                (path for path in files_exclude.keys() if path.endswith("/")), None
-            )
-            if projects_root_path:
-                config["projects_root_path"] = projects_root_path.rstrip("/")
-
-            # Extract project folders from workspace folders
-            if "folders" in workspace_data:
-                for folder in workspace_data["folders"]:
-                    if "path" in folder:
-                        if folder["path"].endswith(BACKEND_TEMPLATES_NAME):
-                            config["projects"][BACKEND_TEMPLATES_NAME] = folder["path"]
-                        elif folder["path"].endswith(FRONTEND_TEMPLATES_NAME):
-                            config["projects"][FRONTEND_TEMPLATES_NAME] = folder["path"]
-                        else:
-                            config["projects"]["root"] = folder["path"]
-
-    return config
+    data = template.get("data", {})
+    if key in data:
+        return data[key]
+    config_file = find_copier_config(Path(template["source"]))
+    if not config_file:
+        return None
+    question = yaml.safe_load(config_file.read_text()).get(key)
+    return question.get("default") if isinstance(question, dict) else None
 
 
-def has_workspace(base_path: Path) -> tuple[bool, Optional[Path]]:
+def plan_workspace(
+    template: dict[str, Any], base_destination_path: Path
+) -> Workspace | None:
     """
-    Check if a workspace file exists in the given path and return it.
+    Model the workspace file a workspace setup template will create.
 
     Args:
-        base_path (Path): Path to search for workspace files
+        template (dict): The workspace setup template, with its project_name answer set
+        base_destination_path (Path): Directory the example will be rendered into
 
     Returns:
-        tuple: (is_workspace, workspace_file) where:
-            - is_workspace (bool): True if a workspace file exists
-            - workspace_file (Optional[Path]): Path to the workspace file if found, None otherwise
+        Workspace: Model of the workspace file, or None if the template won't create one
     """
-    workspace_file = next(base_path.glob("*.code-workspace"), None)
-    is_workspace = bool(workspace_file)
-    return is_workspace, workspace_file
+    if not get_template_answer(template, "include_vscode_code_workspace"):
+        return None
+    project_name = get_template_answer(template, "project_name")
+    return Workspace(
+        base_destination_path / f"{project_name}.code-workspace",
+        get_template_answer(template, "projects_root_path") or "projects",
+    )
 
 
 def update_base_template_data(
-    template: Dict[str, Any],
+    template: dict[str, Any],
     base_destination_path: Path,
     project_name: str,
     project_type: str,
-) -> Dict[str, Any]:
+    workspace: Workspace | None,
+) -> dict[str, Any]:
     template["destination"] = base_destination_path
-    use_workspace, workspace_file = has_workspace(base_destination_path)
+    use_workspace = workspace is not None
 
     # Manually add data to template data for the copier answers
     template_data = template.get("data", {})
@@ -102,38 +198,36 @@ def update_base_template_data(
         template_data["project_name"] = project_name
     template["data"] = template_data
 
-    if use_workspace and project_type in [
+    if workspace and project_type in [
         BACKEND_TEMPLATES_NAME,
         FRONTEND_TEMPLATES_NAME,
     ]:
-        workspace_config = read_workspace_config(workspace_file)
-        projects_root_path = workspace_config["projects_root_path"]
+        projects_root_path = workspace.projects_root_path
         project_dir_name = f"{project_name}-{project_type}"
         template["destination"] = (
             base_destination_path / projects_root_path / project_dir_name
         )
         projects_path = os.path.join(projects_root_path, project_dir_name)
-        # Update workspace file with the new project folder
-        update_workspace(str(workspace_file), str(projects_path))
+        # The folder is written to the workspace file once the templates have been applied
+        workspace.add_project(project_type, projects_path)
 
     return template
 
 
 def update_example_template_data(
-    template: Dict[str, Any],
+    template: dict[str, Any],
     base_destination_path: Path,
     project_name: str,
     project_type: str,
-) -> list[Dict[str, Any]]:
+    workspace: Workspace | None,
+) -> list[dict[str, Any]]:
     template["destination"] = base_destination_path
-    use_workspace, workspace_file = has_workspace(base_destination_path)
 
-    if use_workspace and project_type in [
+    if workspace and project_type in [
         BACKEND_TEMPLATES_NAME,
         FRONTEND_TEMPLATES_NAME,
     ]:
-        workspace_config = read_workspace_config(workspace_file)
-        projects_root_path = workspace_config["projects_root_path"]
+        projects_root_path = workspace.projects_root_path
         project_dir_name = f"{project_name}-{project_type}"
         template["destination"] = (
             base_destination_path / projects_root_path / project_dir_name
@@ -141,15 +235,17 @@ def update_example_template_data(
         return [template]
     elif project_type == "fullstack":
         # For fullstack examples, deploy to both contracts and frontend destinations
-        use_workspace, workspace_file = has_workspace(base_destination_path)
-        workspace_config = (
-            read_workspace_config(workspace_file) if use_workspace else {}
-        )
         framework_choice = template.get("data", {}).get("framework_choice", "python")
 
         templates = []
-        if BACKEND_TEMPLATES_NAME in workspace_config["projects"]:
-            contracts_template = template.copy()
+        contracts_path = (
+            workspace.get_project_path(BACKEND_TEMPLATES_NAME) if workspace else None
+        )
+        frontend_path = (
+            workspace.get_project_path(FRONTEND_TEMPLATES_NAME) if workspace else None
+        )
+        if contracts_path is not None:
+            contracts_template = copy.deepcopy(template)
             contracts_folder_path = (
                 Path(contracts_template["source"])
                 / f"{framework_choice}_template_content"
@@ -166,13 +262,12 @@ def update_example_template_data(
                     relative_contracts_folder_path
                 )
                 contracts_template["destination"] = (
-                    base_destination_path
-                    / workspace_config["projects"][BACKEND_TEMPLATES_NAME]
+                    base_destination_path / contracts_path
                 )
                 templates.append(contracts_template)
 
-        if FRONTEND_TEMPLATES_NAME in workspace_config["projects"]:
-            frontend_template = template.copy()
+        if frontend_path is not None:
+            frontend_template = copy.deepcopy(template)
             frontend_folder_path = (
                 Path(frontend_template["source"])
                 / f"{framework_choice}_template_content"
@@ -188,10 +283,7 @@ def update_example_template_data(
                 frontend_template["data"]["subdirectory"] = str(
                     relative_frontend_folder_path
                 )
-                frontend_template["destination"] = (
-                    base_destination_path
-                    / workspace_config["projects"][FRONTEND_TEMPLATES_NAME]
-                )
+                frontend_template["destination"] = base_destination_path / frontend_path
                 templates.append(frontend_template)
 
         return templates
@@ -200,9 +292,10 @@ def update_example_template_data(
 
 
 def update_generator_env_file_template_data(
-    template: Dict[str, Any],
+    template: dict[str, Any],
     base_destination_path: Path,
-) -> list[Dict[str, Any]]:
+    workspace: Workspace | None,
+) -> list[dict[str, Any]]:
     template_data = template.get("data", {})
     # Get project type from template data
     project_type = template_data.get("project", "all")
@@ -216,28 +309,49 @@ def update_generator_env_file_template_data(
     project_type = project_type.lower()
     # Find the destination path for the all project types
     # TODO: Consider the case where the workspace is not used
-    use_workspace, workspace_file = has_workspace(base_destination_path)
-    workspace_config = read_workspace_config(workspace_file) if use_workspace else {}
+    project_paths = []
     if project_type == "all":
-        project_paths = []
-        if BACKEND_TEMPLATES_NAME in workspace_config["projects"]:
-            project_paths.append(workspace_config["projects"][BACKEND_TEMPLATES_NAME])
-        if FRONTEND_TEMPLATES_NAME in workspace_config["projects"]:
-            project_paths.append(workspace_config["projects"][FRONTEND_TEMPLATES_NAME])
+        for workspace_project_type in [BACKEND_TEMPLATES_NAME, FRONTEND_TEMPLATES_NAME]:
+            project_path = (
+                workspace.get_project_path(workspace_project_type)
+                if workspace
+                else None
+            )
+            if project_path is not None:
+                project_paths.append(project_path)
     else:
-        project_paths = [
-            workspace_config["projects"][project_type],
-        ]
+        project_path = workspace.get_project_path(project_type) if workspace else None
+        if project_path is None:
+            raise ValueError(f"The workspace has no {project_type} project")
+        project_paths.append(project_path)
     updated_templates = []
     for project_path in project_paths:
-        updated_template = template.copy()
+        updated_template = copy.deepcopy(template)
         updated_template["destination"] = base_destination_path / project_path
         updated_templates.append(updated_template)
 
     return updated_templates
 
 
-def run_copier_on_template(template: Dict[str, Any]) -> None:
+def run_copier_on_template(
+    template: dict[str, Any], use_cache: bool = True
+) -> dict[str, Any]:
+    """
+    Render a template into its destination with copier.
+
+    Renders of templates into an empty destination are stored in a local content
+    addressed cache, keyed by the template tree hash and answers, and later renders with
+    the same key are cloned from the cache instead of running copier again. When copier
+    does run, compiled Jinja templates are reused from .cache/jinja-bytecode.
+
+    Args:
+        template (dict): Template configuration with its resolved destination
+        use_cache (bool, optional): Whether to use the rendered template and bytecode caches
+
+    Returns:
+        dict: Timing record of the template application with its wall time, CPU time,
+            peak RSS and the same measurements for each of its _tasks
+    """
     if "source" not in template:
         raise ValueError("Template source is required")
     if "destination" not in template:
@@ -246,8 +360,6 @@ def run_copier_on_template(template: Dict[str, Any]) -> None:
         raise ValueError("The repo_root, path to the root of the repo, is required.")
     source = Path(template["source"])
     template_destination = Path(template["destination"])
-    # Create the parent directory if it doesn't exist
-    template_destination.mkdir(parents=True, exist_ok=True)
     repo_root = template["repo_root"]
     base_destination_path = template["base_destination_path"]
     template_data = {
@@ -255,39 +367,96 @@ def run_copier_on_template(template: Dict[str, Any]) -> None:
         "_repo_root": repo_root,
         "_base_destination_path": base_destination_path,
     }
-    print(
-        f"Running copier on template: {template['source']} with copier file: {source / 'copier.yml'}  "
-    )
-    run_copy(
-        src_path=str(source.absolute()),
-        dst_path=str(template_destination.absolute()),
-        data=template_data,
-        unsafe=True,
-        quiet=False,
-        overwrite=True,
-        defaults=True,
-    )
+    record: dict[str, Any] = {
+        "source": template["source"],
+        "destination": str(template_destination),
+        "cached": False,
+        "tasks": [],
+    }
+    with measure() as usage:
+        cache_key = None
+        cached_render = None
+        if use_cache and is_cacheable(source, template_destination):
+            cache_key = get_cache_key(source, template_destination, template_data)
+            cached_render = get_cached_render(cache_key)
+        if cached_render:
+            print(f"Using cached render of template: {template['source']}")
+            materialize_tree(cached_render, template_destination)
+            record["cached"] = True
+        else:
+            # Create the parent directory if it doesn't exist
+            template_destination.mkdir(parents=True, exist_ok=True)
+            print(
+                f"Running copier on template: {template['source']} with copier file: {source / 'copier.yml'}  "
+            )
+            record["tasks"] = run_copy_measured(
+                src_path=str(source.absolute()),
+                dst_path=str(template_destination.absolute()),
+                data=template_data,
+                bytecode_cache=get_bytecode_cache() if use_cache else None,
+                unsafe=True,
+                quiet=False,
+                overwrite=True,
+                defaults=True,
+            )
+            if cache_key:
+                store_render(cache_key, template_destination)
+    record.update(usage)
+    return record
 
 
-def create_example(example: Dict[str, Any], bootstrap: bool = False) -> None:
-    project_name = example["project_name"].lower().replace(" ", "-")
-    # Create destination path based on example id
-    base_destination_path = Path("examples") / example["id"]
+@dataclass
+class CreateOptions:
+    """Options that control how examples are created."""
 
-    # Remove destination if it exists
-    if base_destination_path.exists():
-        import shutil
+    # Run 'algokit project bootstrap all' after creating each example
+    bootstrap: bool = False
+    # Regenerate examples even if their manifest shows they are up to date
+    force: bool = False
+    # Reuse cached renders of templates from .cache/rendered-templates
+    use_cache: bool = True
+    # Render into a staging directory and apply only the diff to existing examples
+    sync: bool = False
+    # Number of templates with disjoint destinations to apply at the same time
+    template_jobs: int = 1
+    # Patterns of paths that sync never deletes from an existing example
+    preserve: list[str] = field(default_factory=lambda: list(DEFAULT_PRESERVE_PATTERNS))
+    # Directory to write a reproducible <id>.tar.zst archive of each rendered example to
+    archive_dir: Path | None = None
 
-        shutil.rmtree(base_destination_path)
 
-    # Apply each template in sequence
+def plan_example(
+    example: dict[str, Any], base_destination_path: Path
+) -> dict[str, Any]:
+    """
+    Resolve every copier invocation of an example without running any of them.
+
+    Each step of the plan is a template with its resolved destination and data, plus the
+    ids of the earlier steps it depends on. Two steps depend on each other when one's
+    destination contains the other's, or when both write into the example root from
+    different templates (the README copy tasks of the example templates).
+
+    Args:
+        example (dict): Example configuration from examples.yml
+        base_destination_path (Path): Directory the example will be rendered into
+
+    Returns:
+        dict: Plan with the example id, its base destination, the ordered steps and the
+            model of the example's workspace file, which is flushed once the steps ran
+    """
+    project_name = example["project_name"].lower().replace(" ", "-")
+    # Templates are updated with their resolved destinations, keep the config intact
+    example = copy.deepcopy(example)
+    workspace: Workspace | None = None
+    steps: list[dict[str, Any]] = []
+
     for template in example["templates"]:
         if "source" not in template:
             raise ValueError(
                 f"Template source is required in for project {project_name}"
             )
         # Repo root is made available to the templates as a metadata field
-        template["repo_root"] = str(Path(__file__).parent.parent)
+        template["repo_root"] = str(REPO_ROOT)
         template["base_destination_path"] = str(base_destination_path.absolute())
         source = Path(template["source"])
         source_parts = list(source.parts)
@@ -297,17 +466,26 @@ def create_example(example: Dict[str, Any], bootstrap: bool = False) -> None:
             template_type = source_parts.pop(0)
             if template_type == "base":
                 project_type = source_parts.pop(0)
-                processed_template = update_base_template_data(
-                    template, base_destination_path, project_name, project_type
-                )
-                run_copier_on_template(processed_template)
+                templates = [
+                    update_base_template_data(
+                        template,
+                        base_destination_path,
+                        project_name,
+                        project_type,
+                        workspace,
+                    )
+                ]
+                if get_template_type(source) == "workspace":
+                    workspace = plan_workspace(template, base_destination_path)
             elif template_type == "examples":
                 project_type = source_parts.pop(0)
-                processed_templates = update_example_template_data(
-                    template, base_destination_path, project_name, project_type
+                templates = update_example_template_data(
+                    template,
+                    base_destination_path,
+                    project_name,
+                    project_type,
+                    workspace,
                 )
-                for processed_template in processed_templates:
-                    run_copier_on_template(processed_template)
             else:
                 raise ValueError(f"Invalid template type: {template_type}")
 
@@ -317,39 +495,508 @@ def create_example(example: Dict[str, Any], bootstrap: bool = False) -> None:
             if generator_type == "create-devcontainer":
                 templates = [template]
 
-            elif generator_type == "create-smart-contract":
-                templates = update_generator_env_file_template_data(
-                    template, base_destination_path
-                )
-
-            elif generator_type == "create-env-file":
+            elif (
+                generator_type == "create-smart-contract"
+                or generator_type == "create-env-file"
+            ):
                 templates = update_generator_env_file_template_data(
-                    template, base_destination_path
+                    template, base_destination_path, workspace
                 )
 
             else:
                 raise ValueError(f"Invalid generator type: {generator_type}")
-
-            for template in templates:
-                run_copier_on_template(template)
         else:
             raise ValueError(f"Invalid generator type: {generator_type}")
 
+        for step in templates:
+            config_file = find_copier_config(source)
+            step["id"] = len(steps)
+            step["writes_example_root"] = bool(
+                config_file and "_base_destination_path" in config_file.read_text()
+            )
+            step["depends_on"] = [
+                other["id"] for other in steps if steps_conflict(step, other)
+            ]
+            steps.append(step)
+
+    return {
+        "example_id": example["id"],
+        "base_destination_path": base_destination_path,
+        "steps": steps,
+        "workspace": workspace,
+    }
+
+
+def steps_conflict(step: dict[str, Any], other: dict[str, Any]) -> bool:
+    """Check whether two plan steps may write to the same files."""
+    destination = Path(step["destination"])
+    other_destination = Path(other["destination"])
+    if (
+        destination == other_destination
+        or destination in other_destination.parents
+        or other_destination in destination.parents
+    ):
+        return True
+    # Templates copying the same files into the example root can run in any order
+    return (
+        step["writes_example_root"]
+        and other["writes_example_root"]
+        and step["source"] != other["source"]
+    )
+
+
+def format_plan(plan: dict[str, Any]) -> dict[str, Any]:
+    """Return a JSON serializable view of a plan."""
+    return {
+        "example_id": plan["example_id"],
+        "base_destination_path": str(plan["base_destination_path"]),
+        "steps": [
+            {
+                "id": step["id"],
+                "source": step["source"],
+                "destination": str(step["destination"]),
+                "data": step.get("data", {}),
+                "writes_example_root": step["writes_example_root"],
+                "depends_on": step["depends_on"],
+            }
+            for step in plan["steps"]
+        ],
+        "workspace": {
+            "file": str(plan["workspace"].path),
+            "folders": plan["workspace"].folders,
+        }
+        if plan["workspace"]
+        else None,
+    }
+
+
+def execute_plan(
+    plan: dict[str, Any], use_cache: bool = True, template_jobs: int = 1
+) -> list[dict[str, Any]]:
+    """
+    Run the steps of a plan, concurrently where their destinations are disjoint.
+
+    Steps run in worker processes rather than threads because copier changes the working
+    directory of the process while it runs _tasks.
+
+    Args:
+        plan (dict): Plan built by plan_example
+        use_cache (bool, optional): Whether to use the rendered template cache
+        template_jobs (int, optional): Maximum number of steps to run at the same time
+
+    Returns:
+        list: Timing records of the steps, in the order of the plan
+    """
+    steps = plan["steps"]
+    records: dict[int, dict[str, Any]] = {}
+    if template_jobs <= 1:
+        for step in steps:
+            records[step["id"]] = run_copier_on_template(step, use_cache)
+    else:
+        completed: set[int] = set()
+        pending = list(steps)
+        running: dict[Future[dict[str, Any]], int] = {}
+        with ProcessPoolExecutor(max_workers=template_jobs) as executor:
+            while pending or running:
+                ready = [
+                    step for step in pending if set(step["depends_on"]) <= completed
+                ]
+                for step in ready:
+                    pending.remove(step)
+                    future = executor.submit(run_copier_on_template, step, use_cache)
+                    running[future] = step["id"]
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step_id = running.pop(future)
+                    records[step_id] = future.result()
+                    completed.add(step_id)
+
+    # Write the project folders added by the templates to the workspace file in one go
+    if plan["workspace"] and plan["workspace"].folders:
+        plan["workspace"].flush()
+
+    return [records[step["id"]] for step in steps]
+
+
+def render_example(
+    example: dict[str, Any],
+    base_destination_path: Path,
+    use_cache: bool = True,
+    template_jobs: int = 1,
+) -> list[dict[str, Any]]:
+    """
+    Plan and apply the templates of an example into a destination directory.
+
+    Args:
+        example (dict): Example configuration from examples.yml
+        base_destination_path (Path): Directory to render the example into
+        use_cache (bool, optional): Whether to use the rendered template cache
+        template_jobs (int, optional): Maximum number of templates to apply at the same time
+
+    Returns:
+        list: Timing records of the template applications
+    """
+    plan = plan_example(example, base_destination_path)
+    return execute_plan(plan, use_cache, template_jobs)
+
+
+def create_example(
+    example: dict[str, Any],
+    options: CreateOptions | None = None,
+    tree_hashes: dict[str, str] | None = None,
+    timings: list[dict[str, Any]] | None = None,
+) -> bool:
+    """
+    Create an example from its templates, unless it is already up to date.
+
+    Args:
+        example (dict): Example configuration from examples.yml
+        options (CreateOptions, optional): Options that control how the example is created
+        tree_hashes (dict, optional): Memo of source path to tree hash shared between examples
+        timings (list, optional): List the timing records of the example's template
+            applications are appended to
+
+    Returns:
+        bool: True if the example was regenerated, False if it was skipped
+    """
+    options = options or CreateOptions()
+    # Create destination path based on example id
+    base_destination_path = Path("examples") / example["id"]
+
+    # Skip the example if nothing that affects its output changed since it was generated
+    manifest = get_example_fingerprint(example, tree_hashes)
+    existing_manifest = read_example_manifest(base_destination_path)
+    # Archives are cached by fingerprint
+    archive_path = None
+    if options.archive_dir:
+        archive_path = (
+            get_cache_dir("example-archives")
+            / f"{manifest['fingerprint']}{ARCHIVE_SUFFIX}"
+        )
+    if (
+        not options.force
+        and existing_manifest
+        and existing_manifest.get("fingerprint") == manifest["fingerprint"]
+    ):
+        print(f"Example is up to date, skipping: {example['id']}")
+        if archive_path is not None and options.archive_dir:
+            if not (options.use_cache and archive_path.exists()):
+                # Archive a fresh render from a staging directory and leave the example,
+                # with its installed dependencies and build artifacts, untouched
+                with tempfile.TemporaryDirectory(
+                    dir=get_cache_dir("staging")
+                ) as staging_dir:
+                    staging_path = Path(staging_dir) / example["id"]
+                    records = render_example(
+                        example, staging_path, options.use_cache, options.template_jobs
+                    )
+                    write_archive(staging_path, archive_path, example["id"])
+                if timings is not None:
+                    timings.extend(records)
+            export_archive(archive_path, options.archive_dir, example["id"])
+        if options.bootstrap:
+            bootstrap_example(base_destination_path)
+        return False
+
+    if options.sync and base_destination_path.exists():
+        # Render into a staging directory named like the example, then only apply the diff
+        # so installed toolchains and build artifacts in the example survive
+        with tempfile.TemporaryDirectory(dir=get_cache_dir("staging")) as staging_dir:
+            staging_path = Path(staging_dir) / example["id"]
+            records = render_example(
+                example, staging_path, options.use_cache, options.template_jobs
+            )
+            if archive_path is not None:
+                write_archive(staging_path, archive_path, example["id"])
+            manifest["files"] = list_files(staging_path)
+            stats = sync_tree(
+                staging_path,
+                base_destination_path,
+                [*options.preserve, MANIFEST_FILE_NAME],
+            )
+        print(
+            f"Synced {example['id']}: {stats['added']} added, {stats['updated']} updated, "
+            f"{stats['deleted']} deleted, {stats['unchanged']} unchanged"
+        )
+    else:
+        # Remove destination if it exists
+        if base_destination_path.exists():
+            shutil.rmtree(base_destination_path)
+        records = render_example(
+            example, base_destination_path, options.use_cache, options.template_jobs
+        )
+        if archive_path is not None:
+            write_archive(base_destination_path, archive_path, example["id"])
+        manifest["files"] = list_files(base_destination_path)
+    if archive_path is not None and options.archive_dir:
+        export_archive(archive_path, options.archive_dir, example["id"])
+    if timings is not None:
+        timings.extend(records)
+
+    # Only record the manifest once every template has been applied successfully
+    write_example_manifest(base_destination_path, manifest)
+
     # Run bootstrap if flag is set
-    if bootstrap:
+    if options.bootstrap:
         bootstrap_example(base_destination_path)
 
+    return True
+
 
-def main(example_id: Optional[str] = None, bootstrap: bool = False) -> None:
+def create_example_measured(
+    example: dict[str, Any],
+    options: CreateOptions,
+    tree_hashes: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """
+    Create an example and measure it and each of its template applications.
+
+    Args:
+        example (dict): Example configuration from examples.yml
+        options (CreateOptions): Options that control how the example is created
+        tree_hashes (dict, optional): Memo of source path to tree hash shared between examples
+
+    Returns:
+        dict: Timing record of the example for the --report file
+    """
+    templates: list[dict[str, Any]] = []
+    with measure() as usage:
+        regenerated = create_example(example, options, tree_hashes, templates)
+    return {
+        "example_id": example["id"],
+        "skipped": not regenerated,
+        **usage,
+        "templates": templates,
+    }
+
+
+@contextlib.contextmanager
+def redirect_output(file: IO[Any]) -> Iterator[None]:
+    """
+    Send everything written to stdout and stderr within the block to a file.
+
+    The standard file descriptors are redirected rather than sys.stdout/sys.stderr so
+    that the output of subprocesses, such as copier's _tasks, goes to the file too.
+
+    Args:
+        file (IO): Open file to write the output to
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_stdout, saved_stderr = os.dup(1), os.dup(2)
+    os.dup2(file.fileno(), 1)
+    os.dup2(file.fileno(), 2)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved_stdout, 1)
+        os.dup2(saved_stderr, 2)
+        os.close(saved_stdout)
+        os.close(saved_stderr)
+
+
+def create_example_buffered(
+    example: dict[str, Any], options: CreateOptions
+) -> tuple[str, str, str | None, dict[str, Any] | None]:
+    """
+    Create an example while capturing everything it writes to stdout and stderr.
+
+    The standard file descriptors are redirected rather than sys.stdout/sys.stderr so
+    that the output of copier's _tasks subprocesses is captured as well. This must only
+    be called in a dedicated worker process.
+
+    Args:
+        example (dict): Example configuration from examples.yml
+        options (CreateOptions): Options that control how the example is created
+
+    Returns:
+        tuple: (example_id, output, error, timing) where error is the formatted
+            traceback if creating the example failed, and timing the timing record of
+            the example if it succeeded
+    """
+    error = None
+    timing = None
+    with tempfile.TemporaryFile() as log_file:
+        with redirect_output(log_file):
+            try:
+                timing = create_example_measured(example, options)
+            except Exception:  # noqa: BLE001
+                error = traceback.format_exc()
+        log_file.seek(0)
+        output = log_file.read().decode(errors="replace")
+    return example["id"], output, error, timing
+
+
+def create_examples_in_parallel(
+    examples: list[dict[str, Any]],
+    options: CreateOptions,
+    jobs: int = 2,
+    timings: list[dict[str, Any]] | None = None,
+) -> list[str]:
+    """
+    Create examples concurrently, one worker process per example.
+
+    Each example is written to its own examples/<id> directory so the workers are
+    independent. The output of each example is flushed as a single block once it
+    completes, and a failing example doesn't stop the others.
+
+    Args:
+        examples (list): Example configurations from examples.yml
+        options (CreateOptions): Options that control how the examples are created
+        jobs (int, optional): Maximum number of examples to create at the same time
+        timings (list, optional): List the timing records of the examples that were
+            created successfully are appended to
+
+    Returns:
+        list: IDs of the examples that failed
+    """
+    failed = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(create_example_buffered, example, options)
+            for example in examples
+        ]
+        for future in as_completed(futures):
+            example_id, output, error, timing = future.result()
+            print(f"\nProcessing example: {example_id}")
+            print(output, end="")
+            if error:
+                print(error, end="")
+                print(f"Failed: {example_id}")
+                failed.append(example_id)
+            else:
+                print(f"Completed: {example_id}")
+                if timings is not None and timing:
+                    timings.append(timing)
+            sys.stdout.flush()
+    return failed
+
+
+def watch_examples(
+    options: CreateOptions,
+    example_id: str | None = None,
+    debounce: float = 0.5,
+) -> None:
+    """
+    Watch the template and generator sources and regenerate the examples using them.
+
+    Changes are debounced, mapped to the examples that consume the changed sources via a
+    reverse index of examples.yml, and only those examples are regenerated. Existing
+    examples are updated in place with sync, and examples whose fingerprint didn't change
+    (for example after saving a file without edits) are skipped.
+
+    Args:
+        options (CreateOptions): Options that control how the examples are created
+        example_id (str, optional): Only regenerate this example
+        debounce (float, optional): Seconds without changes before regenerating
+    """
+    options = copy.copy(options)
+    options.sync = True
+    config = load_examples_config()
+    with TreeWatcher(get_source_paths(config), debounce=debounce) as watcher:
+        backend = "inotify" if watcher.uses_inotify else "polling"
+        print(f"Watching template sources with {backend}, press Ctrl+C to stop")
+        while True:
+            changed = watcher.wait_for_changes()
+            # examples.yml may have changed too, so the index is rebuilt for each batch
+            config = load_examples_config()
+            affected = [
+                ex_id
+                for ex_id in get_affected_examples(changed, config)
+                if not example_id or ex_id == example_id
+            ]
+            if not affected:
+                continue
+            changed_paths = sorted(str(to_repo_path(path)) for path in changed)
+            print(f"\nChanged: {', '.join(changed_paths[:5])}", end="")
+            print(
+                f" and {len(changed_paths) - 5} more" if len(changed_paths) > 5 else ""
+            )
+            for example in config["examples"]:
+                if example["id"] not in affected:
+                    continue
+                print(f"\nProcessing example: {example['id']}")
+                try:
+                    create_example(example, options)
+                    print(f"Completed: {example['id']}")
+                except Exception:  # noqa: BLE001
+                    # Keep watching so the template can be fixed and saved again
+                    traceback.print_exc()
+                    print(f"Failed: {example['id']}")
+                sys.stdout.flush()
+
+
+def main(
+    example_id: str | None = None,
+    bootstrap: bool = False,
+    jobs: int = 1,
+    force: bool = False,
+    cache: bool = True,
+    sync: bool = False,
+    preserve: list[str] | None = None,
+    template_jobs: int = 1,
+    plan: bool = False,
+    report: str | None = None,
+    watch: bool = False,
+    debounce: float = 0.5,
+    changed_since: str | None = None,
+    archive: str | None = None,
+) -> None:
     """
     Create examples from templates. If example_id is provided, only that example will be created.
 
     Args:
         example_id (str, optional): Specific example ID to process. If None, all examples will be processed.
         bootstrap (bool, optional): Whether to run 'algokit project bootstrap all' after creating the example. Defaults to False.
+        jobs (int, optional): Number of examples to create in parallel, each in its own worker process. Defaults to 1.
+        force (bool, optional): Regenerate examples even if their manifest shows they are up to date. Defaults to False.
+        cache (bool, optional): Whether to reuse cached renders of templates from .cache/rendered-templates. Defaults to True.
+        sync (bool, optional): Update existing examples in place with only the file level diff instead of recreating them. Defaults to False.
+        preserve (list, optional): Path patterns that sync leaves alone. Defaults to installed toolchains and build artifacts such as .venv, node_modules and smart_contracts/artifacts.
+        template_jobs (int, optional): Number of templates with disjoint destinations to apply in parallel within an example. Defaults to 1.
+        plan (bool, optional): Print the planned copier invocations and their dependencies as JSON instead of creating the examples. Defaults to False.
+        report (str, optional): Path to write the wall time and CPU time of each template application and _tasks command, and the process peak RSS after each, to as JSON, grouped by example. A summary table is printed at the end. Defaults to None.
+        watch (bool, optional): After creating the examples, watch the template and generator sources and regenerate only the examples affected by each change. Defaults to False.
+        debounce (float, optional): Seconds without further changes before watch mode regenerates. Defaults to 0.5.
+        changed_since (str, optional): Only process the examples whose template or generator sources changed since this git revision. Defaults to None.
+        archive (str, optional): Directory to write a reproducible <id>.tar.zst archive of each rendered example to, before bootstrapping. Requires the zstd command. Defaults to None.
     """
+    if archive:
+        check_archive_support()
     config = load_examples_config()
+    if changed_since:
+        affected = get_examples_changed_since(changed_since, config)
+        config["examples"] = [ex for ex in config["examples"] if ex["id"] in affected]
+        print(
+            f"{len(affected)} example(s) affected by changes since {changed_since}: "
+            f"{', '.join(affected) or 'none'}"
+        )
+    options = CreateOptions(
+        bootstrap=bootstrap,
+        force=force,
+        use_cache=cache,
+        sync=sync,
+        template_jobs=template_jobs,
+        archive_dir=Path(archive) if archive else None,
+    )
+    if preserve is not None:
+        options.preserve = list(preserve)
 
+    if plan:
+        examples = [
+            ex for ex in config["examples"] if not example_id or ex["id"] == example_id
+        ]
+        plans = [
+            format_plan(plan_example(ex, Path("examples") / ex["id"]))
+            for ex in examples
+        ]
+        print(json.dumps(plans, indent=2))
+        return
+
+    timings: list[dict[str, Any]] = []
+    failed: list[str] = []
     if example_id:
         # Process single example
         example = next(
@@ -359,15 +1006,34 @@ def main(example_id: Optional[str] = None, bootstrap: bool = False) -> None:
             print(f"No example found with ID: {example_id}")
             return
         print(f"\nProcessing example: {example['id']}")
-        create_example(example, bootstrap)
+        timings.append(create_example_measured(example, options))
         print(f"Completed: {example['id']}")
+    elif jobs > 1:
+        # Process all examples in parallel and report failures at the end
+        failed = create_examples_in_parallel(config["examples"], options, jobs, timings)
     else:
-        # Process all examples
+        # Process all examples, hashing each shared source tree only once
+        tree_hashes: dict[str, str] = {}
         for example in config["examples"]:
             print(f"\nProcessing example: {example['id']}")
-            create_example(example, bootstrap)
+            timings.append(create_example_measured(example, options, tree_hashes))
             print(f"Completed: {example['id']}")
 
+    if report:
+        write_report(Path(report), timings)
+        print(f"\n{format_summary(timings)}")
+        print(f"Timing report written to {report}")
+    if failed:
+        print(f"\nFailed to create {len(failed)} example(s): {', '.join(failed)}")
+        if not watch:
+            sys.exit(1)
+
+    if watch:
+        try:
+            watch_examples(options, example_id, debounce)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+
 
 if __name__ == "__main__":
     fire.Fire(main)
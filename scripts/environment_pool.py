@@ -0,0 +1,298 @@
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from atomic_write import atomic_write_tree
+from fingerprint import get_cache_dir, hash_data
+from template_cache import materialize_tree
+from watch_tree import IGNORED_DIR_NAMES
+
+
+@dataclass(frozen=True)
+class PackageManager:
+    """Files a package manager installs a project's dependencies from and into."""
+
+    # File declaring the project's dependencies
+    manifest: str
+    # File pinning the resolved dependencies, the environment is installed from it
+    lock: str
+    # Directory the dependencies are installed into
+    environment: str
+    # Command whose output identifies the runtime the environment is built for
+    runtime_command: tuple[str, ...]
+    # Command printing the interpreter the package manager builds a project's
+    # environment with, used instead of runtime_command when it prints one
+    interpreter_command: tuple[str, ...] = ()
+    # File in the environment recording the version of the runtime it was built for
+    runtime_file: str | None = None
+    # Glob patterns of the files in the environment that can embed absolute paths
+    relocated_paths: tuple[str, ...] = ()
+
+
+PACKAGE_MANAGERS = {
+    "npm": PackageManager(
+        manifest="package.json",
+        lock="package-lock.json",
+        environment="node_modules",
+        runtime_command=("node", "--version"),
+    ),
+    "poetry": PackageManager(
+        manifest="pyproject.toml",
+        lock="poetry.lock",
+        environment=".venv",
+        runtime_command=("python3", "--version"),
+        interpreter_command=("poetry", "env", "info", "--executable"),
+        runtime_file="pyvenv.cfg",
+        # Console scripts have the environment's python in their shebang, and path
+        # and editable installs record where they were installed from
+        relocated_paths=(
+            "bin/*",
+            "pyvenv.cfg",
+            "lib/*/site-packages/*.pth",
+            "lib/*/site-packages/*.egg-link",
+            "lib/*/site-packages/__editable__*",
+            "lib/*/site-packages/*.dist-info/direct_url.json",
+        ),
+    ),
+}
+META_FILE_NAME = "environment.json"
+
+
+def find_projects(example_path: Path) -> Iterator[tuple[Path, str]]:
+    """Yield the directory and package manager of every project in an example."""
+    for root, dirs, files in os.walk(example_path):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIR_NAMES)
+        for name, manager in sorted(PACKAGE_MANAGERS.items()):
+            if manager.manifest in files:
+                yield Path(root), name
+
+
+def get_environment_key(project_path: Path, manager_name: str) -> str:
+    """
+    Compute the key of the environment installed from a project's lock file.
+
+    The key covers the lock file, without npm's copy of the project name, and the
+    runtime and platform the environment is built for.
+
+    Args:
+        project_path (Path): Directory of the project, which must have a lock file
+        manager_name (str): Name of the project's package manager
+
+    Returns:
+        str: Hex encoded key
+    """
+    manager = PACKAGE_MANAGERS[manager_name]
+    lock_path = project_path / manager.lock
+    lock: Any
+    if lock_path.suffix == ".json":
+        with open(lock_path, "r") as f:
+            lock = json.load(f)
+        for package in (lock, lock.get("packages", {}).get("", {})):
+            package.pop("name", None)
+            package.pop("version", None)
+    else:
+        lock = lock_path.read_text()
+    return hash_data(
+        {
+            "manager": manager_name,
+            "lock": lock,
+            "runtime": get_runtime_version(project_path, manager_name),
+            "platform": f"{platform.system()}-{platform.machine()}",
+        }
+    )
+
+
+def get_runtime_version(project_path: Path, manager_name: str) -> str:
+    """
+    Return the version of the runtime a project's environment is built for.
+
+    An existing environment is identified by the runtime it records, such as the python
+    version in a venv's pyvenv.cfg. Otherwise the package manager is asked which
+    interpreter it would build the environment with, falling back to the version of the
+    runtime on the PATH. A wrong guess can only miss the pool, since stored environments
+    are always keyed by the runtime they were actually built with.
+
+    Args:
+        project_path (Path): Directory of the project
+        manager_name (str): Name of the project's package manager
+
+    Returns:
+        str: Version of the runtime
+    """
+    manager = PACKAGE_MANAGERS[manager_name]
+    if manager.runtime_file:
+        runtime_file = project_path / manager.environment / manager.runtime_file
+        if runtime_file.is_file():
+            version = _read_venv_version(runtime_file)
+            if version:
+                return version
+    if manager.interpreter_command:
+        interpreter = _run_version_command(manager.interpreter_command, project_path)
+        if interpreter and Path(interpreter).is_file():
+            return _parse_python_version(
+                _run_version_command((interpreter, "--version"))
+            )
+    version = _run_version_command(manager.runtime_command)
+    return _parse_python_version(version) if manager.runtime_file else version
+
+
+@cache
+def _run_version_command(command: tuple[str, ...], cwd: Path | None = None) -> str:
+    try:
+        result = subprocess.run(
+            command, cwd=cwd, capture_output=True, text=True, timeout=60, check=False
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return "not installed"
+    if result.returncode != 0:
+        return ""
+    return result.stdout.strip() or result.stderr.strip()
+
+
+def _read_venv_version(path: Path) -> str | None:
+    config = {}
+    for line in path.read_text().splitlines():
+        key, _, value = line.partition("=")
+        config[key.strip()] = value.strip()
+    # virtualenv writes version_info, the venv module writes version
+    version = config.get("version_info") or config.get("version")
+    return _parse_python_version(version) if version else None
+
+
+def _parse_python_version(text: str) -> str:
+    match = re.search(r"\d+\.\d+\.\d+", text)
+    return match.group(0) if match else text
+
+
+def restore_environments(example_path: Path) -> list[Path]:
+    """
+    Materialize pooled environments into the projects of an example.
+
+    Projects with a lock file but no environment get the environment installed from the
+    same lock file, cloned or copied from the pool. Projects without a lock file are left
+    alone, since a lock file resolved for another project may not match their own
+    dependencies, and so are existing environments and projects on a cache miss, which
+    the normal install then sets up. Bootstrapping afterwards only checks the restored
+    ones.
+
+    Args:
+        example_path (Path): Directory of the example
+
+    Returns:
+        list: Environment directories that were restored
+    """
+    restored = []
+    pool_dir = get_cache_dir("environments")
+    for project_path, manager_name in find_projects(example_path):
+        manager = PACKAGE_MANAGERS[manager_name]
+        environment_path = project_path / manager.environment
+        if not (project_path / manager.lock).is_file() or environment_path.exists():
+            continue
+        entry = (
+            pool_dir / manager_name / get_environment_key(project_path, manager_name)
+        )
+        if not entry.is_dir():
+            continue
+        with open(entry / META_FILE_NAME, "r") as f:
+            meta = json.load(f)
+        try:
+            materialize_tree(entry / manager.environment, environment_path)
+            _relocate(
+                environment_path, manager, meta["path"], str(environment_path.resolve())
+            )
+        except BaseException:
+            shutil.rmtree(environment_path, ignore_errors=True)
+            raise
+        restored.append(environment_path)
+    return restored
+
+
+def store_environments(example_path: Path) -> list[Path]:
+    """
+    Add the environments of a bootstrapped example to the pool.
+
+    Entries are written with atomic_write_tree. Environments already in the pool aren't stored again, and neither are environments with path or
+    editable installs of files outside of them, which only work in their own example.
+
+    Args:
+        example_path (Path): Directory of the example, after a successful bootstrap
+
+    Returns:
+        list: Environment directories that were added to the pool
+    """
+    stored = []
+    pool_dir = get_cache_dir("environments")
+    for project_path, manager_name in find_projects(example_path):
+        manager = PACKAGE_MANAGERS[manager_name]
+        lock_path = project_path / manager.lock
+        environment_path = project_path / manager.environment
+        if not lock_path.is_file() or not environment_path.is_dir():
+            continue
+        if has_path_dependent_installs(project_path, manager_name):
+            continue
+        manager_dir = pool_dir / manager_name
+        manager_dir.mkdir(exist_ok=True)
+        environment_key = get_environment_key(project_path, manager_name)
+        if (manager_dir / environment_key).exists():
+            continue
+        with atomic_write_tree(manager_dir / environment_key) as staging_path:
+            materialize_tree(environment_path, staging_path / manager.environment)
+            with open(staging_path / META_FILE_NAME, "w") as f:
+                json.dump({"path": str(environment_path.resolve())}, f)
+        stored.append(environment_path)
+    return stored
+
+
+def has_path_dependent_installs(project_path: Path, manager_name: str) -> bool:
+    """
+    Check whether a project's environment refers to files of the project outside of it.
+
+    Path and editable installs, such as the project itself installed in develop mode,
+    point at the example they were installed in, so the environment can't be reused by
+    another example.
+
+    Args:
+        project_path (Path): Directory of the project
+        manager_name (str): Name of the project's package manager
+
+    Returns:
+        bool: True if a file that can embed absolute paths refers to the project
+    """
+    manager = PACKAGE_MANAGERS[manager_name]
+    environment_path = (project_path / manager.environment).resolve()
+    environment = str(environment_path).encode()
+    project = str(project_path.resolve()).encode()
+    for file in _find_relocated_files(environment_path, manager):
+        # Paths inside the environment are relocated, anything else of the project isn't
+        if project in file.read_bytes().replace(environment, b""):
+            return True
+    return False
+
+
+def _relocate(
+    environment_path: Path, manager: PackageManager, old: str, new: str
+) -> None:
+    """Point the files embedding an environment's location at its new location."""
+    if old == new:
+        return
+    for file in _find_relocated_files(environment_path, manager):
+        content = file.read_bytes()
+        if old.encode() in content:
+            file.write_bytes(content.replace(old.encode(), new.encode()))
+
+
+def _find_relocated_files(
+    environment_path: Path, manager: PackageManager
+) -> Iterator[Path]:
+    for pattern in manager.relocated_paths:
+        for file in environment_path.glob(pattern):
+            if file.is_file() and not file.is_symlink():
+                yield file
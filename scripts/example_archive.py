@@ -0,0 +1,110 @@
+import os
+import shutil
+import subprocess
+import tarfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO
+
+from atomic_write import atomic_write
+from template_cache import clone_file
+
+ARCHIVE_SUFFIX = ".tar.zst"
+ZSTD_COMMAND = "zstd"
+
+
+def check_archive_support() -> None:
+    """Raise if the zstd command the archives are compressed with isn't installed."""
+    if shutil.which(ZSTD_COMMAND) is None:
+        raise RuntimeError(
+            f"'{ZSTD_COMMAND}' was not found on PATH, install zstd to write archives"
+        )
+
+
+def write_archive(source: Path, archive_path: Path, arcname: str) -> None:
+    """
+    Stream a directory tree into a reproducible zstd compressed tarball.
+
+    The tar stream is piped straight into zstd, so no uncompressed tarball is written.
+    Entries are added in sorted order with a fixed mtime (SOURCE_DATE_EPOCH if set),
+    no owner and normalized permissions, so the same tree always gives the same bytes.
+    The archive is written with atomic_write.
+
+    Args:
+        source (Path): Directory to archive
+        archive_path (Path): Path of the archive to write
+        arcname (str): Name of the top level directory in the archive
+    """
+    mtime = int(os.environ.get("SOURCE_DATE_EPOCH", "0"))
+    with atomic_write(archive_path, "wb") as output:
+        process = subprocess.Popen(
+            [ZSTD_COMMAND, "--quiet", "--stdout", "-"],
+            stdin=subprocess.PIPE,
+            stdout=output,
+        )
+        assert process.stdin is not None
+        with process.stdin:
+            _write_tar_stream(source, arcname, mtime, process.stdin)
+        if process.wait() != 0:
+            raise RuntimeError(
+                f"{ZSTD_COMMAND} failed with exit code {process.returncode}"
+            )
+
+
+def export_archive(archive_path: Path, archive_dir: Path, name: str) -> Path:
+    """
+    Place an archive in the output directory under the name of its example.
+
+    Args:
+        archive_path (Path): Archive to export, usually from the cache
+        archive_dir (Path): Directory to export the archive to
+        name (str): Name of the exported archive, without suffix
+
+    Returns:
+        Path: Path of the exported archive
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    destination = archive_dir / f"{name}{ARCHIVE_SUFFIX}"
+    temp_path = archive_dir / f".{name}{ARCHIVE_SUFFIX}.tmp"
+    clone_file(archive_path, temp_path)
+    os.replace(temp_path, destination)
+    return destination
+
+
+def _write_tar_stream(
+    source: Path, arcname: str, mtime: int, output: IO[bytes]
+) -> None:
+    with tarfile.open(fileobj=output, mode="w|", format=tarfile.GNU_FORMAT) as tar:
+        for path in _iter_sorted_tree(source):
+            relative_path = path.relative_to(source).as_posix()
+            info = tarfile.TarInfo(
+                arcname if relative_path == "." else f"{arcname}/{relative_path}"
+            )
+            info.mtime = mtime
+            info.uid = info.gid = 0
+            info.uname = info.gname = ""
+            if path.is_symlink():
+                info.type = tarfile.SYMTYPE
+                info.linkname = os.readlink(path)
+                info.mode = 0o777
+                tar.addfile(info)
+            elif path.is_dir():
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                tar.addfile(info)
+            else:
+                info.size = path.stat().st_size
+                info.mode = 0o755 if os.access(path, os.X_OK) else 0o644
+                with open(path, "rb") as f:
+                    tar.addfile(info, f)
+
+
+def _iter_sorted_tree(source: Path) -> Iterator[Path]:
+    yield source
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        root_path = Path(root)
+        # Symlinked directories are archived as links and not descended into
+        for name in sorted([*dirs, *files]):
+            yield root_path / name
+        dirs[:] = [d for d in dirs if not (root_path / d).is_symlink()]
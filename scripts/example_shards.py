@@ -0,0 +1,56 @@
+import heapq
+from collections.abc import Iterable
+
+# Duration assumed for every example when there is no history at all
+DEFAULT_DURATION = 1.0
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """
+    Parse a shard specification like '2/3' into a zero based shard index and a count.
+
+    Raises:
+        ValueError: If the specification isn't 'i/n' with 1 <= i <= n
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected 'i/n' such as '1/3'")
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}', i must be between 1 and {count}")
+    return index - 1, count
+
+
+def assign_shards(
+    example_ids: Iterable[str], durations: dict[str, float], count: int
+) -> list[list[str]]:
+    """
+    Split examples into shards that take about the same time, longest first.
+
+    Examples are assigned in order of decreasing duration to the shard with the least
+    total so far. Examples without a recorded duration are assumed to take the average
+    of the recorded ones. Ties are broken by name and shard index, so every runner
+    computes the same assignment.
+
+    Args:
+        example_ids (Iterable): Ids of the examples to shard
+        durations (dict): Recorded duration in seconds of each example, such as
+            timing_history.get_example_durations returns
+        count (int): Number of shards
+
+    Returns:
+        list: Example ids of each shard
+    """
+    example_ids = sorted(set(example_ids))
+    known = [durations[e] for e in example_ids if e in durations]
+    default = sum(known) / len(known) if known else DEFAULT_DURATION
+
+    shards: list[list[str]] = [[] for _ in range(count)]
+    totals = [(0.0, index) for index in range(count)]
+    for example_id in sorted(
+        example_ids, key=lambda e: (-durations.get(e, default), e)
+    ):
+        total, index = heapq.heappop(totals)
+        shards[index].append(example_id)
+        heapq.heappush(totals, (total + durations.get(example_id, default), index))
+    return shards
@@ -0,0 +1,166 @@
+import subprocess
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from fingerprint import RENDERING_SCRIPTS
+
+REPO_ROOT = Path(__file__).parent.parent
+EXAMPLES_CONFIG_PATH = "examples/examples.yml"
+# Scripts that bootstrap and test the examples, so changes to them affect every example
+TEST_HARNESS_SCRIPTS = ["bootstrap_examples.py", "conftest.py", "test_examples.py"]
+# Paths every example is generated from or tested with, in addition to its own template
+# sources. Changes to the other scripts, such as their unit tests, don't affect examples.
+SHARED_SOURCES = [
+    *(f"scripts/{name}" for name in [*RENDERING_SCRIPTS, *TEST_HARNESS_SCRIPTS]),
+    EXAMPLES_CONFIG_PATH,
+]
+
+
+def build_source_index(config: dict[str, Any]) -> dict[str, list[str]]:
+    """
+    Build a reverse index from template and generator sources to the examples using them.
+
+    Args:
+        config (dict): Content of examples.yml
+
+    Returns:
+        dict: Source path relative to the repo root to the ids of the examples that
+            consume it, in the order of examples.yml
+    """
+    index: dict[str, list[str]] = {}
+    example_ids = [example["id"] for example in config["examples"]]
+    for source in SHARED_SOURCES:
+        index[source] = list(example_ids)
+    for example in config["examples"]:
+        for template in example["templates"]:
+            source = Path(template["source"]).as_posix()
+            example_ids_for_source = index.setdefault(source, [])
+            if example["id"] not in example_ids_for_source:
+                example_ids_for_source.append(example["id"])
+    return index
+
+
+def get_affected_examples(
+    paths: Iterable[str | Path], config: dict[str, Any]
+) -> list[str]:
+    """
+    Map changed paths to the ids of the examples generated from them.
+
+    Args:
+        paths (Iterable): Changed paths, relative to the repo root or absolute
+        config (dict): Content of examples.yml
+
+    Returns:
+        list: Ids of the affected examples, in the order of examples.yml
+    """
+    index = build_source_index(config)
+    affected = set()
+    for path in paths:
+        relative_path = to_repo_path(path)
+        if relative_path is None:
+            continue
+        for source, example_ids in index.items():
+            if relative_path == source or relative_path.startswith(f"{source}/"):
+                affected.update(example_ids)
+    return [
+        example["id"] for example in config["examples"] if example["id"] in affected
+    ]
+
+
+def get_changed_paths(rev: str) -> list[str]:
+    """
+    List the paths changed since a git revision.
+
+    Changes are taken from the merge base of the revision and HEAD to the working tree,
+    so on a branch only the branch's own changes count, including uncommitted and
+    untracked files.
+
+    Args:
+        rev (str): Git revision, such as 'origin/main' or a commit sha
+
+    Returns:
+        list: Changed paths relative to the repo root
+    """
+    try:
+        merge_base = run_git("merge-base", rev, "HEAD").strip()
+    except RuntimeError as e:
+        raise ValueError(f"Can't find changes since git revision '{rev}'") from e
+    changed = run_git("diff", "--name-only", "--no-renames", merge_base).splitlines()
+    untracked = run_git("ls-files", "--others", "--exclude-standard").splitlines()
+    return sorted(set(changed) | set(untracked))
+
+
+def get_examples_changed_since(rev: str, config: dict[str, Any]) -> list[str]:
+    """
+    Map the paths changed since a git revision to the ids of the affected examples.
+
+    An example is affected when one of its sources changed, or when its own generated
+    directory under examples/ changed.
+
+    Args:
+        rev (str): Git revision, such as 'origin/main' or a commit sha
+        config (dict): Content of examples.yml
+
+    Returns:
+        list: Ids of the affected examples, in the order of examples.yml
+    """
+    changed = get_changed_paths(rev)
+    affected = set(get_affected_examples(changed, config))
+    for example in config["examples"]:
+        if any(path.startswith(f"examples/{example['id']}/") for path in changed):
+            affected.add(example["id"])
+    return [
+        example["id"] for example in config["examples"] if example["id"] in affected
+    ]
+
+
+def get_source_paths(config: dict[str, Any]) -> list[Path]:
+    """Return the absolute paths of every source the examples are generated from."""
+    return [REPO_ROOT / source for source in build_source_index(config)]
+
+
+def to_repo_path(path: str | Path) -> str | None:
+    """Return a path relative to the repo root in posix form, or None if it's outside."""
+    path = Path(path)
+    if path.is_absolute():
+        try:
+            path = path.resolve().relative_to(REPO_ROOT.resolve())
+        except ValueError:
+            return None
+    return path.as_posix()
+
+
+def run_git(
+    *args: str,
+    env: dict[str, str] | None = None,
+    cwd: Path | None = None,
+    input: str | None = None,
+    check: bool = True,
+) -> str:
+    """
+    Run a git command and return its standard output.
+
+    Args:
+        *args (str): Arguments of the git command
+        env (dict, optional): Environment of the command instead of this process's
+        cwd (Path, optional): Directory to run the command in. Defaults to the repo root.
+        input (str, optional): Text written to the command's standard input
+        check (bool, optional): Whether a failure raises. Defaults to True.
+
+    Raises:
+        RuntimeError: If check is set and the command fails, with git's error message
+    """
+    result = subprocess.run(
+        ["git", *args],
+        check=False,
+        cwd=cwd or REPO_ROOT,
+        env=env,
+        input=input,
+        capture_output=True,
+        text=True,
+    )
+    if check and result.returncode != 0:
+        command = next(arg for arg in args if not arg.startswith("-"))
+        raise RuntimeError(f"git {command} failed: {result.stderr.strip()}")
+    return result.stdout
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+IGNORED_NAMES = {"__pycache__", ".DS_Store"}
+REPO_ROOT = Path(__file__).parent.parent
+CACHE_DIR_ENV_VAR = "ALGOKIT_TEMPLATES_CACHE_DIR"
+# Scripts whose code decides what a template renders to, including the merge scripts
+# that templates call from their _tasks. Changes to the others, such as the test and
+# reporting scripts, don't invalidate rendered examples.
+RENDERING_SCRIPTS = [
+    "atomic_write.py",
+    "copier_worker.py",
+    "create_examples.py",
+    "merge_dependencies.py",
+    "merge_engine.py",
+    "merge_package_json.py",
+    "merge_pyproject.py",
+    "sync_tree.py",
+    "template_cache.py",
+    "update_workspace.py",
+]
+
+
+def hash_tree(path: Path, exclude: Iterable[str] = ()) -> str:
+    """
+    Compute a content hash of a directory tree.
+
+    The hash covers the relative path, executable bit and content of every file, so it
+    only changes when something that affects a render or copy of the tree changes.
+
+    Args:
+        path (Path): Root of the tree to hash
+        exclude (Iterable[str], optional): File or directory names to skip anywhere in the tree
+
+    Returns:
+        str: Hex encoded sha256 digest of the tree
+    """
+    return hash_files(path, list_files(path, exclude))
+
+
+def list_files(path: Path, exclude: Iterable[str] = ()) -> list[str]:
+    """
+    List the files of a directory tree in a stable order.
+
+    Args:
+        path (Path): Root of the tree to list
+        exclude (Iterable[str], optional): File or directory names to skip anywhere in the tree
+
+    Returns:
+        list: Paths of the files and symlinks, relative to the root in POSIX form
+    """
+    excluded = IGNORED_NAMES | set(exclude)
+    relative_paths = []
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d not in excluded)
+        for name in sorted(files):
+            if name not in excluded:
+                relative_paths.append((Path(root) / name).relative_to(path).as_posix())
+    return relative_paths
+
+
+def hash_files(path: Path, relative_paths: Iterable[str]) -> str:
+    """
+    Compute a content hash of some of the files in a directory tree.
+
+    Args:
+        path (Path): Root of the tree
+        relative_paths (Iterable[str]): Paths of the files to hash, relative to the root,
+            in the order they are hashed. Missing files are hashed as missing.
+
+    Returns:
+        str: Hex encoded sha256 digest of the files
+    """
+    digest = hashlib.sha256()
+    for relative_path in relative_paths:
+        file_path = path / relative_path
+        digest.update(relative_path.encode())
+        if file_path.is_symlink():
+            digest.update(b"\0link\0" + os.readlink(file_path).encode())
+        elif not file_path.is_file():
+            digest.update(b"\0missing\0")
+        else:
+            executable = os.access(file_path, os.X_OK)
+            digest.update(b"\0x\0" if executable else b"\0f\0")
+            digest.update(hash_file(file_path).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def hash_rendering_scripts(repo_root: Path = REPO_ROOT) -> str:
+    """Return the content hash of the RENDERING_SCRIPTS of a repo."""
+    return hash_files(repo_root / "scripts", RENDERING_SCRIPTS)
+
+
+def hash_file(path: Path) -> str:
+    """Return the hex encoded sha256 digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_data(data: Any) -> str:
+    """Return the hex encoded sha256 digest of JSON serializable data."""
+    serialized = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def get_package_version(package: str) -> str:
+    """Return the installed version of a package, or 'unknown' if it isn't installed."""
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def get_cache_dir(name: str) -> Path:
+    """
+    Return a named local cache directory, creating it if needed.
+
+    Caches live under .cache/ in the repo root unless the ALGOKIT_TEMPLATES_CACHE_DIR
+    environment variable points elsewhere.
+
+    Args:
+        name (str): Name of the cache
+
+    Returns:
+        Path: Path to the cache directory
+    """
+    cache_root = Path(os.environ.get(CACHE_DIR_ENV_VAR, REPO_ROOT / ".cache"))
+    cache_dir = cache_root / name
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
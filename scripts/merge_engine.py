@@ -0,0 +1,305 @@
+import copy
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import fire  # type: ignore[import-untyped]
+import tomli
+import tomli_w
+from atomic_write import atomic_write
+
+
+def merge_json_dependencies(
+    source: dict,
+    destination: dict,
+    overwrite_existing_only: bool = False,
+    merge_scripts: bool = False,
+) -> dict:
+    """
+    Merge dependencies from source into destination package.json,
+    preserving all destination fields and structure.
+    Source entries take precedence over destination entries.
+
+    Args:
+        source: Source dictionary
+        destination: Destination dictionary
+        overwrite_existing_only: If True, only overwrite entries that already exist in destination
+        merge_scripts: If True, merge scripts as well as dependencies
+    """
+    result = destination.copy()
+
+    # Merge dependencies and devDependencies
+    for dep_type in ["dependencies", "devDependencies"]:
+        if dep_type in source and dep_type in result:
+            source_deps = source[dep_type]
+            for dep_name, dep_version in source_deps.items():
+                if not overwrite_existing_only or dep_name in result[dep_type]:
+                    result[dep_type][dep_name] = dep_version
+        elif dep_type in source and not overwrite_existing_only:
+            # Only add new dep_type if overwrite_existing_only is False
+            result[dep_type] = source[dep_type].copy()
+
+    # Merge scripts
+    if merge_scripts and "scripts" in source:
+        if "scripts" not in result:
+            result["scripts"] = {}
+        source_scripts = source["scripts"]
+        for script_name, script_command in source_scripts.items():
+            if not overwrite_existing_only or script_name in result["scripts"]:
+                result["scripts"][script_name] = script_command
+
+    return result
+
+
+def merge_package_json_fields(
+    source: dict, destination: dict, overwrite_existing_only: bool = False
+) -> dict:
+    """Merge dependencies and scripts from source into destination package.json."""
+    return merge_json_dependencies(
+        source, destination, overwrite_existing_only, merge_scripts=True
+    )
+
+
+def merge_pyproject_dependencies(
+    source: dict, destination: dict, overwrite_existing_only: bool = False
+) -> dict:
+    """
+    Merge dependencies from source into destination pyproject.toml dependencies.
+    Source dependencies will overwrite matching dependencies in destination.
+    Assumes Poetry-style pyproject.toml format.
+
+    Args:
+        source: Source dependency dictionary
+        destination: Destination dependency dictionary
+        overwrite_existing_only: If True, only merge dependencies that already exist in destination
+    """
+    result = destination.copy()
+
+    if "tool" in source and "poetry" in source["tool"]:
+        source_poetry = source["tool"]["poetry"]
+        if "tool" not in result:
+            result["tool"] = {}
+        if "poetry" not in result["tool"]:
+            result["tool"]["poetry"] = {}
+
+        # Handle main dependencies
+        if "dependencies" in source_poetry:
+            dest_deps = result["tool"]["poetry"].setdefault("dependencies", {})
+            for dep_name, dep_version in source_poetry["dependencies"].items():
+                if not overwrite_existing_only or dep_name in dest_deps:
+                    dest_deps[dep_name] = dep_version
+
+        # Handle dependency groups
+        if "group" in source_poetry:
+            dest_groups = result["tool"]["poetry"].setdefault("group", {})
+            for group_name, group_data in source_poetry["group"].items():
+                if "dependencies" in group_data:
+                    if group_name not in dest_groups and not overwrite_existing_only:
+                        dest_groups[group_name] = {"dependencies": {}}
+                    elif group_name in dest_groups:
+                        dest_group_deps = dest_groups[group_name].setdefault(
+                            "dependencies", {}
+                        )
+                        for dep_name, dep_version in group_data["dependencies"].items():
+                            if (
+                                not overwrite_existing_only
+                                or dep_name in dest_group_deps
+                            ):
+                                dest_group_deps[dep_name] = dep_version
+
+    return result
+
+
+@dataclass(frozen=True)
+class FileMerge:
+    """How a merge mode handles one of the dependency files."""
+
+    # Name of the file in the source and destination directories
+    file_name: str
+    # Merges a parsed source file into a parsed destination file
+    merge: Callable[[dict, dict, bool], dict]
+    # Whether a missing destination file is created from the source file
+    create_missing: bool
+    # Whether a missing source file is reported
+    report_missing_source: bool
+
+
+# Files each merge mode merges from the source directory into the destination directory
+MERGE_MODES = {
+    "dependencies": [
+        FileMerge("package.json", merge_json_dependencies, False, False),
+        FileMerge("pyproject.toml", merge_pyproject_dependencies, True, False),
+    ],
+    "package_json": [
+        FileMerge("package.json", merge_package_json_fields, True, True),
+    ],
+    "pyproject": [
+        FileMerge("pyproject.toml", merge_pyproject_dependencies, True, True),
+    ],
+}
+
+
+def parse_document(path: Path, text: str) -> dict:
+    """Parse a package.json or pyproject.toml file."""
+    return tomli.loads(text) if path.suffix == ".toml" else json.loads(text)
+
+
+def dump_document(path: Path, document: dict) -> str:
+    """Serialize a package.json or pyproject.toml file the way the merge scripts write it."""
+    return (
+        tomli_w.dumps(document)
+        if path.suffix == ".toml"
+        else json.dumps(document, indent=2)
+    )
+
+
+class MergeBatch:
+    """
+    Merge many dependency files, parsing and writing each file only once.
+
+    Files are read the first time a merge needs them, and destination files are then
+    merged in memory in the order the merges were applied, as if each merge had read and
+    written the file itself. write() writes each merged destination once.
+    """
+
+    def __init__(self) -> None:
+        self._texts: dict[Path, str | None] = {}
+        self._documents: dict[Path, dict | None] = {}
+        self._modified: list[Path] = []
+
+    def apply(
+        self,
+        source: Path,
+        destination: Path,
+        mode: str,
+        overwrite_existing_only: bool = False,
+    ) -> None:
+        """
+        Merge the dependency files of a source directory into a destination directory.
+
+        Args:
+            source (Path): Directory containing the source dependency files
+            destination (Path): Directory containing the destination dependency files
+            mode (str): Which files to merge and how, one of MERGE_MODES
+            overwrite_existing_only (bool, optional): If True, only overwrite entries
+                that already exist in the destination files
+
+        Raises:
+            ValueError: If the mode is unknown or the source isn't a directory
+        """
+        if mode not in MERGE_MODES:
+            raise ValueError(
+                f"Unknown merge mode '{mode}', expected one of {', '.join(MERGE_MODES)}"
+            )
+        if not source.exists():
+            raise ValueError(f"Source directory '{source}' does not exist")
+        if not source.is_dir():
+            raise ValueError(f"Source path '{source}' is not a directory")
+        # Create destination if it doesn't exist
+        destination.mkdir(parents=True, exist_ok=True)
+
+        for file_merge in MERGE_MODES[mode]:
+            source_file = source / file_merge.file_name
+            destination_file = destination / file_merge.file_name
+            source_document = self._load(source_file)
+            if source_document is None:
+                if file_merge.report_missing_source:
+                    print(f"Source {file_merge.file_name} not found at {source_file}")
+                continue
+            destination_document = self._load(destination_file)
+            if destination_document is not None:
+                print(f"Merging dependencies from {source_file} to {destination_file}")
+                merged = file_merge.merge(
+                    source_document, destination_document, overwrite_existing_only
+                )
+            elif not file_merge.create_missing:
+                continue
+            elif overwrite_existing_only:
+                print(
+                    f"Destination {file_merge.file_name} doesn't exist and "
+                    "overwrite_existing_only is True. Skipping."
+                )
+                continue
+            else:
+                print(f"Creating new {file_merge.file_name} at {destination_file}")
+                # Later merges into the destination mustn't change the parsed source
+                merged = copy.deepcopy(source_document)
+            self._documents[destination_file] = merged
+            if destination_file not in self._modified:
+                self._modified.append(destination_file)
+
+    def write(self) -> list[Path]:
+        """
+        Write each merged destination file once, atomically, if its content changed.
+
+        Returns:
+            list: Files that were written
+        """
+        written = []
+        for path in self._modified:
+            document = self._documents[path]
+            assert document is not None
+            text = dump_document(path, document)
+            if text == self._texts[path]:
+                continue
+            with atomic_write(path) as f:
+                f.write(text)
+            self._texts[path] = text
+            written.append(path)
+        self._modified.clear()
+        return written
+
+    def _load(self, path: Path) -> dict | None:
+        if path not in self._documents:
+            try:
+                text: str | None = path.read_text()
+            except FileNotFoundError:
+                text = None
+            self._texts[path] = text
+            self._documents[path] = (
+                parse_document(path, text) if text is not None else None
+            )
+        return self._documents[path]
+
+
+def run_merges(merges: list[dict[str, Any]]) -> list[Path]:
+    """
+    Apply a batch of merges and write the merged files.
+
+    Args:
+        merges (list): Merges with a 'source' and 'destination' directory, a 'mode' out
+            of MERGE_MODES and optionally 'overwrite_existing_only', applied in order
+
+    Returns:
+        list: Files that were written
+    """
+    batch = MergeBatch()
+    for merge in merges:
+        batch.apply(
+            Path(merge["source"]),
+            Path(merge["destination"]),
+            merge["mode"],
+            merge.get("overwrite_existing_only", False),
+        )
+    return batch.write()
+
+
+def merge_batch(manifest: str) -> None:
+    """
+    Merge many package.json and pyproject.toml files in one process.
+
+    Args:
+        manifest: Path to a JSON file with a list of merges, each with a 'source' and
+            'destination' directory, a 'mode' ('dependencies', 'package_json' or
+            'pyproject') and optionally 'overwrite_existing_only'
+    """
+    with open(manifest, "r") as f:
+        merges = json.load(f)
+    written = run_merges(merges)
+    print(f"Applied {len(merges)} merge(s), wrote {len(written)} file(s)")
+
+
+if __name__ == "__main__":
+    fire.Fire(merge_batch)
@@ -0,0 +1,159 @@
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import fire  # type: ignore[import-untyped]
+from create_examples import MANIFEST_FILE_NAME, load_examples_config
+from example_sources import run_git
+
+REPO_ROOT = Path(__file__).parent.parent
+ZERO_OID = "0" * 40
+
+
+def build_example_tree(example_path: Path, index_file: Path) -> str:
+    """
+    Write the tree of an example's files to the object database, as if it was the repo root.
+
+    The files are staged into a temporary index with the example directory as the work
+    tree, so the example's own .gitignore applies and neither the working tree nor the
+    repo's index is touched.
+
+    Args:
+        example_path (Path): Directory of the example
+        index_file (Path): Temporary index file to stage the files in
+
+    Returns:
+        str: Object id of the tree
+    """
+    env = {**os.environ, "GIT_INDEX_FILE": str(index_file)}
+    work_tree = f"--work-tree={example_path.absolute()}"
+    run_git(
+        work_tree,
+        "add",
+        "--all",
+        "--",
+        ".",
+        f":(exclude){MANIFEST_FILE_NAME}",
+        env=env,
+        cwd=example_path,
+    )
+    return run_git(work_tree, "write-tree", env=env, cwd=example_path).strip()
+
+
+def plan_branch_update(
+    example_id: str, tree: str, branch: str, remote: str
+) -> dict[str, Any] | None:
+    """
+    Create the commit publishing a tree to a branch, unless the branch already has it.
+
+    The commit builds on the local branch, or on the remote branch when only that exists,
+    so publishing again is a fast-forward. A new branch starts from HEAD.
+
+    Args:
+        example_id (str): Id of the example
+        tree (str): Object id of the example's tree
+        branch (str): Name of the branch to publish to
+        remote (str): Remote the branch is pushed to
+
+    Returns:
+        dict: The branch ref with its old and new commit, or None if it's up to date
+    """
+    ref = f"refs/heads/{branch}"
+    old_commit = _rev_parse(ref)
+    parent = old_commit or _rev_parse(f"refs/remotes/{remote}/{branch}") or "HEAD"
+    if _rev_parse(f"{parent}^{{tree}}") == tree:
+        if old_commit is None:
+            # The remote branch is up to date, only the local branch is missing
+            return {"ref": ref, "old": ZERO_OID, "new": _rev_parse(parent)}
+        return None
+    new_commit = run_git(
+        "commit-tree",
+        tree,
+        "-p",
+        parent,
+        "-m",
+        f"Example {example_id} with contents at root",
+    ).strip()
+    return {"ref": ref, "old": old_commit or ZERO_OID, "new": new_commit}
+
+
+def update_refs(updates: list[dict[str, Any]]) -> None:
+    """Move all branches in one transaction, failing if any of them moved meanwhile."""
+    commands = ["start"]
+    commands.extend(
+        f"update {update['ref']} {update['new']} {update['old']}" for update in updates
+    )
+    commands.extend(["prepare", "commit"])
+    run_git("update-ref", "--stdin", input="".join(f"{c}\n" for c in commands))
+
+
+def main(
+    example_id: str | None = None,
+    branch_prefix: str = "examples",
+    push: bool = False,
+    force: bool = False,
+    remote: str = "origin",
+) -> None:
+    """
+    Publish examples to branches with their files at the root, without touching the working tree.
+
+    Each example's tree is built from examples/<id> with a temporary index and committed
+    onto its '<branch_prefix>/<id>' branch. Unchanged examples are left alone.
+
+    Args:
+        example_id (str, optional): Specific example ID to publish. If None, all examples will be published.
+        branch_prefix (str, optional): Prefix of the branch names. Defaults to 'examples'.
+        push (bool, optional): Whether to push the updated branches. Defaults to False.
+        force (bool, optional): Whether to force push, replacing remote branches that were not fetched. Defaults to False.
+        remote (str, optional): Remote to push to. Defaults to 'origin'.
+    """
+    config = load_examples_config()
+    example_ids = [
+        ex["id"]
+        for ex in config["examples"]
+        if (not example_id or ex["id"] == example_id)
+        and (REPO_ROOT / "examples" / ex["id"]).is_dir()
+    ]
+    if not example_ids:
+        print(f"No generated example found with ID: {example_id}")
+        sys.exit(1)
+
+    current_branch = run_git("symbolic-ref", "--quiet", "--short", "HEAD", check=False)
+    updates = []
+    branches = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for current_id in example_ids:
+            branch = f"{branch_prefix}/{current_id}"
+            if branch == current_branch.strip():
+                print(f"Skipping {current_id}: branch {branch} is checked out")
+                continue
+            tree = build_example_tree(
+                REPO_ROOT / "examples" / current_id,
+                Path(temp_dir) / f"{current_id}.index",
+            )
+            update = plan_branch_update(current_id, tree, branch, remote)
+            branches.append(branch)
+            if update is None:
+                print(f"Up to date: {branch}")
+                continue
+            updates.append(update)
+            print(f"Updating {branch} to {update['new'][:12]}")
+
+    if updates:
+        update_refs(updates)
+    if push and branches:
+        refspecs = [f"{'+' if force else ''}{b}:refs/heads/{b}" for b in branches]
+        subprocess.run(["git", "push", remote, *refspecs], cwd=REPO_ROOT, check=True)
+    print(f"Published {len(branches)} example branch(es), {len(updates)} updated")
+
+
+def _rev_parse(rev: str) -> str | None:
+    output = run_git("rev-parse", "--quiet", "--verify", rev, check=False).strip()
+    return output or None
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,107 @@
+import json
+import subprocess
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from atomic_write import atomic_write
+from create_examples import read_example_manifest
+from fingerprint import get_cache_dir, hash_data, hash_files
+
+# Tools whose version changes the outcome of bootstrapping, building, linting and testing
+TOOLCHAIN_COMMANDS = {
+    "algokit": ["algokit", "--version"],
+    "poetry": ["poetry", "--version"],
+    "node": ["node", "--version"],
+    "puyapy": ["puyapy", "--version"],
+}
+
+
+@cache
+def get_toolchain_versions() -> dict[str, str]:
+    """Return the version output of each toolchain command, or 'not installed'."""
+    versions = {}
+    for name, command in TOOLCHAIN_COMMANDS.items():
+        try:
+            result = subprocess.run(
+                command, capture_output=True, text=True, timeout=60, check=False
+            )
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            versions[name] = "not installed"
+            continue
+        versions[name] = result.stdout.strip() or result.stderr.strip()
+    return versions
+
+
+def get_example_files(example_path: Path) -> list[str]:
+    """
+    List the files that make up an example's own content.
+
+    These are the files its templates rendered, as recorded in the example's manifest,
+    or the files git tracks for examples generated before manifests listed them. Files
+    that bootstrapping, building or testing the example write, such as installed
+    toolchains and generated clients, aren't part of it.
+
+    Args:
+        example_path (Path): Directory of the example
+
+    Returns:
+        list: Sorted paths of the files relative to the example directory
+    """
+    manifest = read_example_manifest(example_path)
+    if manifest and "files" in manifest:
+        return sorted(manifest["files"])
+    result = subprocess.run(
+        ["git", "ls-files", "-z", "--", "."],
+        cwd=example_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return sorted(filter(None, result.stdout.split("\0")))
+
+
+def get_example_result_key(example_path: Path) -> str:
+    """
+    Compute the key of an example's test results.
+
+    The key covers the example's own content, as listed by get_example_files, and the
+    versions of the toolchains the tests run with. Outputs of a previous run don't
+    change it, so results are reused from the second run on.
+
+    Args:
+        example_path (Path): Directory of the example
+
+    Returns:
+        str: Hex encoded key
+    """
+    return hash_data(
+        {
+            "files_hash": hash_files(example_path, get_example_files(example_path)),
+            "toolchain": get_toolchain_versions(),
+        }
+    )
+
+
+def get_cached_result(result_key: str, command: str) -> dict[str, Any] | None:
+    """Return the cached result of a passed command, or None on a cache miss."""
+    entry = get_cache_dir("example-results") / f"{result_key}-{command}.json"
+    try:
+        with open(entry, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def store_result(result_key: str, command: str, result: dict[str, Any]) -> None:
+    """
+    Record that a command passed for an example, written atomically.
+
+    Args:
+        result_key (str): Key of the example's test results
+        command (str): Command that passed
+        result (dict): Result to return for the command on later runs
+    """
+    entry = get_cache_dir("example-results") / f"{result_key}-{command}.json"
+    with atomic_write(entry) as f:
+        json.dump(result, f)
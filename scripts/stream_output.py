@@ -0,0 +1,277 @@
+import os
+import resource
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, Any
+
+from timings import RSS_UNIT, read_process_io
+
+# Characters of the end of each output stream kept in memory for error messages
+TAIL_BYTES = 64 * 1024
+# Seconds between progress reports of a running command
+PROGRESS_INTERVAL = 30.0
+# Seconds between checks whether a command exited
+POLL_INTERVAL = 0.1
+# Seconds the output of a command's children is still read after the command exited,
+# before children that keep its pipes open are killed
+EXIT_GRACE_PERIOD = 10.0
+
+# One lock per log file, so lines of commands sharing a log are written one at a time
+_log_locks: dict[Path, threading.Lock] = {}
+_log_locks_lock = threading.Lock()
+
+
+class OutputTail:
+    """Keep the last lines of a stream, up to a number of bytes."""
+
+    def __init__(self, max_bytes: int = TAIL_BYTES) -> None:
+        """
+        Args:
+            max_bytes (int, optional): Maximum size of the kept lines, in characters
+        """
+        self.max_bytes = max_bytes
+        self.last_line = ""
+        self._lines: deque[str] = deque()
+        self._size = 0
+        self._dropped = 0
+
+    def append(self, line: str) -> None:
+        self._lines.append(line)
+        self._size += len(line)
+        if line.strip():
+            self.last_line = line.rstrip()
+        # Always keep the last line, even when it's longer than the limit on its own
+        while self._size > self.max_bytes and len(self._lines) > 1:
+            dropped = self._lines.popleft()
+            self._size -= len(dropped)
+            self._dropped += len(dropped)
+
+    def getvalue(self) -> str:
+        text = "".join(self._lines)
+        if self._dropped:
+            return f"[... {self._dropped} earlier characters omitted]\n{text}"
+        return text
+
+
+class StreamedProcess(subprocess.CompletedProcess[str]):
+    """Result of run_streamed, with the wall time and resource usage of the command."""
+
+    def __init__(
+        self,
+        args: list[str],
+        returncode: int,
+        stdout: str,
+        stderr: str,
+        wall: float,
+        rusage: resource.struct_rusage,
+        io: dict[str, int] | None,
+    ) -> None:
+        super().__init__(args, returncode, stdout, stderr)
+        self.wall = wall
+        self.user_time = rusage.ru_utime
+        self.system_time = rusage.ru_stime
+        self.max_rss = rusage.ru_maxrss * RSS_UNIT
+        self.read_bytes = io["read_bytes"] if io else None
+        self.write_bytes = io["write_bytes"] if io else None
+
+    @property
+    def resources(self) -> dict[str, Any]:
+        """Return the CPU time, peak RSS and I/O of the command's process tree."""
+        return {
+            "user_time": self.user_time,
+            "system_time": self.system_time,
+            "max_rss": self.max_rss,
+            "read_bytes": self.read_bytes,
+            "write_bytes": self.write_bytes,
+        }
+
+
+def run_streamed(
+    cmd: list[str],
+    cwd: Path,
+    timeout: float,
+    log_path: Path,
+    env: dict[str, str] | None = None,
+    on_progress: Callable[[float, str], None] | None = None,
+    tail_bytes: int = TAIL_BYTES,
+) -> StreamedProcess:
+    """
+    Run a command, streaming its output line by line to a log file.
+
+    Only the last tail_bytes of stdout and stderr are kept in memory, and are returned
+    in place of the full output. Lines are appended to the log file as they arrive,
+    prefixed with the command and stream. Writes to a log file are serialized across
+    the threads of the process, so commands running concurrently can share one log
+    without their lines interleaving. The command is reaped with wait4, so its CPU time
+    and peak RSS cover the children it waited for. Its I/O counters are read just
+    before, while they cover them too. Children still holding the output pipes open
+    EXIT_GRACE_PERIOD seconds after the command exited, or at the deadline, are killed.
+
+    Args:
+        cmd (list): Command to run
+        cwd (Path): Directory to run the command in
+        timeout (float): Seconds before the command and its children are killed
+        log_path (Path): File the output is appended to
+        env (dict, optional): Environment of the command
+        on_progress (Callable, optional): Called with the elapsed seconds and the last
+            output line every PROGRESS_INTERVAL seconds while the command runs
+        tail_bytes (int, optional): Size of the end of each stream kept in memory
+
+    Returns:
+        StreamedProcess: The return code with the ends of stdout and stderr, the wall
+            time and CPU time in seconds, the peak RSS in bytes and the bytes read and
+            written, which are None where /proc isn't available
+
+    Raises:
+        subprocess.TimeoutExpired: If the command didn't finish in time, with the ends
+            of its output
+    """
+    label = " ".join(cmd)
+    stdout, stderr = OutputTail(tail_bytes), OutputTail(tail_bytes)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    lock = _get_log_lock(log_path)
+    start = time.monotonic()
+    with open(log_path, "a", errors="replace") as log_file:
+        try:
+            _write_line(log_file, lock, f"[{label}] started in {cwd}\n")
+            # A new session lets a timeout kill the whole process group, such as npm's children
+            process = subprocess.Popen(
+                cmd,
+                cwd=cwd,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors="replace",
+                bufsize=1,
+                start_new_session=True,
+            )
+            assert process.stdout is not None and process.stderr is not None
+            readers = [
+                threading.Thread(
+                    target=_pump,
+                    args=(
+                        process.stdout,
+                        stdout,
+                        log_file,
+                        lock,
+                        f"[{label}] stdout| ",
+                    ),
+                    daemon=True,
+                ),
+                threading.Thread(
+                    target=_pump,
+                    args=(
+                        process.stderr,
+                        stderr,
+                        log_file,
+                        lock,
+                        f"[{label}] stderr| ",
+                    ),
+                    daemon=True,
+                ),
+            ]
+            for reader in readers:
+                reader.start()
+
+            deadline = start + timeout
+            next_progress = start + PROGRESS_INTERVAL
+            while True:
+                # Wait without reaping, so the I/O counters of the exited command can be read
+                if os.waitid(
+                    os.P_PID, process.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT
+                ):
+                    io = read_process_io(process.pid)
+                    _, status, rusage = os.wait4(process.pid, 0)
+                    process.returncode = os.waitstatus_to_exitcode(status)
+                    break
+                now = time.monotonic()
+                if now >= deadline:
+                    _kill_process_group(process)
+                    for reader in readers:
+                        reader.join(5)
+                    _write_line(
+                        log_file, lock, f"[{label}] timed out after {timeout} seconds\n"
+                    )
+                    raise subprocess.TimeoutExpired(
+                        cmd, timeout, stdout.getvalue(), stderr.getvalue()
+                    )
+                if on_progress and now >= next_progress:
+                    on_progress(now - start, stderr.last_line or stdout.last_line)
+                    next_progress = now + PROGRESS_INTERVAL
+                time.sleep(min(POLL_INTERVAL, deadline - now))
+            wall = time.monotonic() - start
+            # Children that outlive the command, such as a daemon it started, can keep
+            # the pipes open forever
+            grace_deadline = min(deadline, time.monotonic() + EXIT_GRACE_PERIOD)
+            for reader in readers:
+                reader.join(max(grace_deadline - time.monotonic(), 0))
+            if any(reader.is_alive() for reader in readers):
+                _kill_process_group(process)
+                for reader in readers:
+                    reader.join(5)
+                _write_line(
+                    log_file,
+                    lock,
+                    f"[{label}] killed the children still writing to its output\n",
+                )
+            _write_line(
+                log_file,
+                lock,
+                f"[{label}] exited with code {process.returncode} after {wall:.1f} seconds\n",
+            )
+        finally:
+            # Readers that outlived even the kill must not write to the closed log
+            with lock:
+                log_file.close()
+    return StreamedProcess(
+        cmd,
+        process.returncode,
+        stdout.getvalue(),
+        stderr.getvalue(),
+        wall,
+        rusage,
+        io,
+    )
+
+
+def _pump(
+    stream: IO[str],
+    tail: OutputTail,
+    log_file: IO[str],
+    lock: threading.Lock,
+    prefix: str,
+) -> None:
+    with stream:
+        for line in stream:
+            tail.append(line)
+            if not line.endswith("\n"):
+                line += "\n"
+            _write_line(log_file, lock, prefix + line)
+
+
+def _get_log_lock(log_path: Path) -> threading.Lock:
+    with _log_locks_lock:
+        return _log_locks.setdefault(log_path.resolve(), threading.Lock())
+
+
+def _write_line(log_file: IO[str], lock: threading.Lock, line: str) -> None:
+    # One flushed write per line, so lines of other commands appending to the same log
+    # don't interleave with it
+    with lock:
+        if not log_file.closed:
+            log_file.write(line)
+            log_file.flush()
+
+
+def _kill_process_group(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.wait()
@@ -0,0 +1,176 @@
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import fire  # type: ignore[import-untyped]
+
+# Suffix of the JSON lines log files, one per example and one per process
+RECORDS_SUFFIX = ".jsonl"
+# Fields of a log record that are written as they are, not as extra fields
+RECORD_FIELDS = ("time", "level", "example", "command", "worker", "message")
+# Attributes every logging.LogRecord has, so anything else was passed as extra
+_STANDARD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_context: contextvars.ContextVar[dict[str, str] | None] = contextvars.ContextVar(
+    "log_context", default=None
+)
+
+
+@contextlib.contextmanager
+def log_context(**fields: str) -> Iterator[None]:
+    """Add fields, such as the example and command, to the records logged in a block."""
+    token = _context.set({**(_context.get() or {}), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class JsonLinesHandler(logging.Handler):
+    """
+    Write log records as JSON lines, to one file per example.
+
+    Records logged in a log_context with an example go to <example>.jsonl, and the
+    others to session-<pid>.jsonl, so concurrent commands and processes never share a
+    file. Each record is appended as a single line, opening the file for each write so
+    no file is left open.
+    """
+
+    def __init__(self, log_dir: Path, level: int = logging.NOTSET) -> None:
+        """
+        Args:
+            log_dir (Path): Directory the log files are written to
+            level (int, optional): Minimum level of the records written
+        """
+        super().__init__(level)
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            context = _context.get() or {}
+            entry = {
+                "time": datetime.fromtimestamp(record.created).isoformat(),
+                "level": record.levelname,
+                "example": context.get("example"),
+                "command": context.get("command"),
+                "worker": f"{record.process}/{record.threadName}",
+                "message": record.getMessage(),
+            }
+            entry.update(
+                (key, value)
+                for key, value in vars(record).items()
+                if key not in _STANDARD_ATTRIBUTES
+            )
+            if record.exc_info:
+                entry["exception"] = logging.Formatter().formatException(
+                    record.exc_info
+                )
+            name = entry["example"] or f"session-{os.getpid()}"
+            line = json.dumps(entry, default=str) + "\n"
+            with self._lock:
+                self.log_dir.mkdir(parents=True, exist_ok=True)
+                with open(self.log_dir / f"{name}{RECORDS_SUFFIX}", "a") as log_file:
+                    log_file.write(line)
+        except Exception:  # noqa: BLE001
+            self.handleError(record)
+
+
+def read_records(
+    log_dir: Path,
+    example: str | None = None,
+    command: str | None = None,
+    level: str = "DEBUG",
+) -> list[dict[str, Any]]:
+    """
+    Merge the JSON lines logs in a directory into one chronologically ordered list.
+
+    Args:
+        log_dir (Path): Directory with the log files
+        example (str, optional): Only keep the records of this example
+        command (str, optional): Only keep the records of this command
+        level (str, optional): Only keep records at this level or above. Defaults to DEBUG.
+
+    Returns:
+        list: Records ordered by time, records logged at the same time in file order
+    """
+    min_level = logging.getLevelName(level.upper())
+    paths = sorted(log_dir.glob(f"*{RECORDS_SUFFIX}"))
+    if example:
+        # Only the example's own file and the session files can have its records
+        paths = [
+            path
+            for path in paths
+            if path.stem == example or path.stem.startswith("session-")
+        ]
+    records = []
+    for path in paths:
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line of a killed process may be cut off
+                    continue
+                if example and record.get("example") != example:
+                    continue
+                if command and record.get("command") != command:
+                    continue
+                if logging.getLevelName(record["level"]) < min_level:
+                    continue
+                records.append(record)
+    records.sort(key=lambda record: record["time"])
+    return records
+
+
+def format_record(record: dict[str, Any]) -> str:
+    """Format a record as a line of text."""
+    where = "/".join(filter(None, [record.get("example"), record.get("command")]))
+    extra = {k: v for k, v in record.items() if k not in RECORD_FIELDS}
+    line = f"{record['time']} {record['level']:<8} [{where or '-'}] {record['message']}"
+    if extra:
+        line += f" {json.dumps(extra, default=str)}"
+    return line
+
+
+def merge(
+    log_dir: str = "test_examples_logs",
+    example: str | None = None,
+    command: str | None = None,
+    level: str = "DEBUG",
+    output: str | None = None,
+    json_lines: bool = False,
+) -> None:
+    """
+    Show the logs of the example tests in chronological order.
+
+    Args:
+        log_dir (str, optional): Directory with the log files. Defaults to test_examples_logs.
+        example (str, optional): Only show the records of this example
+        command (str, optional): Only show the records of this command, such as 'build'
+        level (str, optional): Only show records at this level or above. Defaults to DEBUG.
+        output (str, optional): File to write to instead of the standard output
+        json_lines (bool, optional): Write the records as JSON lines instead of text. Defaults to False.
+    """
+    records = read_records(Path(log_dir), example, command, level)
+    lines = (
+        json.dumps(record) if json_lines else format_record(record)
+        for record in records
+    )
+    if output:
+        with open(output, "w") as f:
+            f.writelines(line + "\n" for line in lines)
+    else:
+        for line in lines:
+            print(line)
+
+
+if __name__ == "__main__":
+    fire.Fire({"merge": merge})
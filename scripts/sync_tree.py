@@ -0,0 +1,151 @@
+import filecmp
+import fnmatch
+import os
+import shutil
+from collections.abc import Iterable
+from pathlib import Path, PurePosixPath
+
+from template_cache import clone_file
+
+# Paths created by bootstrapping, building or testing an example rather than by its
+# templates. Each pattern matches a run of path components anywhere in the example.
+DEFAULT_PRESERVE_PATTERNS = [
+    ".venv",
+    "node_modules",
+    # Written by 'algokit project bootstrap' from .env.template
+    ".env",
+    ".env.*",
+    # Clients generated from the compiled contracts, in contract and frontend projects
+    "smart_contracts/artifacts",
+    "src/contracts",
+    "__pycache__",
+    ".pytest_cache",
+    ".mypy_cache",
+    ".ruff_cache",
+    "dist",
+    "package-lock.json",
+    "poetry.lock",
+]
+
+
+def is_preserved(relative_path: PurePosixPath, patterns: Iterable[str]) -> bool:
+    """
+    Check whether a path falls under one of the preserve patterns.
+
+    Args:
+        relative_path (PurePosixPath): Path relative to the root of the synced tree
+        patterns (Iterable[str]): Preserve patterns such as 'node_modules' or
+            'smart_contracts/artifacts'. Components may use fnmatch wildcards.
+
+    Returns:
+        bool: True if the path or one of its parents matches a pattern
+    """
+    parts = relative_path.parts
+    for pattern in patterns:
+        pattern_parts = PurePosixPath(pattern).parts
+        for start in range(len(parts) - len(pattern_parts) + 1):
+            window = parts[start : start + len(pattern_parts)]
+            if all(fnmatch.fnmatchcase(p, pp) for p, pp in zip(window, pattern_parts)):
+                return True
+    return False
+
+
+def sync_tree(
+    source: Path, destination: Path, preserve: Iterable[str] = ()
+) -> dict[str, int]:
+    """
+    Make a destination tree match a source tree by applying only the file level diff.
+
+    Files missing from the destination are added, files whose content or mode differ are
+    replaced atomically, and files that no longer exist in the source are deleted.
+    Preserved paths in the destination are never deleted and aren't descended into.
+
+    Args:
+        source (Path): Freshly rendered tree
+        destination (Path): Existing tree to update in place
+        preserve (Iterable[str], optional): Patterns of destination paths to leave alone
+
+    Returns:
+        dict: Number of files 'added', 'updated', 'deleted' and 'unchanged'
+    """
+    preserve = list(preserve)
+    stats = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    destination.mkdir(parents=True, exist_ok=True)
+
+    source_files = set()
+    for root, dirs, files in os.walk(source):
+        relative_root = Path(root).relative_to(source)
+        for name in dirs:
+            dst_dir = destination / relative_root / name
+            if dst_dir.is_symlink() or (dst_dir.exists() and not dst_dir.is_dir()):
+                dst_dir.unlink()
+            dst_dir.mkdir(exist_ok=True)
+        for name in files:
+            relative_path = relative_root / name
+            source_files.add(relative_path)
+            src_file = source / relative_path
+            dst_file = destination / relative_path
+            if dst_file.is_dir() and not dst_file.is_symlink():
+                shutil.rmtree(dst_file)
+            if not dst_file.exists() and not dst_file.is_symlink():
+                _replace_file(src_file, dst_file)
+                stats["added"] += 1
+            elif _files_differ(src_file, dst_file):
+                _replace_file(src_file, dst_file)
+                stats["updated"] += 1
+            else:
+                stats["unchanged"] += 1
+
+    # Delete what the templates no longer produce, bottom up so emptied directories go too
+    for root, dirs, files in os.walk(destination, topdown=True):
+        relative_root = Path(root).relative_to(destination)
+        dirs[:] = [
+            d
+            for d in dirs
+            if not is_preserved(PurePosixPath(relative_root / d), preserve)
+        ]
+        for name in files:
+            relative_path = relative_root / name
+            if relative_path in source_files:
+                continue
+            if is_preserved(PurePosixPath(relative_path), preserve):
+                continue
+            (destination / relative_path).unlink()
+            stats["deleted"] += 1
+    for root, dirs, _ in os.walk(destination, topdown=False):
+        relative_root = Path(root).relative_to(destination)
+        for name in dirs:
+            dir_path = Path(root) / name
+            relative_path = relative_root / name
+            if (
+                not (source / relative_path).is_dir()
+                and not is_preserved(PurePosixPath(relative_path), preserve)
+                and dir_path.is_dir()
+                and not dir_path.is_symlink()
+                and not any(dir_path.iterdir())
+            ):
+                dir_path.rmdir()
+
+    return stats
+
+
+def _files_differ(source: Path, destination: Path) -> bool:
+    if source.is_symlink() or destination.is_symlink():
+        return not (
+            source.is_symlink()
+            and destination.is_symlink()
+            and os.readlink(source) == os.readlink(destination)
+        )
+    if os.stat(source).st_mode != os.stat(destination).st_mode:
+        return True
+    return not filecmp.cmp(source, destination, shallow=False)
+
+
+def _replace_file(source: Path, destination: Path) -> None:
+    """Replace a destination file with a copy of the source without a partial state."""
+    temp_file = destination.with_name(f".{destination.name}.sync-tmp")
+    if source.is_symlink():
+        os.symlink(os.readlink(source), temp_file)
+    else:
+        clone_file(source, temp_file)
+    os.replace(temp_file, destination)
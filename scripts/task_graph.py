@@ -0,0 +1,183 @@
+import heapq
+import threading
+from collections.abc import Callable, Hashable, Iterable
+from concurrent.futures import Future
+from typing import Any
+
+
+class DependencyFailedError(Exception):
+    """Raised for a task that didn't run because one of its dependencies failed."""
+
+
+class TaskGraph:
+    """
+    Run tasks with dependencies between them on a fixed number of worker threads.
+
+    A task starts as soon as all of its dependencies succeeded and a worker is free. When
+    several tasks are ready, the one with the most tasks depending on it, directly or
+    transitively, goes first so long chains start early and independent work fills the
+    remaining workers. Tasks can also use resources, such as a package manager's cache,
+    with a limit on how many tasks use each at the same time: a ready task whose
+    resources are all busy waits while the next ready task goes first. Tasks whose
+    dependencies failed don't run and fail with DependencyFailedError.
+    """
+
+    def __init__(
+        self, jobs: int = 1, limits: dict[Hashable, int] | None = None
+    ) -> None:
+        """
+        Args:
+            jobs (int, optional): Maximum number of tasks to run at the same time
+            limits (dict, optional): Maximum number of tasks using each resource at the
+                same time, resources without a limit can be used by any number of tasks
+        """
+        self.jobs = max(jobs, 1)
+        self.limits = {
+            resource: max(limit, 1) for resource, limit in (limits or {}).items()
+        }
+        self._funcs: dict[Hashable, Callable[[], Any]] = {}
+        self._dependencies: dict[Hashable, list[Hashable]] = {}
+        self._dependents: dict[Hashable, list[Hashable]] = {}
+        self._resources: dict[Hashable, list[Hashable]] = {}
+        self._busy: dict[Hashable, int] = {}
+        self._futures: dict[Hashable, Future] = {}
+        self._order: dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self._ready: list[tuple[int, int, Hashable]] = []
+        self._waiting: dict[Hashable, int] = {}
+        self._priorities: dict[Hashable, int] = {}
+        self._running = 0
+        self._cancelled = False
+
+    def add(
+        self,
+        key: Hashable,
+        func: Callable[[], Any],
+        dependencies: Iterable[Hashable] = (),
+        resources: Iterable[Hashable] = (),
+    ) -> None:
+        """
+        Add a task to the graph. Dependencies must be added before their dependents.
+
+        Args:
+            key (Hashable): Unique key of the task
+            func (Callable): Function to run, its return value is the task's result
+            dependencies (Iterable, optional): Keys of the tasks that must succeed first
+            resources (Iterable, optional): Resources the task uses while it runs
+        """
+        dependencies = list(dependencies)
+        missing = [d for d in dependencies if d not in self._funcs]
+        if missing:
+            raise ValueError(f"Task {key!r} depends on unknown tasks: {missing}")
+        self._funcs[key] = func
+        self._dependencies[key] = dependencies
+        self._resources[key] = list(resources)
+        self._dependents[key] = []
+        self._futures[key] = Future()
+        self._order[key] = len(self._order)
+        for dependency in dependencies:
+            self._dependents[dependency].append(key)
+
+    def start(self) -> "TaskGraph":
+        """Start running the tasks in the background and return the graph."""
+        with self._lock:
+            self._priorities = self._get_priorities()
+            for key, dependencies in self._dependencies.items():
+                self._waiting[key] = len(dependencies)
+                if not dependencies:
+                    self._push_ready(key)
+            self._dispatch()
+        return self
+
+    def result(self, key: Hashable, timeout: float | None = None) -> Any:
+        """
+        Wait for a task and return its result, or raise the exception it failed with.
+
+        Args:
+            key (Hashable): Key of the task
+            timeout (float, optional): Seconds to wait before raising TimeoutError
+        """
+        return self._futures[key].result(timeout)
+
+    def cancel(self) -> None:
+        """Don't start any more tasks. Running tasks finish, others are cancelled."""
+        with self._lock:
+            self._cancelled = True
+            for future in self._futures.values():
+                future.cancel()
+
+    def _get_priorities(self) -> dict[Hashable, int]:
+        """Count the tasks that depend on each task, directly or transitively."""
+        descendants: dict[Hashable, set[Hashable]] = {}
+        # Dependents are always added after their dependencies, so visit in reverse
+        for key in reversed(list(self._funcs)):
+            descendants[key] = set()
+            for dependent in self._dependents[key]:
+                descendants[key] |= {dependent, *descendants[dependent]}
+        return {key: len(keys) for key, keys in descendants.items()}
+
+    def _push_ready(self, key: Hashable) -> None:
+        heapq.heappush(self._ready, (-self._priorities[key], self._order[key], key))
+
+    def _dispatch(self) -> None:
+        """Start ready tasks while workers are free. Must be called with the lock held."""
+        blocked = []
+        while self._ready and self._running < self.jobs and not self._cancelled:
+            item = heapq.heappop(self._ready)
+            key = item[2]
+            future = self._futures[key]
+            # Skip tasks that were cancelled or already failed through another dependency
+            if future.done():
+                continue
+            if any(
+                self._busy.get(resource, 0) >= self.limits[resource]
+                for resource in self._resources[key]
+                if resource in self.limits
+            ):
+                blocked.append(item)
+                continue
+            if not future.set_running_or_notify_cancel():
+                continue
+            self._running += 1
+            for resource in self._resources[key]:
+                self._busy[resource] = self._busy.get(resource, 0) + 1
+            threading.Thread(
+                target=self._run, args=(key,), name=f"task-{key}", daemon=True
+            ).start()
+        # Tasks waiting for a resource go first again once it's released
+        for item in blocked:
+            heapq.heappush(self._ready, item)
+
+    def _run(self, key: Hashable) -> None:
+        future = self._futures[key]
+        try:
+            result = self._funcs[key]()
+        except BaseException as e:  # noqa: BLE001
+            # BaseException so pytest outcomes raised by a task reach whoever waits on it
+            future.set_exception(e)
+            failed = True
+        else:
+            future.set_result(result)
+            failed = False
+        with self._lock:
+            self._running -= 1
+            for resource in self._resources[key]:
+                self._busy[resource] -= 1
+            if failed:
+                self._fail_dependents(key)
+            else:
+                for dependent in self._dependents[key]:
+                    self._waiting[dependent] -= 1
+                    if self._waiting[dependent] == 0:
+                        self._push_ready(dependent)
+            self._dispatch()
+
+    def _fail_dependents(self, key: Hashable) -> None:
+        for dependent in self._dependents[key]:
+            future = self._futures[dependent]
+            if future.done() or not future.set_running_or_notify_cancel():
+                continue
+            future.set_exception(
+                DependencyFailedError(f"{dependent!r} didn't run, {key!r} failed")
+            )
+            self._fail_dependents(dependent)
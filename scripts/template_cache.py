@@ -0,0 +1,156 @@
+import errno
+import fcntl
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+from atomic_write import atomic_write_tree
+from fingerprint import (
+    get_cache_dir,
+    get_package_version,
+    hash_data,
+    hash_rendering_scripts,
+    hash_tree,
+)
+
+# ioctl request number for FICLONE from linux/fs.h
+FICLONE = 0x40049409
+COPIER_CONFIG_FILE_NAMES = ["copier.yml", "copier.yaml"]
+# Answers that only locate the example on disk. Templates that use them are never cached.
+LOCATION_ANSWERS = ["_base_destination_path"]
+
+_reflink_supported = True
+
+
+def is_cacheable(source: Path, destination: Path) -> bool:
+    """
+    Check whether rendering a template into a destination can be served from the cache.
+
+    A render is only a pure function of the template and its answers when it starts from
+    an empty destination and the template doesn't write outside of its destination.
+
+    Args:
+        source (Path): Path to the template source
+        destination (Path): Path the template will be rendered into
+
+    Returns:
+        bool: True if the rendered output can be cached
+    """
+    if destination.exists() and any(destination.iterdir()):
+        return False
+    config_file = find_copier_config(source)
+    if not config_file:
+        return False
+    config = config_file.read_text()
+    return not any(answer in config for answer in LOCATION_ANSWERS)
+
+
+def find_copier_config(source: Path) -> Path | None:
+    """Return the copier config file of a template source, if it has one."""
+    for file_name in COPIER_CONFIG_FILE_NAMES:
+        config_file = source / file_name
+        if config_file.exists():
+            return config_file
+    return None
+
+
+def get_cache_key(source: Path, destination: Path, data: dict[str, Any]) -> str:
+    """
+    Compute the cache key of a template render.
+
+    Args:
+        source (Path): Path to the template source
+        destination (Path): Path the template will be rendered into
+        data (dict): Answers passed to copier
+
+    Returns:
+        str: Hex encoded cache key
+    """
+    repo_root = Path(data.get("_repo_root", source))
+    return hash_data(
+        {
+            "tree_hash": hash_tree(source),
+            "scripts_hash": hash_rendering_scripts(repo_root),
+            "data": {k: v for k, v in data.items() if k not in LOCATION_ANSWERS},
+            # Copier exposes the destination folder name to templates as _folder_name
+            "folder_name": destination.name,
+            "copier_version": get_package_version("copier"),
+        }
+    )
+
+
+def get_cached_render(cache_key: str) -> Path | None:
+    """Return the cached render for a key, or None on a cache miss."""
+    entry = get_cache_dir("rendered-templates") / cache_key
+    return entry if entry.is_dir() else None
+
+
+def store_render(cache_key: str, rendered_path: Path) -> None:
+    """
+    Store a rendered template in the cache.
+
+    The entry is written with atomic_write_tree, so when several workers store the same
+    render the first one wins.
+
+    Args:
+        cache_key (str): Cache key of the render
+        rendered_path (Path): Directory containing the rendered template
+    """
+    with atomic_write_tree(get_cache_dir("rendered-templates") / cache_key) as staging:
+        materialize_tree(rendered_path, staging)
+
+
+def materialize_tree(source: Path, destination: Path) -> None:
+    """
+    Recreate a directory tree at a destination, cloning files where possible.
+
+    Files are cloned with reflinks (copy-on-write) on filesystems that support them and
+    copied otherwise. Hardlinks aren't used because copier and the merge scripts rewrite
+    files in place, which would silently modify the cached copy too.
+
+    Args:
+        source (Path): Directory to materialize
+        destination (Path): Directory to materialize it into
+    """
+    destination.mkdir(parents=True, exist_ok=True)
+    for root, dirs, files in os.walk(source):
+        relative_root = Path(root).relative_to(source)
+        for name in list(dirs):
+            src_dir = Path(root) / name
+            dst_dir = destination / relative_root / name
+            if src_dir.is_symlink():
+                os.symlink(os.readlink(src_dir), dst_dir)
+                dirs.remove(name)
+            else:
+                dst_dir.mkdir(exist_ok=True)
+        for name in files:
+            src_file = Path(root) / name
+            dst_file = destination / relative_root / name
+            if src_file.is_symlink():
+                os.symlink(os.readlink(src_file), dst_file)
+            else:
+                clone_file(src_file, dst_file)
+
+
+def clone_file(source: Path, destination: Path) -> None:
+    """Clone a file with a reflink if the filesystem supports it, otherwise copy it."""
+    global _reflink_supported
+    if _reflink_supported:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                shutil.copymode(source, destination)
+                return
+            except OSError as e:
+                if e.errno not in (
+                    errno.EOPNOTSUPP,
+                    errno.ENOTTY,
+                    errno.EXDEV,
+                    errno.EINVAL,
+                ):
+                    raise
+                # Files on different filesystems can't be cloned, but others still can
+                if e.errno != errno.EXDEV:
+                    _reflink_supported = False
+    shutil.copy2(source, destination)
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import environment_pool
+import pytest
+from environment_pool import restore_environments, store_environments
+from fingerprint import CACHE_DIR_ENV_VAR
+
+# Relative path of the site-packages directory in the fake venvs
+SITE_PACKAGES = Path("lib") / "python3.12" / "site-packages"
+
+
+@pytest.fixture(autouse=True)
+def isolated_pool(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(tmp_path / "cache"))
+    # Don't ask poetry or the python on the PATH, every venv is built for the same one
+    monkeypatch.setattr(environment_pool, "get_runtime_version", lambda *_: "3.12.1")
+
+
+def make_project(example_path: Path, lock: str | None = "lock") -> Path:
+    project_path = example_path / "projects" / "contracts"
+    project_path.mkdir(parents=True)
+    (project_path / "pyproject.toml").write_text("[tool.poetry]\nname = 'app'\n")
+    if lock is not None:
+        (project_path / "poetry.lock").write_text(lock)
+    return project_path
+
+
+def make_venv(project_path: Path, pth: str | None = None) -> Path:
+    venv = (project_path / ".venv").resolve()
+    site_packages = venv / SITE_PACKAGES
+    dist_info = site_packages / "algokit_utils-4.0.0.dist-info"
+    dist_info.mkdir(parents=True)
+    (venv / "bin").mkdir()
+    (venv / "bin" / "pytest").write_text(f"#!{venv}/bin/python\nimport pytest\n")
+    (venv / "pyvenv.cfg").write_text(f"home = /usr/bin\ncommand = {venv}\n")
+    (site_packages / "algokit.pth").write_text(pth or f"{venv}/src\n")
+    (dist_info / "direct_url.json").write_text(
+        f'{{"url": "file://{venv}/wheels/algokit_utils.whl"}}'
+    )
+    return venv
+
+
+def test_restored_environments_point_at_their_new_location(tmp_path: Path) -> None:
+    old_venv = make_venv(make_project(tmp_path / "first"))
+    assert store_environments(tmp_path / "first") == [
+        tmp_path / "first" / "projects" / "contracts" / ".venv"
+    ]
+    new_project = make_project(tmp_path / "second")
+
+    assert restore_environments(tmp_path / "second") == [new_project / ".venv"]
+
+    new_venv = (new_project / ".venv").resolve()
+    for path in [
+        Path("bin") / "pytest",
+        Path("pyvenv.cfg"),
+        SITE_PACKAGES / "algokit.pth",
+        SITE_PACKAGES / "algokit_utils-4.0.0.dist-info" / "direct_url.json",
+    ]:
+        content = (new_venv / path).read_text()
+        assert str(new_venv) in content, path
+        assert str(old_venv) not in content, path
+    # The pooled copy and the original environment keep their own paths
+    assert str(old_venv) in (old_venv / SITE_PACKAGES / "algokit.pth").read_text()
+
+
+def test_only_environments_of_the_same_lock_file_are_restored(
+    tmp_path: Path,
+) -> None:
+    make_venv(make_project(tmp_path / "first", lock="lock"))
+    store_environments(tmp_path / "first")
+    make_project(tmp_path / "second", lock="other lock")
+
+    assert restore_environments(tmp_path / "second") == []
+
+
+def test_projects_without_a_lock_file_get_neither_a_lock_nor_an_environment(
+    tmp_path: Path,
+) -> None:
+    make_venv(make_project(tmp_path / "first"))
+    store_environments(tmp_path / "first")
+    project_path = make_project(tmp_path / "second", lock=None)
+
+    assert restore_environments(tmp_path / "second") == []
+    assert sorted(path.name for path in project_path.iterdir()) == ["pyproject.toml"]
+
+
+def test_existing_environments_are_left_alone(tmp_path: Path) -> None:
+    make_venv(make_project(tmp_path / "first"))
+    store_environments(tmp_path / "first")
+    project_path = make_project(tmp_path / "second")
+    (project_path / ".venv").mkdir()
+
+    assert restore_environments(tmp_path / "second") == []
+    assert not any((project_path / ".venv").iterdir())
+
+
+def test_environments_with_installs_of_their_own_project_are_not_pooled(
+    tmp_path: Path,
+) -> None:
+    project_path = make_project(tmp_path / "first")
+    make_venv(project_path, pth=f"{project_path.resolve()}/smart_contracts\n")
+
+    assert store_environments(tmp_path / "first") == []
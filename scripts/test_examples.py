@@ -1,30 +1,62 @@
-import subprocess
+import functools
 import logging
+import sqlite3
+import subprocess
+from collections.abc import Callable, Iterator
 from pathlib import Path
+from typing import Any
 
 import pytest
+from bootstrap_examples import (
+    get_package_managers,
+    restore_pooled_environments,
+    store_pooled_environments,
+)
+from result_cache import get_cached_result, get_example_result_key, store_result
+from stream_output import StreamedProcess, run_streamed
+from structured_log import RECORDS_SUFFIX, JsonLinesHandler, log_context, merge
+from task_graph import DependencyFailedError, TaskGraph
+from timing_history import (
+    DEFAULT_SLOWDOWN_FACTOR,
+    get_adaptive_timeout,
+    record_command_run,
+)
 
-# Configure logging
+# Configure logging, records are also written per example by the structured_logs fixture
 logging.basicConfig(
     level=logging.DEBUG,
     format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(), logging.FileHandler("test_examples.log")],
+    handlers=[logging.StreamHandler()],
 )
 logger = logging.getLogger(__name__)
+# basicConfig does nothing under pytest, which already configured the root logger
+logger.setLevel(logging.DEBUG)
 
+# Timeouts of commands without enough recorded history for an adaptive timeout
 BOOTSTRAP_TIMEOUT = 180
 COMMAND_TIMEOUT = 300
+BOOTSTRAP_COMMAND = "bootstrap"
 COMMANDS = ["build", "lint", "test"]
+# Commands that must succeed before each command runs in the same example
+COMMAND_DEPENDENCIES = {
+    "build": [BOOTSTRAP_COMMAND],
+    "lint": [BOOTSTRAP_COMMAND],
+    "test": ["build"],
+}
+EXAMPLES_DIR = Path(__file__).parent.parent / "examples"
+# Directory with the full output of each example's commands and the JSON lines logs
+EXAMPLE_LOGS_DIR = Path("test_examples_logs")
+# Chronological report of the JSON lines logs, merged at the end of the session
+MERGED_LOG_PATH = Path("test_examples.log")
 
 
 def get_example_folders() -> list[str]:
     """Return directory names from the examples folder."""
-    examples_dir = Path(__file__).parent.parent / "examples"
-    logger.info(f"Scanning examples directory: {examples_dir}")
+    logger.info(f"Scanning examples directory: {EXAMPLES_DIR}")
 
     folders = [
         folder.name
-        for folder in examples_dir.iterdir()
+        for folder in EXAMPLES_DIR.iterdir()
         if folder.is_dir() and not folder.name.startswith(".")
     ]
 
@@ -32,14 +64,24 @@ def get_example_folders() -> list[str]:
     return folders
 
 
+def get_example_log_path(example_folder: str) -> Path:
+    """Return the file the output of an example's commands is streamed to."""
+    return EXAMPLE_LOGS_DIR / f"{example_folder}.log"
+
+
 def _run_command(
     cmd: list[str],
     cwd: Path,
-    timeout: int,
+    timeout: float,
     env_overrides: dict[str, str] | None = None,
     env_removals: list[str] | None = None,
-) -> subprocess.CompletedProcess[str]:
-    """Run subprocess command with error handling and comprehensive logging."""
+    command_name: str | None = None,
+) -> StreamedProcess:
+    """
+    Run subprocess command with error handling and comprehensive logging.
+
+    When command_name is given, the run is recorded in the timing history under it.
+    """
     cmd_str = " ".join(cmd)
     logger.info(f"Executing command: {cmd_str} in directory: {cwd}")
 
@@ -53,25 +95,32 @@ def _run_command(
         for key in env_removals:
             env.pop(key, None)
 
+    log_path = get_example_log_path(cwd.name)
+
+    def log_progress(elapsed: float, last_line: str) -> None:
+        logger.info(
+            f"Still running '{cmd_str}' in {cwd.name} after {elapsed:.0f}s: {last_line}"
+        )
+
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            check=False,
-            env=env,
+        # Output goes to the example's log as it arrives, only its end is kept in memory
+        result = run_streamed(
+            cmd, cwd, timeout, log_path, env=env, on_progress=log_progress
         )
 
         # Log command completion details
-        logger.info(f"Command completed with return code: {result.returncode}")
-
-        # Always log stdout and stderr for debugging purposes
-        if result.stdout:
-            logger.debug(f"STDOUT for '{cmd_str}':\n{result.stdout}")
-        if result.stderr:
-            logger.debug(f"STDERR for '{cmd_str}':\n{result.stderr}")
+        logger.info(
+            f"Command completed with return code: {result.returncode}, "
+            f"output in {log_path}"
+        )
+        logger.info(
+            f"Resources used by '{cmd_str}': {format_resources(result)}",
+            extra={"resources": result.resources},
+        )
+        if command_name:
+            _record_timing(
+                cwd.name, command_name, result.wall, result.returncode, result.resources
+            )
 
         # Log warning if command failed but didn't raise exception
         if result.returncode != 0:
@@ -83,10 +132,17 @@ def _run_command(
 
     except subprocess.TimeoutExpired as e:
         logger.error(
-            f"Command '{cmd_str}' timed out after {timeout} seconds in {cwd.name}"
+            f"Command '{cmd_str}' timed out after {timeout:.0f} seconds in {cwd.name}"
         )
+        if command_name:
+            _record_timing(cwd.name, command_name, timeout, None, {})
         logger.error(f"Timeout details: {e}")
-        pytest.fail(f"Command {cmd_str} timed out in {cwd.name}")
+        pytest.fail(
+            f"Command {cmd_str} timed out in {cwd.name}\n"
+            f"Full output: {log_path}\n"
+            f"STDOUT (end): {e.stdout!s}\n"
+            f"STDERR (end): {e.stderr!s}"
+        )
     except FileNotFoundError as e:
         logger.error(f"Command not found: {cmd_str}")
         logger.error(f"FileNotFoundError details: {e}")
@@ -99,69 +155,317 @@ def _run_command(
         raise
 
 
-@pytest.mark.parametrize("example_folder", get_example_folders())
-def test_example_commands(example_folder: str) -> None:
-    """Test algokit commands run successfully in example folders."""
-    logger.info(f"Starting test for example folder: {example_folder}")
+def format_resources(result: StreamedProcess) -> str:
+    """Describe the CPU time, peak RSS and I/O of a command's process tree."""
+    resources = [
+        f"wall {result.wall:.1f}s",
+        f"user {result.user_time:.1f}s",
+        f"system {result.system_time:.1f}s",
+        f"peak RSS {result.max_rss / 2**20:.0f} MiB",
+    ]
+    if result.read_bytes is not None and result.write_bytes is not None:
+        resources.append(f"read {result.read_bytes / 2**20:.1f} MiB")
+        resources.append(f"written {result.write_bytes / 2**20:.1f} MiB")
+    return ", ".join(resources)
+
+
+def _record_timing(
+    example_folder: str,
+    command_name: str,
+    wall: float,
+    exit_code: int | None,
+    resources: dict[str, Any],
+) -> None:
+    """Record a command run in the timing history and warn if it got slower."""
+    try:
+        median = record_command_run(
+            "test_examples", example_folder, command_name, wall, exit_code, **resources
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"Couldn't record the timing of '{command_name}': {e}")
+        return
+    if median is not None:
+        logger.warning(
+            f"'{command_name}' in {example_folder} took {wall:.1f}s, more than "
+            f"{DEFAULT_SLOWDOWN_FACTOR}x its rolling median of {median:.1f}s"
+        )
+
 
-    examples_dir = Path(__file__).parent.parent / "examples"
-    example_path = examples_dir / example_folder
+def get_command_timeout(example_folder: str, command: str, default: int) -> float:
+    """Return the timeout of a command, derived from its timing history if there is one."""
+    try:
+        # A cold bootstrap takes far longer than the warm ones in the history
+        timeout = get_adaptive_timeout(
+            example_folder,
+            command,
+            default,
+            allow_shorter=command != BOOTSTRAP_COMMAND,
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"Couldn't read the timing history of '{command}': {e}")
+        return default
+    logger.info(f"Timeout of '{command}' in {example_folder}: {timeout:.0f}s")
+    return timeout
+
+
+def run_bootstrap(example_folder: str) -> dict[str, Any]:
+    """
+    Run 'algokit project bootstrap all' in an example folder, failing the test on errors.
 
+    Returns:
+        dict: Resources used by the bootstrap, as StreamedProcess.resources
+    """
+    example_path = EXAMPLES_DIR / example_folder
     assert example_path.exists() and example_path.is_dir()
     logger.debug(f"Confirmed example path exists: {example_path}")
 
-    # Bootstrap command
+    restore_pooled_environments(example_path, logger.info)
     logger.info(f"Running bootstrap command for {example_folder}")
     bootstrap_result = _run_command(
         ["algokit", "-v", "project", "bootstrap", "all"],
         example_path,
-        BOOTSTRAP_TIMEOUT,
+        get_command_timeout(example_folder, BOOTSTRAP_COMMAND, BOOTSTRAP_TIMEOUT),
         env_removals=["CI"],
+        command_name=BOOTSTRAP_COMMAND,
     )
 
     if bootstrap_result.returncode != 0:
         error_msg = (
             f"Command 'algokit project bootstrap all' failed in {example_folder}\n"
             f"Return code: {bootstrap_result.returncode}\n"
-            f"STDOUT: {bootstrap_result.stdout}\n"
-            f"STDERR: {bootstrap_result.stderr}"
+            f"Full output: {get_example_log_path(example_folder)}\n"
+            f"Resources: {format_resources(bootstrap_result)}\n"
+            f"STDOUT (end): {bootstrap_result.stdout}\n"
+            f"STDERR (end): {bootstrap_result.stderr}"
         )
         logger.error(error_msg)
         pytest.fail(error_msg)
     else:
+        store_pooled_environments(example_path, logger.info)
         logger.info(f"Bootstrap completed successfully for {example_folder}")
+    return bootstrap_result.resources
+
+
+def run_project_command(
+    example_folder: str, command: str
+) -> tuple[str | None, dict[str, Any]]:
+    """
+    Run 'algokit project run <command>' in an example folder, failing the test on errors.
+
+    Returns:
+        tuple: Reason to skip the test if the example doesn't define the command, or
+            None, and the resources used by the command, as StreamedProcess.resources
+    """
+    example_path = EXAMPLES_DIR / example_folder
+    logger.info(f"Running '{command}' command for {example_folder}")
+    result = _run_command(
+        ["algokit", "-v", "project", "run", command],
+        example_path,
+        get_command_timeout(example_folder, command, COMMAND_TIMEOUT),
+        command_name=command,
+    )
+
+    if "No such command" in result.stderr:
+        skip_msg = f"Command 'algokit project run {command}' not found in {example_folder}, skipping..."
+        logger.info(skip_msg)
+        return skip_msg, result.resources
 
-    # Test individual commands
-    for command in COMMANDS:
-        logger.info(f"Running '{command}' command for {example_folder}")
-        result = _run_command(
-            ["algokit", "-v", "project", "run", command], example_path, COMMAND_TIMEOUT
+    if result.returncode != 0:
+        error_msg = (
+            f"Command 'algokit project run {command}' failed in {example_folder}\n"
+            f"Return code: {result.returncode}\n"
+            f"Full output: {get_example_log_path(example_folder)}\n"
+            f"Resources: {format_resources(result)}\n"
+            f"STDOUT (end): {result.stdout}\n"
+            f"STDERR (end): {result.stderr}"
         )
+        logger.error(error_msg)
+        pytest.fail(error_msg)
+    logger.info(f"Command '{command}' completed successfully for {example_folder}")
+    return None, result.resources
 
-        if "No such command" in result.stderr:
-            logger.info(
-                f"Command 'algokit project run {command}' not found in {example_folder}, skipping..."
-            )
-            print(
-                f"Command 'algokit project run {command}' not found in {example_folder}, skipping..."
-            )
-            continue
 
-        if result.returncode != 0:
-            error_msg = (
-                f"Command 'algokit project run {command}' failed in {example_folder}\n"
-                f"Return code: {result.returncode}\n"
-                f"STDOUT: {result.stdout}\n"
-                f"STDERR: {result.stderr}"
-            )
-            logger.error(error_msg)
-            pytest.fail(error_msg)
+def run_example_command(
+    example_folder: str, command: str, result_key: str
+) -> dict[str, Any]:
+    """Run a command in an example folder and record it in the result cache if it passes."""
+    with log_context(example=example_folder, command=command):
+        if command == BOOTSTRAP_COMMAND:
+            resources = run_bootstrap(example_folder)
+            skip_msg = None
         else:
-            logger.info(
-                f"Command '{command}' completed successfully for {example_folder}"
+            skip_msg, resources = run_project_command(example_folder, command)
+    result = {"skip": skip_msg}
+    store_result(result_key, command, result)
+    return {
+        **result,
+        "cached": False,
+        "resources": resources,
+    }
+
+
+def build_example_graph(
+    nodes: list[tuple[str, str]],
+    jobs: int,
+    use_result_cache: bool = True,
+    download_jobs: int = 1,
+) -> TaskGraph:
+    """
+    Build the graph of commands to run for the selected (example, command) nodes.
+
+    Commands that selected nodes depend on are added even if they weren't selected
+    themselves, so testing an example always bootstraps it first. When every required
+    command of an example passed before with the same example content and toolchain
+    versions, the cached results are used and nothing runs for the example. Like
+    bootstrap_examples.py, at most download_jobs bootstraps install with the same package
+    manager at once, while the other commands only share the overall limit of jobs.
+
+    Args:
+        nodes (list): Selected (example folder, command) pairs
+        jobs (int): Maximum number of commands to run at the same time
+        use_result_cache (bool, optional): Whether to reuse cached passes
+        download_jobs (int, optional): Maximum number of bootstraps installing with the
+            same package manager at the same time
+
+    Returns:
+        TaskGraph: Graph of the commands, not started yet
+    """
+    required = set()
+    pending = list(nodes)
+    while pending:
+        example_folder, command = pending.pop()
+        if (example_folder, command) in required:
+            continue
+        required.add((example_folder, command))
+        pending.extend(
+            (example_folder, dependency)
+            for dependency in COMMAND_DEPENDENCIES.get(command, [])
+        )
+
+    package_managers = {
+        example_folder: get_package_managers(EXAMPLES_DIR / example_folder)
+        for example_folder in dict.fromkeys(example for example, _ in nodes)
+    }
+    graph = TaskGraph(
+        jobs,
+        {
+            manager: download_jobs
+            for managers in package_managers.values()
+            for manager in managers
+        },
+    )
+    for example_folder in dict.fromkeys(example for example, _ in nodes):
+        # Commands are in dependency order, so dependencies are always added first
+        commands = [
+            command
+            for command in [BOOTSTRAP_COMMAND, *COMMANDS]
+            if (example_folder, command) in required
+        ]
+        # Hash the example before any command adds build outputs to it
+        result_key = get_example_result_key(EXAMPLES_DIR / example_folder)
+        cached = {
+            command: get_cached_result(result_key, command)
+            if use_result_cache
+            else None
+            for command in commands
+        }
+        use_cached = all(result is not None for result in cached.values())
+        if use_cached:
+            with log_context(example=example_folder):
+                logger.info(f"Using cached passes for {example_folder}")
+        for command in commands:
+            func: Callable[[], dict[str, Any]]
+            if use_cached:
+                func = functools.partial(dict, cached[command], cached=True)
+            else:
+                func = functools.partial(
+                    run_example_command, example_folder, command, result_key
+                )
+            graph.add(
+                (example_folder, command),
+                func,
+                [(example_folder, d) for d in COMMAND_DEPENDENCIES.get(command, [])],
+                package_managers[example_folder]
+                if command == BOOTSTRAP_COMMAND and not use_cached
+                else [],
             )
+    return graph
+
+
+@pytest.fixture(scope="session")
+def structured_logs() -> Iterator[None]:
+    """
+    Log to a JSON lines file per example and merge them into one report at the end.
+
+    Commands running at the same time each log to their example's file, instead of all
+    appending to one shared file. Run 'python scripts/structured_log.py merge' to filter
+    the records by example, command or level.
+    """
+    for records_path in EXAMPLE_LOGS_DIR.glob(f"*{RECORDS_SUFFIX}"):
+        records_path.unlink()
+    handler = JsonLinesHandler(EXAMPLE_LOGS_DIR)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    try:
+        yield
+    finally:
+        root_logger.removeHandler(handler)
+        handler.close()
+        merge(str(EXAMPLE_LOGS_DIR), output=str(MERGED_LOG_PATH))
+
 
-    logger.info(f"All tests completed successfully for {example_folder}")
+@pytest.fixture(scope="session")
+def example_graph(
+    request: pytest.FixtureRequest, structured_logs: None
+) -> Iterator[TaskGraph]:
+    """Start running the commands of every selected test in dependency order."""
+    nodes = [
+        (
+            str(item.callspec.params["example_folder"]),
+            str(item.callspec.params["command"]),
+        )
+        for item in request.session.items
+        if isinstance(item, pytest.Function)
+        and item.originalname == "test_example_command"
+    ]
+    # Each run starts the logs of the examples it runs afresh
+    for example_folder in {example for example, _ in nodes}:
+        get_example_log_path(example_folder).unlink(missing_ok=True)
+    graph = build_example_graph(
+        nodes,
+        request.config.getoption("--example-jobs"),
+        not request.config.getoption("--no-result-cache"),
+        request.config.getoption("--download-jobs"),
+    )
+    graph.start()
+    yield graph
+    graph.cancel()
+
+
+@pytest.mark.parametrize("command", [BOOTSTRAP_COMMAND, *COMMANDS])
+@pytest.mark.parametrize("example_folder", get_example_folders())
+def test_example_command(
+    example_folder: str,
+    command: str,
+    example_graph: TaskGraph,
+    request: pytest.FixtureRequest,
+) -> None:
+    """Test an algokit command runs successfully in an example folder."""
+    with log_context(example=example_folder, command=command):
+        logger.info(f"Waiting for '{command}' in example folder: {example_folder}")
+    try:
+        result = example_graph.result((example_folder, command))
+    except DependencyFailedError as e:
+        pytest.skip(str(e))
+    if result["cached"]:
+        # Reported as a cached pass by pytest_report_teststatus in conftest.py
+        request.node.user_properties.append(("cached_result", True))
+    else:
+        # CPU time, peak RSS and I/O of the command's process tree, for --junitxml
+        request.node.user_properties.extend(result["resources"].items())
+    if result["skip"]:
+        print(result["skip"])
+        pytest.skip(result["skip"])
 
 
 if __name__ == "__main__":
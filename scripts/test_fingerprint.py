@@ -0,0 +1,92 @@
+import os
+from pathlib import Path
+
+import pytest
+from fingerprint import RENDERING_SCRIPTS, hash_rendering_scripts, hash_tree
+
+
+@pytest.fixture
+def template(tmp_path: Path) -> Path:
+    path = tmp_path / "template"
+    (path / "template_content" / "src").mkdir(parents=True)
+    (path / "copier.yaml").write_text("project_name:\n  type: str\n")
+    (path / "template_content" / "README.md.jinja").write_text("# {{ project_name }}\n")
+    (path / "template_content" / "src" / "main.py").write_text("print('hello')\n")
+    return path
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    path = tmp_path / "repo"
+    (path / "scripts").mkdir(parents=True)
+    for name in [*RENDERING_SCRIPTS, "test_examples.py", "timing_history.py"]:
+        (path / "scripts" / name).write_text(f"# {name}\n")
+    return path
+
+
+def test_template_hash_is_stable(template: Path) -> None:
+    assert hash_tree(template) == hash_tree(template)
+
+
+def test_template_hash_changes_with_a_file_content(template: Path) -> None:
+    before = hash_tree(template)
+
+    (template / "template_content" / "src" / "main.py").write_text("print('bye')\n")
+
+    assert hash_tree(template) != before
+
+
+def test_template_hash_changes_with_a_new_or_renamed_file(template: Path) -> None:
+    before = hash_tree(template)
+    main = template / "template_content" / "src" / "main.py"
+
+    main.rename(main.with_name("app.py"))
+    renamed = hash_tree(template)
+    (template / "template_content" / "src" / "main.py").write_text("print('hello')\n")
+
+    assert len({before, renamed, hash_tree(template)}) == 3
+
+
+def test_template_hash_changes_with_the_executable_bit(template: Path) -> None:
+    before = hash_tree(template)
+
+    os.chmod(template / "template_content" / "src" / "main.py", 0o755)
+
+    assert hash_tree(template) != before
+
+
+def test_template_hash_ignores_caches_and_excluded_names(template: Path) -> None:
+    before = hash_tree(template, exclude=[".copier-answers.yml"])
+
+    (template / "__pycache__").mkdir()
+    (template / "__pycache__" / "main.cpython-312.pyc").write_bytes(b"\0")
+    (template / ".DS_Store").write_bytes(b"\0")
+    (template / ".copier-answers.yml").write_text("project_name: app\n")
+
+    assert hash_tree(template, exclude=[".copier-answers.yml"]) == before
+
+
+def test_scripts_hash_changes_with_a_rendering_script(repo: Path) -> None:
+    before = hash_rendering_scripts(repo)
+
+    (repo / "scripts" / "merge_engine.py").write_text("# changed\n")
+
+    assert hash_rendering_scripts(repo) != before
+
+
+def test_scripts_hash_ignores_the_other_scripts(repo: Path) -> None:
+    before = hash_rendering_scripts(repo)
+
+    (repo / "scripts" / "test_examples.py").write_text("# changed\n")
+    (repo / "scripts" / "timing_history.py").unlink()
+    (repo / "scripts" / "test_fingerprint.py").write_text("# new\n")
+
+    assert hash_rendering_scripts(repo) == before
+
+
+def test_scripts_hash_changes_when_a_rendering_script_is_removed(repo: Path) -> None:
+    before = hash_rendering_scripts(repo)
+
+    (repo / "scripts" / "sync_tree.py").unlink()
+
+    assert hash_rendering_scripts(repo) != before
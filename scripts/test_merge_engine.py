@@ -0,0 +1,280 @@
+import json
+from pathlib import Path
+
+import pytest
+from merge_engine import MergeBatch, run_merges
+
+# Fixtures and expected outputs of the merge scripts before they moved to merge_engine
+SOURCE_PACKAGE_JSON = {
+    "dependencies": {
+        "algosdk": "^3.0.0",
+        "@algorandfoundation/algokit-utils": "^9.0.0",
+    },
+    "devDependencies": {"vitest": "^1.0.0"},
+    "scripts": {"build": "vite build", "generate": "algokit generate"},
+}
+DESTINATION_PACKAGE_JSON = {
+    "name": "app",
+    "version": "1.0.0",
+    "scripts": {"build": "tsc", "lint": "eslint"},
+    "dependencies": {"react": "^18.0.0", "algosdk": "^2.0.0"},
+    "devDependencies": {"typescript": "^5.0.0"},
+}
+SOURCE_PYPROJECT = """\
+[tool.poetry.dependencies]
+algokit-utils = "^4.0.0"
+puyapy = "^4.0.0"
+
+[tool.poetry.group.dev.dependencies]
+pytest = "^8.3.0"
+black = "^24.0.0"
+
+[tool.poetry.group.docs.dependencies]
+sphinx = "^7.0.0"
+"""
+DESTINATION_PYPROJECT = """\
+[tool.poetry]
+name = "contracts"
+package-mode = false
+
+[tool.poetry.dependencies]
+python = "^3.12"
+algokit-utils = "^3.0.0"
+
+[tool.poetry.group.dev.dependencies]
+pytest = "^8.0.0"
+"""
+MERGED_PACKAGE_JSON_WITH_SCRIPTS = """\
+{
+  "name": "app",
+  "version": "1.0.0",
+  "scripts": {
+    "build": "vite build",
+    "lint": "eslint",
+    "generate": "algokit generate"
+  },
+  "dependencies": {
+    "react": "^18.0.0",
+    "algosdk": "^3.0.0",
+    "@algorandfoundation/algokit-utils": "^9.0.0"
+  },
+  "devDependencies": {
+    "typescript": "^5.0.0",
+    "vitest": "^1.0.0"
+  }
+}"""
+MERGED_PACKAGE_JSON_EXISTING_ONLY = """\
+{
+  "name": "app",
+  "version": "1.0.0",
+  "scripts": {
+    "build": "vite build",
+    "lint": "eslint"
+  },
+  "dependencies": {
+    "react": "^18.0.0",
+    "algosdk": "^3.0.0"
+  },
+  "devDependencies": {
+    "typescript": "^5.0.0"
+  }
+}"""
+MERGED_PACKAGE_JSON_DEPENDENCIES = """\
+{
+  "name": "app",
+  "version": "1.0.0",
+  "scripts": {
+    "build": "tsc",
+    "lint": "eslint"
+  },
+  "dependencies": {
+    "react": "^18.0.0",
+    "algosdk": "^3.0.0",
+    "@algorandfoundation/algokit-utils": "^9.0.0"
+  },
+  "devDependencies": {
+    "typescript": "^5.0.0",
+    "vitest": "^1.0.0"
+  }
+}"""
+# New groups are added without their dependencies, as the old scripts did
+MERGED_PYPROJECT = """\
+[tool.poetry]
+name = "contracts"
+package-mode = false
+
+[tool.poetry.dependencies]
+python = "^3.12"
+algokit-utils = "^4.0.0"
+puyapy = "^4.0.0"
+
+[tool.poetry.group.dev.dependencies]
+pytest = "^8.3.0"
+black = "^24.0.0"
+
+[tool.poetry.group.docs.dependencies]
+"""
+MERGED_PYPROJECT_EXISTING_ONLY = """\
+[tool.poetry]
+name = "contracts"
+package-mode = false
+
+[tool.poetry.dependencies]
+python = "^3.12"
+algokit-utils = "^4.0.0"
+
+[tool.poetry.group.dev.dependencies]
+pytest = "^8.3.0"
+"""
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    path = tmp_path / "source"
+    path.mkdir()
+    (path / "package.json").write_text(json.dumps(SOURCE_PACKAGE_JSON, indent=2))
+    (path / "pyproject.toml").write_text(SOURCE_PYPROJECT)
+    return path
+
+
+@pytest.fixture
+def destination(tmp_path: Path) -> Path:
+    path = tmp_path / "destination"
+    path.mkdir()
+    (path / "package.json").write_text(json.dumps(DESTINATION_PACKAGE_JSON, indent=2))
+    (path / "pyproject.toml").write_text(DESTINATION_PYPROJECT)
+    return path
+
+
+def merge(
+    source: Path, destination: Path, mode: str, overwrite_existing_only: bool = False
+) -> list[Path]:
+    batch = MergeBatch()
+    batch.apply(source, destination, mode, overwrite_existing_only)
+    return batch.write()
+
+
+def test_package_json_mode_merges_dependencies_and_scripts_in_place(
+    source: Path, destination: Path
+) -> None:
+    written = merge(source, destination, "package_json")
+
+    assert written == [destination / "package.json"]
+    assert (
+        destination / "package.json"
+    ).read_text() == MERGED_PACKAGE_JSON_WITH_SCRIPTS
+    assert (destination / "pyproject.toml").read_text() == DESTINATION_PYPROJECT
+
+
+def test_package_json_mode_only_overwrites_existing_entries(
+    source: Path, destination: Path
+) -> None:
+    merge(source, destination, "package_json", overwrite_existing_only=True)
+
+    assert (
+        destination / "package.json"
+    ).read_text() == MERGED_PACKAGE_JSON_EXISTING_ONLY
+
+
+def test_dependencies_mode_merges_both_files_but_not_scripts(
+    source: Path, destination: Path
+) -> None:
+    merge(source, destination, "dependencies")
+
+    assert (
+        destination / "package.json"
+    ).read_text() == MERGED_PACKAGE_JSON_DEPENDENCIES
+    assert (destination / "pyproject.toml").read_text() == MERGED_PYPROJECT
+
+
+def test_pyproject_mode_source_versions_win_conflicts(
+    source: Path, destination: Path
+) -> None:
+    merge(source, destination, "pyproject")
+
+    assert (destination / "pyproject.toml").read_text() == MERGED_PYPROJECT
+    assert json.loads((destination / "package.json").read_text()) == (
+        DESTINATION_PACKAGE_JSON
+    )
+
+
+def test_pyproject_mode_only_overwrites_existing_dependencies(
+    source: Path, destination: Path
+) -> None:
+    merge(source, destination, "pyproject", overwrite_existing_only=True)
+
+    assert (destination / "pyproject.toml").read_text() == (
+        MERGED_PYPROJECT_EXISTING_ONLY
+    )
+
+
+def test_missing_destination_files_are_created_from_the_source(
+    source: Path, tmp_path: Path
+) -> None:
+    destination = tmp_path / "new"
+
+    merge(source, destination, "package_json")
+    merge(source, destination, "pyproject")
+
+    assert (destination / "package.json").read_text() == json.dumps(
+        SOURCE_PACKAGE_JSON, indent=2
+    )
+    assert (destination / "pyproject.toml").read_text() == SOURCE_PYPROJECT
+
+
+def test_dependencies_mode_never_creates_a_package_json(
+    source: Path, tmp_path: Path
+) -> None:
+    destination = tmp_path / "new"
+
+    merge(source, destination, "dependencies")
+
+    assert not (destination / "package.json").exists()
+    assert (destination / "pyproject.toml").read_text() == SOURCE_PYPROJECT
+
+
+def test_missing_pyproject_is_skipped_when_only_overwriting_existing_entries(
+    source: Path, tmp_path: Path
+) -> None:
+    # merge_dependencies.py used to write an empty pyproject.toml here
+    destination = tmp_path / "new"
+
+    for mode in ["dependencies", "pyproject"]:
+        assert merge(source, destination, mode, overwrite_existing_only=True) == []
+
+    assert not (destination / "pyproject.toml").exists()
+
+
+def test_batched_merges_match_merging_one_at_a_time(
+    source: Path, destination: Path, tmp_path: Path
+) -> None:
+    sequential = tmp_path / "sequential"
+    sequential.mkdir()
+    for name in ["package.json", "pyproject.toml"]:
+        (sequential / name).write_text((destination / name).read_text())
+    merges = [
+        {"source": str(source), "destination": str(destination), "mode": mode}
+        for mode in ["dependencies", "package_json"]
+    ]
+
+    written = run_merges(merges)
+    for merge_spec in merges:
+        merge(source, sequential, merge_spec["mode"])
+
+    assert sorted(written) == [
+        destination / "package.json",
+        destination / "pyproject.toml",
+    ]
+    for name in ["package.json", "pyproject.toml"]:
+        assert (destination / name).read_text() == (sequential / name).read_text()
+
+
+def test_unchanged_files_are_not_written_again(source: Path, destination: Path) -> None:
+    merge(source, destination, "package_json")
+
+    assert merge(source, destination, "package_json") == []
+
+
+def test_unknown_mode_is_rejected(source: Path, destination: Path) -> None:
+    with pytest.raises(ValueError, match="Unknown merge mode"):
+        MergeBatch().apply(source, destination, "yarn")
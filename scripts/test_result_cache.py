@@ -0,0 +1,89 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+import result_cache
+from create_examples import write_example_manifest
+from fingerprint import CACHE_DIR_ENV_VAR
+from result_cache import get_cached_result, get_example_result_key, store_result
+
+# Toolchain versions the example's results were recorded with
+TOOLCHAIN = {
+    "algokit": "algokit, version 2.6.0",
+    "poetry": "Poetry (version 2.1.1)",
+    "node": "v20.11.0",
+    "puyapy": "puyapy 4.4.0",
+}
+# Result of a passing command, as test_examples.py stores it
+RESULT = {"skip": False, "resources": {"wall": 12.5}}
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(tmp_path / "cache"))
+    monkeypatch.setattr(result_cache, "get_toolchain_versions", lambda: dict(TOOLCHAIN))
+
+
+@pytest.fixture
+def example(tmp_path: Path) -> Path:
+    path = tmp_path / "example"
+    (path / "src").mkdir(parents=True)
+    (path / "pyproject.toml").write_text("[tool.poetry]\n")
+    (path / "src" / "main.py").write_text("print('hello')\n")
+    write_example_manifest(path, {"files": ["pyproject.toml", "src/main.py"]})
+    return path
+
+
+def test_stored_results_are_found_with_the_same_key(example: Path) -> None:
+    key = get_example_result_key(example)
+    store_result(key, "build", RESULT)
+
+    assert get_example_result_key(example) == key
+    assert get_cached_result(key, "build") == RESULT
+    assert get_cached_result(key, "test") is None
+
+
+def test_a_toolchain_upgrade_misses_the_cache(
+    example: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store_result(get_example_result_key(example), "build", RESULT)
+
+    upgraded = {**TOOLCHAIN, "puyapy": "puyapy 4.5.0"}
+    monkeypatch.setattr(result_cache, "get_toolchain_versions", lambda: upgraded)
+
+    assert get_cached_result(get_example_result_key(example), "build") is None
+
+
+def test_a_rendered_file_change_misses_the_cache(example: Path) -> None:
+    store_result(get_example_result_key(example), "build", RESULT)
+
+    (example / "src" / "main.py").write_text("print('bye')\n")
+
+    assert get_cached_result(get_example_result_key(example), "build") is None
+
+
+def test_outputs_of_the_commands_keep_the_key(example: Path) -> None:
+    key = get_example_result_key(example)
+
+    (example / ".venv" / "bin").mkdir(parents=True)
+    (example / ".venv" / "bin" / "python").write_text("")
+    (example / "src" / "__pycache__").mkdir()
+    (example / ".env").write_text("ALGOD_PORT=4001\n")
+
+    assert get_example_result_key(example) == key
+
+
+def test_examples_without_a_file_list_are_keyed_on_tracked_files(
+    example: Path,
+) -> None:
+    write_example_manifest(example, {})
+    subprocess.run(["git", "init", "-q"], cwd=example, check=True)
+    subprocess.run(["git", "add", "pyproject.toml"], cwd=example, check=True)
+    key = get_example_result_key(example)
+
+    (example / "src" / "main.py").write_text("print('untracked')\n")
+    unchanged = get_example_result_key(example)
+    (example / "pyproject.toml").write_text("[tool.poetry]\nname = 'app'\n")
+
+    assert unchanged == key
+    assert get_example_result_key(example) != key
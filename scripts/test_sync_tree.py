@@ -0,0 +1,102 @@
+import os
+from pathlib import Path, PurePosixPath
+
+import pytest
+from sync_tree import DEFAULT_PRESERVE_PATTERNS, is_preserved, sync_tree
+
+
+def write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    path = tmp_path / "source"
+    write(path / "README.md", "# app\n")
+    write(path / "projects" / "app" / "pyproject.toml", "[tool.poetry]\n")
+    write(path / "projects" / "app" / "src" / "main.py", "print('hello')\n")
+    return path
+
+
+@pytest.fixture
+def destination(tmp_path: Path) -> Path:
+    path = tmp_path / "destination"
+    write(path / "README.md", "# old\n")
+    write(path / "projects" / "app" / "pyproject.toml", "[tool.poetry]\n")
+    write(path / "projects" / "app" / "src" / "old.py", "print('old')\n")
+    write(path / "projects" / "app" / "removed" / "module.py", "")
+    write(path / "projects" / "app" / ".venv" / "bin" / "python", "")
+    write(path / "projects" / "app" / ".env", "ALGOD_PORT=4001\n")
+    write(path / "projects" / "web" / "node_modules" / "algosdk" / "index.js", "")
+    write(path / "projects" / "web" / "src" / "contracts" / "HelloClient.ts", "")
+    return path
+
+
+def test_sync_applies_the_file_level_diff(source: Path, destination: Path) -> None:
+    stats = sync_tree(source, destination, DEFAULT_PRESERVE_PATTERNS)
+
+    assert stats == {"added": 1, "updated": 1, "deleted": 2, "unchanged": 1}
+    assert (destination / "README.md").read_text() == "# app\n"
+    assert (destination / "projects" / "app" / "src" / "main.py").exists()
+    assert not (destination / "projects" / "app" / "src" / "old.py").exists()
+    # Directories the templates no longer produce are removed once emptied
+    assert not (destination / "projects" / "app" / "removed").exists()
+
+
+def test_sync_keeps_preserved_paths(source: Path, destination: Path) -> None:
+    sync_tree(source, destination, DEFAULT_PRESERVE_PATTERNS)
+
+    for path in [
+        "projects/app/.venv/bin/python",
+        "projects/app/.env",
+        "projects/web/node_modules/algosdk/index.js",
+        "projects/web/src/contracts/HelloClient.ts",
+    ]:
+        assert (destination / path).exists(), path
+
+
+def test_sync_without_preserve_patterns_deletes_everything_stale(
+    source: Path, destination: Path
+) -> None:
+    sync_tree(source, destination)
+
+    assert not (destination / "projects" / "app" / ".venv").exists()
+    assert not (destination / "projects" / "web").exists()
+
+
+def test_sync_updates_the_mode_of_unchanged_content(
+    source: Path, destination: Path
+) -> None:
+    os.chmod(source / "projects" / "app" / "pyproject.toml", 0o755)
+
+    stats = sync_tree(source, destination)
+
+    assert stats["updated"] == 2
+    assert os.access(destination / "projects" / "app" / "pyproject.toml", os.X_OK)
+
+
+def test_sync_into_a_missing_destination_adds_everything(
+    source: Path, tmp_path: Path
+) -> None:
+    stats = sync_tree(source, tmp_path / "new")
+
+    assert stats == {"added": 3, "updated": 0, "deleted": 0, "unchanged": 0}
+
+
+@pytest.mark.parametrize(
+    ("path", "preserved"),
+    [
+        ("node_modules", True),
+        ("projects/web/node_modules/algosdk/index.js", True),
+        ("projects/app/smart_contracts/artifacts/hello/Hello.arc56.json", True),
+        ("projects/app/.env.localnet", True),
+        ("projects/app/smart_contracts/hello/contract.py", False),
+        ("projects/app/artifacts/contract.py", False),
+        ("projects/node_modules_notes.md", False),
+    ],
+)
+def test_is_preserved_matches_runs_of_path_components(
+    path: str, preserved: bool
+) -> None:
+    assert is_preserved(PurePosixPath(path), DEFAULT_PRESERVE_PATTERNS) is preserved
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import CancelledError
+
+import pytest
+from task_graph import DependencyFailedError, TaskGraph
+
+# Seconds to wait for a task before the test fails instead of hanging
+RESULT_TIMEOUT = 5
+
+
+def record(order: list[str], key: str) -> Callable[[], str]:
+    def run() -> str:
+        order.append(key)
+        return key
+
+    return run
+
+
+def fail() -> None:
+    raise RuntimeError("boom")
+
+
+def test_dependencies_run_before_their_dependents() -> None:
+    order: list[str] = []
+    graph = TaskGraph(jobs=4)
+    graph.add("build", record(order, "build"))
+    graph.add("lint", record(order, "lint"), ["build"])
+    graph.add("test", record(order, "test"), ["build", "lint"])
+    graph.start()
+
+    assert graph.result("test", RESULT_TIMEOUT) == "test"
+    assert order == ["build", "lint", "test"]
+
+
+def test_tasks_with_the_most_dependents_start_first() -> None:
+    order: list[str] = []
+    graph = TaskGraph(jobs=1)
+    graph.add("a", record(order, "a"))
+    graph.add("b", record(order, "b"))
+    graph.add("c", record(order, "c"), ["b"])
+    graph.add("d", record(order, "d"), ["b"])
+    graph.start()
+
+    for key in ["a", "b", "c", "d"]:
+        graph.result(key, RESULT_TIMEOUT)
+    assert order == ["b", "a", "c", "d"]
+
+
+def test_failures_propagate_to_all_dependents() -> None:
+    order: list[str] = []
+    graph = TaskGraph(jobs=2)
+    graph.add("build", fail)
+    graph.add("lint", record(order, "lint"), ["build"])
+    graph.add("test", record(order, "test"), ["lint"])
+    graph.add("other", record(order, "other"))
+    graph.start()
+
+    with pytest.raises(RuntimeError, match="boom"):
+        graph.result("build", RESULT_TIMEOUT)
+    for key in ["lint", "test"]:
+        with pytest.raises(DependencyFailedError):
+            graph.result(key, RESULT_TIMEOUT)
+    assert graph.result("other", RESULT_TIMEOUT) == "other"
+    assert order == ["other"]
+
+
+def test_unknown_dependencies_are_rejected() -> None:
+    graph = TaskGraph()
+
+    with pytest.raises(ValueError, match="unknown tasks"):
+        graph.add("test", fail, ["build"])
+
+
+def test_cancel_lets_running_tasks_finish_and_cancels_the_others() -> None:
+    started = threading.Event()
+    release = threading.Event()
+
+    def block() -> str:
+        started.set()
+        release.wait(RESULT_TIMEOUT)
+        return "done"
+
+    order: list[str] = []
+    graph = TaskGraph(jobs=1)
+    graph.add("running", block)
+    graph.add("pending", record(order, "pending"))
+    graph.add("dependent", record(order, "dependent"), ["running"])
+    graph.start()
+    assert started.wait(RESULT_TIMEOUT)
+
+    graph.cancel()
+    release.set()
+
+    assert graph.result("running", RESULT_TIMEOUT) == "done"
+    for key in ["pending", "dependent"]:
+        with pytest.raises(CancelledError):
+            graph.result(key, RESULT_TIMEOUT)
+    assert order == []
+
+
+def test_no_more_than_jobs_tasks_run_at_once() -> None:
+    lock = threading.Lock()
+    running = 0
+    most_running = 0
+
+    def track() -> None:
+        nonlocal running, most_running
+        with lock:
+            running += 1
+            most_running = max(most_running, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    graph = TaskGraph(jobs=2)
+    for i in range(6):
+        graph.add(i, track)
+    graph.start()
+
+    for i in range(6):
+        graph.result(i, RESULT_TIMEOUT)
+    assert most_running == 2
+
+
+def test_tasks_sharing_a_limited_resource_take_turns() -> None:
+    lock = threading.Lock()
+    running: dict[str, int] = {"npm": 0, "other": 0}
+    most_running: dict[str, int] = {"npm": 0, "other": 0}
+
+    def track(kind: str) -> None:
+        with lock:
+            running[kind] += 1
+            most_running[kind] = max(most_running[kind], running[kind])
+        time.sleep(0.05)
+        with lock:
+            running[kind] -= 1
+
+    graph = TaskGraph(jobs=4, limits={"npm": 1})
+    for i in range(3):
+        graph.add(f"npm-{i}", lambda: track("npm"), resources=["npm"])
+    for i in range(3):
+        graph.add(f"other-{i}", lambda: track("other"))
+    graph.start()
+
+    for i in range(3):
+        graph.result(f"npm-{i}", RESULT_TIMEOUT)
+        graph.result(f"other-{i}", RESULT_TIMEOUT)
+    assert most_running == {"npm": 1, "other": 3}
@@ -0,0 +1,448 @@
+import sqlite3
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+import fire  # type: ignore[import-untyped]
+from fingerprint import REPO_ROOT, get_cache_dir
+from timings import format_table
+
+# A command is flagged when it takes this many times its rolling median
+DEFAULT_SLOWDOWN_FACTOR = 1.5
+# Number of earlier successful runs the rolling median is taken over
+DEFAULT_WINDOW = 10
+# Earlier successful runs needed before a command can be flagged
+MIN_HISTORY = 3
+# Adaptive timeouts are this many times the 99th percentile of recorded durations
+TIMEOUT_SAFETY_FACTOR = 3.0
+# Adaptive timeouts are never shorter than this many seconds
+TIMEOUT_FLOOR = 60.0
+# Number of recent successful runs adaptive timeouts are derived from
+TIMEOUT_WINDOW = 50
+# Runs that spend this share of their wall time on the CPU are reported as CPU bound
+CPU_BOUND_SHARE = 0.5
+# Runs that read and write this many bytes per second are otherwise reported as I/O bound
+IO_BOUND_RATE = 5 * 2**20
+TREND_CHARS = "▁▂▃▄▅▆▇█"
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS command_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    git_rev TEXT,
+    example_id TEXT NOT NULL,
+    command TEXT NOT NULL,
+    wall REAL NOT NULL,
+    exit_code INTEGER,
+    max_rss INTEGER,
+    user_time REAL,
+    system_time REAL,
+    read_bytes INTEGER,
+    write_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS command_runs_by_command
+    ON command_runs (example_id, command, id);
+"""
+# Columns added after the first version of the schema, with their types
+ADDED_COLUMNS = {
+    "user_time": "REAL",
+    "system_time": "REAL",
+    "read_bytes": "INTEGER",
+    "write_bytes": "INTEGER",
+}
+
+
+def get_history_path() -> Path:
+    """Return the SQLite file the timing history is kept in."""
+    return get_cache_dir("timing-history") / "history.sqlite3"
+
+
+def connect(path: Path | None = None) -> sqlite3.Connection:
+    """Open the timing history, creating it if needed."""
+    connection = sqlite3.connect(path or get_history_path(), timeout=30)
+    # Write ahead logging lets concurrent commands record while a report reads
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(command_runs)")}
+    for column, column_type in ADDED_COLUMNS.items():
+        if column not in columns:
+            connection.execute(
+                f"ALTER TABLE command_runs ADD COLUMN {column} {column_type}"
+            )
+    return connection
+
+
+def record_command_run(
+    source: str,
+    example_id: str,
+    command: str,
+    wall: float,
+    exit_code: int | None,
+    max_rss: int | None = None,
+    user_time: float | None = None,
+    system_time: float | None = None,
+    read_bytes: int | None = None,
+    write_bytes: int | None = None,
+) -> float | None:
+    """
+    Append a run of an example command to the timing history.
+
+    Args:
+        source (str): Script that ran the command, such as 'test_examples'
+        example_id (str): Id of the example
+        command (str): Name of the command, such as 'bootstrap' or 'build'
+        wall (float): Wall time in seconds
+        exit_code (int, optional): Exit code, None if the command timed out
+        max_rss (int, optional): Peak RSS of the command and its children in bytes
+        user_time (float, optional): User CPU time of the command and its children
+        system_time (float, optional): System CPU time of the command and its children
+        read_bytes (int, optional): Bytes read by the command and its children
+        write_bytes (int, optional): Bytes written by the command and its children
+
+    Returns:
+        float: The rolling median of the command if this run was slower than
+            DEFAULT_SLOWDOWN_FACTOR times it, otherwise None
+    """
+    with connect() as connection:
+        median = get_rolling_median(connection, example_id, command, DEFAULT_WINDOW)
+        connection.execute(
+            "INSERT INTO command_runs (recorded_at, source, git_rev, example_id, "
+            "command, wall, exit_code, max_rss, user_time, system_time, read_bytes, "
+            "write_bytes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                source,
+                get_git_rev(),
+                example_id,
+                command,
+                wall,
+                exit_code,
+                max_rss,
+                user_time,
+                system_time,
+                read_bytes,
+                write_bytes,
+            ),
+        )
+    connection.close()
+    if median is not None and wall > median * DEFAULT_SLOWDOWN_FACTOR:
+        return median
+    return None
+
+
+def get_rolling_median(
+    connection: sqlite3.Connection,
+    example_id: str,
+    command: str,
+    window: int,
+    before_id: int | None = None,
+) -> float | None:
+    """
+    Return the median wall time of the last successful runs of a command.
+
+    Args:
+        connection (sqlite3.Connection): Timing history
+        example_id (str): Id of the example
+        command (str): Name of the command
+        window (int): Number of runs to take the median over
+        before_id (int, optional): Only consider runs recorded before this one
+
+    Returns:
+        float: Median wall time in seconds, or None with fewer than MIN_HISTORY runs
+    """
+    rows = connection.execute(
+        "SELECT wall FROM command_runs WHERE example_id = ? AND command = ? "
+        "AND exit_code = 0 AND id < ? ORDER BY id DESC LIMIT ?",
+        (example_id, command, before_id or sys.maxsize, window),
+    ).fetchall()
+    if len(rows) < MIN_HISTORY:
+        return None
+    return statistics.median(wall for (wall,) in rows)
+
+
+def get_adaptive_timeout(
+    example_id: str, command: str, default: float, allow_shorter: bool = True
+) -> float:
+    """
+    Derive the timeout of an example command from its recorded durations.
+
+    The timeout is the 99th percentile of the recent successful runs times
+    TIMEOUT_SAFETY_FACTOR, and at least TIMEOUT_FLOOR. Without enough history, or when
+    the last run timed out, the default is used as the timeout can't be trusted yet.
+
+    Args:
+        example_id (str): Id of the example
+        command (str): Name of the command, such as 'bootstrap' or 'build'
+        default (float): Timeout in seconds to fall back to
+        allow_shorter (bool, optional): Whether the timeout can be shorter than the
+            default. Commands whose duration depends on state the history doesn't show,
+            such as a bootstrap with cold caches after warm ones, pass False so the
+            history can only lengthen their timeout. Defaults to True.
+
+    Returns:
+        float: Timeout in seconds
+    """
+    with connect() as connection:
+        rows = connection.execute(
+            "SELECT wall, exit_code FROM command_runs WHERE example_id = ? "
+            "AND command = ? ORDER BY id DESC LIMIT ?",
+            (example_id, command, TIMEOUT_WINDOW),
+        ).fetchall()
+    connection.close()
+    walls = [wall for wall, exit_code in rows if exit_code == 0]
+    last_timed_out = bool(rows) and rows[0][1] is None
+    if len(walls) < MIN_HISTORY:
+        return default
+    p99 = statistics.quantiles(walls, n=100, method="inclusive")[98]
+    timeout = max(p99 * TIMEOUT_SAFETY_FACTOR, TIMEOUT_FLOOR)
+    return max(timeout, default) if last_timed_out or not allow_shorter else timeout
+
+
+def get_example_durations(
+    source: str = "test_examples", window: int = DEFAULT_WINDOW
+) -> dict[str, float]:
+    """
+    Estimate how long each example's commands take from their recorded durations.
+
+    Args:
+        source (str, optional): Script whose runs to use. Defaults to test_examples.
+        window (int, optional): Number of recent successful runs of each command to
+            take the median over
+
+    Returns:
+        dict: Sum of the median wall times of each example's commands, in seconds, for
+            the examples with recorded runs
+    """
+    with connect() as connection:
+        rows = connection.execute(
+            "SELECT example_id, command, wall FROM command_runs WHERE source = ? "
+            "AND exit_code = 0 ORDER BY id DESC",
+            (source,),
+        ).fetchall()
+    connection.close()
+    walls: dict[tuple[str, str], list[float]] = {}
+    for example_id, command, wall in rows:
+        command_walls = walls.setdefault((example_id, command), [])
+        if len(command_walls) < window:
+            command_walls.append(wall)
+    durations: dict[str, float] = {}
+    for (example_id, _), command_walls in walls.items():
+        durations[example_id] = durations.get(example_id, 0.0) + statistics.median(
+            command_walls
+        )
+    return durations
+
+
+@cache
+def get_git_rev() -> str | None:
+    """Return the abbreviated commit the repo is at, so slowdowns can be bisected."""
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        check=False,
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def report(
+    example_id: str | None = None,
+    command: str | None = None,
+    factor: float = DEFAULT_SLOWDOWN_FACTOR,
+    window: int = DEFAULT_WINDOW,
+    runs: int = 12,
+    strict: bool = False,
+) -> None:
+    """
+    Show the timing trend of every example command and flag slowdowns.
+
+    The latest run of each command is compared with the median of the successful runs
+    before it. Commands slower than the median by more than the factor are flagged.
+    The CPU time, I/O and bound of the latest run tell where its time went.
+
+    Args:
+        example_id (str, optional): Only show the commands of this example
+        command (str, optional): Only show this command, such as 'bootstrap'
+        factor (float, optional): Slowdown over the rolling median that gets flagged. Defaults to 1.5.
+        window (int, optional): Number of earlier successful runs in the rolling median. Defaults to 10.
+        runs (int, optional): Number of recent runs shown in the trend. Defaults to 12.
+        strict (bool, optional): Exit with a non-zero status if a command is flagged. Defaults to False.
+    """
+    with connect() as connection:
+        keys = connection.execute(
+            "SELECT DISTINCT example_id, command FROM command_runs "
+            "WHERE (? IS NULL OR example_id = ?) AND (? IS NULL OR command = ?) "
+            "ORDER BY example_id, command",
+            (example_id, example_id, command, command),
+        ).fetchall()
+        rows = [
+            _summarize_command(connection, key_example, key_command, window, runs)
+            for key_example, key_command in keys
+        ]
+    connection.close()
+    if not rows:
+        print(f"No timings recorded in {get_history_path()}")
+        return
+
+    flagged = [
+        row for row in rows if row["median"] and row["latest"] > row["median"] * factor
+    ]
+    print(format_history(rows, factor))
+    if flagged:
+        print(
+            f"\n{len(flagged)} command(s) slower than {factor}x their rolling median:"
+        )
+        for row in flagged:
+            print(
+                f"  {row['example_id']} {row['command']}: {row['latest']:.1f}s "
+                f"vs median {row['median']:.1f}s at {row['git_rev'] or 'unknown'} "
+                f"({row['recorded_at']})"
+            )
+        if strict:
+            sys.exit(1)
+
+
+def format_history(rows: list[dict[str, Any]], factor: float) -> str:
+    """Format the summaries of the example commands as a table."""
+    header = [
+        "Example",
+        "Command",
+        "Runs",
+        "Latest (s)",
+        "Median (s)",
+        "Ratio",
+        "Peak RSS (MiB)",
+        "CPU (s)",
+        "I/O (MiB)",
+        "Bound",
+        "Trend",
+    ]
+    table = []
+    for row in rows:
+        ratio = row["latest"] / row["median"] if row["median"] else None
+        measured = row["user_time"] is not None
+        has_io = row["read_bytes"] is not None
+        table.append(
+            [
+                row["example_id"],
+                row["command"],
+                str(row["count"]),
+                f"{row['latest']:.1f}" + ("" if row["exit_code"] == 0 else " (failed)"),
+                f"{row['median']:.1f}" if row["median"] else "-",
+                f"{ratio:.2f}" + (" !" if ratio > factor else "") if ratio else "-",
+                f"{row['max_rss'] / 2**20:.0f}" if row["max_rss"] else "-",
+                f"{row['user_time'] + row['system_time']:.1f}" if measured else "-",
+                f"{(row['read_bytes'] + row['write_bytes']) / 2**20:.0f}"
+                if has_io
+                else "-",
+                classify_run(
+                    row["latest"],
+                    row["user_time"],
+                    row["system_time"],
+                    row["read_bytes"],
+                    row["write_bytes"],
+                )
+                or "-",
+                _sparkline(row["trend"]),
+            ]
+        )
+    return format_table(header, table, left_columns=(0, 1, 9, 10))
+
+
+def classify_run(
+    wall: float,
+    user_time: float | None,
+    system_time: float | None,
+    read_bytes: int | None,
+    write_bytes: int | None,
+) -> str | None:
+    """
+    Tell what a command run spent its time on.
+
+    Args:
+        wall (float): Wall time in seconds
+        user_time (float, optional): User CPU time in seconds
+        system_time (float, optional): System CPU time in seconds
+        read_bytes (int, optional): Bytes read
+        write_bytes (int, optional): Bytes written
+
+    Returns:
+        str: 'cpu' if the process tree kept at least CPU_BOUND_SHARE of a CPU busy, 'io'
+            if it read and wrote at least IO_BOUND_RATE bytes per second, otherwise
+            'waiting', such as on LocalNet. None if the run's usage wasn't recorded.
+    """
+    if user_time is None or system_time is None or not wall:
+        return None
+    if (user_time + system_time) / wall >= CPU_BOUND_SHARE:
+        return "cpu"
+    if read_bytes is None or write_bytes is None:
+        return None
+    if (read_bytes + write_bytes) / wall >= IO_BOUND_RATE:
+        return "io"
+    return "waiting"
+
+
+def _summarize_command(
+    connection: sqlite3.Connection,
+    example_id: str,
+    command: str,
+    window: int,
+    runs: int,
+) -> dict[str, Any]:
+    recent = connection.execute(
+        "SELECT id, recorded_at, git_rev, wall, exit_code, max_rss, user_time, "
+        "system_time, read_bytes, write_bytes FROM command_runs "
+        "WHERE example_id = ? AND command = ? ORDER BY id DESC LIMIT ?",
+        (example_id, command, runs),
+    ).fetchall()
+    (count,) = connection.execute(
+        "SELECT COUNT(*) FROM command_runs WHERE example_id = ? AND command = ?",
+        (example_id, command),
+    ).fetchone()
+    (
+        latest_id,
+        recorded_at,
+        git_rev,
+        latest,
+        exit_code,
+        max_rss,
+        user_time,
+        system_time,
+        read_bytes,
+        write_bytes,
+    ) = recent[0]
+    return {
+        "example_id": example_id,
+        "command": command,
+        "count": count,
+        "recorded_at": recorded_at,
+        "git_rev": git_rev,
+        "latest": latest,
+        "exit_code": exit_code,
+        "max_rss": max_rss,
+        "user_time": user_time,
+        "system_time": system_time,
+        "read_bytes": read_bytes,
+        "write_bytes": write_bytes,
+        "median": get_rolling_median(
+            connection, example_id, command, window, before_id=latest_id
+        ),
+        "trend": [run[3] for run in reversed(recent)],
+    }
+
+
+def _sparkline(values: list[float]) -> str:
+    low, high = min(values), max(values)
+    if high == low:
+        return TREND_CHARS[0] * len(values)
+    scale = (len(TREND_CHARS) - 1) / (high - low)
+    return "".join(TREND_CHARS[round((value - low) * scale)] for value in values)
+
+
+if __name__ == "__main__":
+    fire.Fire({"report": report})
@@ -0,0 +1,199 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from collections.abc import Container, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes everywhere else
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+@contextmanager
+def measure() -> Iterator[dict[str, float]]:
+    """
+    Measure the wall time, CPU time and peak RSS of a block of code.
+
+    CPU time covers the current process and every child process it waited for during
+    the block. The peak RSS is the largest resident set size reached so far by the
+    process or one of its children, as the kernel doesn't track peaks per interval.
+
+    Yields:
+        dict: Filled with 'wall' and 'cpu' in seconds and 'max_rss' in bytes on exit
+    """
+    usage: dict[str, float] = {}
+    start_wall = time.perf_counter()
+    start_self = resource.getrusage(resource.RUSAGE_SELF)
+    start_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    try:
+        yield usage
+    finally:
+        end_self = resource.getrusage(resource.RUSAGE_SELF)
+        end_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        usage["wall"] = time.perf_counter() - start_wall
+        usage["cpu"] = (
+            _cpu_time(end_self)
+            - _cpu_time(start_self)
+            + _cpu_time(end_children)
+            - _cpu_time(start_children)
+        )
+        usage["max_rss"] = max(end_self.ru_maxrss, end_children.ru_maxrss) * RSS_UNIT
+
+
+def run_measured(args: Any, **kwargs: Any) -> tuple[int, dict[str, float]]:
+    """
+    Run a command and measure its own resource usage.
+
+    The child is reaped with wait4 so its CPU time and peak RSS, including those of its
+    own waited for children such as the command run by a shell, are exact. Linux carries
+    the peak RSS over an exec, so it's never lower than the RSS of this process.
+
+    Args:
+        args: Command to run, as accepted by subprocess.Popen
+        **kwargs: Keyword arguments passed to subprocess.Popen
+
+    Returns:
+        tuple: (returncode, usage) where usage has 'wall' and 'cpu' in seconds and
+            'max_rss' in bytes
+    """
+    start_wall = time.perf_counter()
+    process = subprocess.Popen(args, **kwargs)
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    process.returncode = os.waitstatus_to_exitcode(status)
+    usage = {
+        "wall": time.perf_counter() - start_wall,
+        "cpu": _cpu_time(rusage),
+        "max_rss": rusage.ru_maxrss * RSS_UNIT,
+    }
+    return process.returncode, usage
+
+
+def read_process_io(pid: int) -> dict[str, int] | None:
+    """
+    Return the bytes a process read and wrote, from /proc/<pid>/io.
+
+    The counters cover every read and write call, including those on pipes and
+    sockets, so downloads count too. Once reaped, a child's counters are added to its
+    parent's, so reading them from an exited but not yet reaped process covers its
+    whole process tree.
+
+    Args:
+        pid (int): Process id
+
+    Returns:
+        dict: 'read_bytes' and 'write_bytes', or None where /proc isn't available
+    """
+    try:
+        with open(f"/proc/{pid}/io", "r") as f:
+            counters = dict(line.split(": ") for line in f.read().splitlines())
+    except OSError:
+        return None
+    return {
+        "read_bytes": int(counters["rchar"]),
+        "write_bytes": int(counters["wchar"]),
+    }
+
+
+def write_report(report_path: Path, examples: list[dict[str, Any]]) -> None:
+    """
+    Write the timing report of a run as JSON.
+
+    Args:
+        report_path (Path): Path to write the report to
+        examples (list): Timing records of each example, as built by create_examples.py
+    """
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "wall": sum(example["wall"] for example in examples),
+        "examples": examples,
+    }
+    report_path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def format_summary(examples: list[dict[str, Any]]) -> str:
+    """
+    Format the timing records of a run as a table with one row per template application.
+
+    The peak RSS isn't shown, as it's the peak of the whole worker process so far rather
+    than of each template application.
+
+    Args:
+        examples (list): Timing records of each example, as built by create_examples.py
+
+    Returns:
+        str: The summary table
+    """
+    header = [
+        "Example",
+        "Template",
+        "Wall (s)",
+        "CPU (s)",
+        "Tasks (s)",
+    ]
+    rows = []
+    for example in examples:
+        if example["skipped"]:
+            rows.append([example["example_id"], "(up to date)", "", "", ""])
+        for template in example["templates"]:
+            source = template["source"]
+            if template["cached"]:
+                source += " (cached)"
+            rows.append(
+                [
+                    example["example_id"],
+                    source,
+                    f"{template['wall']:.2f}",
+                    f"{template['cpu']:.2f}",
+                    f"{sum(task['wall'] for task in template['tasks']):.2f}",
+                ]
+            )
+    total_wall = sum(example["wall"] for example in examples)
+    rows.append(["Total", "", f"{total_wall:.2f}", "", ""])
+    return format_table(header, rows, left_columns=(0, 1), total=True)
+
+
+def format_table(
+    header: list[str],
+    rows: list[list[str]],
+    left_columns: Container[int] = (0,),
+    total: bool = False,
+) -> str:
+    """
+    Format rows of cells as a plain text table with a rule under the header.
+
+    Args:
+        header (list): Title of each column
+        rows (list): Cells of each row
+        left_columns (Container, optional): Indexes of the columns aligned left, the
+            others, usually numbers, are aligned right
+        total (bool, optional): Whether the last row is a total, set apart by a rule
+
+    Returns:
+        str: The table
+    """
+    table = [header, *rows]
+    widths = [max(len(row[i]) for row in table) for i in range(len(header))]
+    rule = "  ".join("-" * width for width in widths)
+    lines = []
+    for i, row in enumerate(table):
+        if i == 1 or (total and i == len(rows)):
+            lines.append(rule)
+        cells = [
+            cell.ljust(width) if column in left_columns else cell.rjust(width)
+            for column, (cell, width) in enumerate(zip(row, widths))
+        ]
+        lines.append("  ".join(cells).rstrip())
+    return "\n".join(lines)
+
+
+def _cpu_time(rusage: resource.struct_rusage) -> float:
+    return rusage.ru_utime + rusage.ru_stime
@@ -1,5 +1,111 @@
 import json
+import os
 from pathlib import Path
+from typing import Any
+
+from atomic_write import atomic_write
+
+BACKEND_TEMPLATES_NAME = "contracts"
+FRONTEND_TEMPLATES_NAME = "frontend"
+
+
+class Workspace:
+    """
+    In-memory model of the VS Code workspace file of an example.
+
+    Project folders are recorded and queried in memory while the templates of an example
+    are planned, and the workspace file is only read and written once, when the model is
+    flushed after the templates have been applied.
+    """
+
+    def __init__(self, path: Path, projects_root_path: str = "projects") -> None:
+        """
+        Args:
+            path (Path): Path to the workspace file, which may not exist yet
+            projects_root_path (str, optional): Folder the projects are created in
+        """
+        self.path = Path(path)
+        self.projects_root_path = projects_root_path
+        self.projects: dict[str, str] = {"root": "./"}
+        self.folders: list[str] = []
+        self._data: dict[str, Any] | None = None
+
+    @classmethod
+    def load(cls, path: Path) -> "Workspace":
+        """
+        Load the model of an existing workspace file.
+
+        Args:
+            path (Path): Path to the workspace file
+
+        Returns:
+            Workspace: Model with the projects root path and projects of the file
+        """
+        workspace = cls(path)
+        data = workspace._read()
+        files_exclude = data.get("settings", {}).get("files.exclude", {})
+        # The projects root path is the first excluded path that ends with '/'
+        projects_root_path = next(
+            (path for path in files_exclude if path.endswith("/")), None
+        )
+        if projects_root_path:
+            workspace.projects_root_path = projects_root_path.rstrip("/")
+        for folder in data.get("folders", []):
+            if "path" in folder:
+                workspace.projects[get_project_type(folder["path"])] = folder["path"]
+        return workspace
+
+    def add_project(self, project_type: str, folder_path: str) -> None:
+        """Record a project folder to add to the workspace file on flush."""
+        self.projects[project_type] = folder_path
+        if folder_path not in self.folders:
+            self.folders.append(folder_path)
+
+    def get_project_path(self, project_type: str) -> str | None:
+        """Return the folder of a project type, relative to the workspace file."""
+        return self.projects.get(project_type)
+
+    def flush(self) -> None:
+        """
+        Merge the recorded project folders into the workspace file.
+
+        Folders are deduplicated by their normalized path, keeping the first entry, and
+        the file is replaced with atomic_write.
+        """
+        data = self._read()
+        folders = data.setdefault("folders", [])
+        folders.extend({"path": str(folder)} for folder in self.folders)
+        seen = set()
+        unique_folders = []
+        for folder in folders:
+            key = os.path.normpath(folder["path"]) if "path" in folder else None
+            if key is not None and key in seen:
+                continue
+            seen.add(key)
+            unique_folders.append(folder)
+        data["folders"] = unique_folders
+
+        with atomic_write(self.path) as f:
+            json.dump(data, f, indent=2)
+        self._data = data
+        self.folders = []
+
+    def _read(self) -> dict[str, Any]:
+        if self._data is None:
+            if not self.path.exists():
+                raise FileNotFoundError(f"Workspace file not found: {self.path}")
+            with open(self.path, "r") as f:
+                self._data = json.load(f)
+        return self._data
+
+
+def get_project_type(folder_path: str) -> str:
+    """Return the project type of a workspace folder from its path."""
+    if folder_path.endswith(BACKEND_TEMPLATES_NAME):
+        return BACKEND_TEMPLATES_NAME
+    elif folder_path.endswith(FRONTEND_TEMPLATES_NAME):
+        return FRONTEND_TEMPLATES_NAME
+    return "root"
 
 
 def update_workspace(workspace_path: str, folder_path: str) -> None:
@@ -10,24 +116,9 @@ def update_workspace(workspace_path: str, folder_path: str) -> None:
         workspace_path (str): Absolute path to the workspace file
         destination_path (str): Absolute path to the folder to be added
     """
-    # Convert paths to Path objects and resolve to absolute paths
-    workspace_file = Path(workspace_path).resolve()
-
-    # Verify workspace file exists
-    if not workspace_file.exists():
-        raise FileNotFoundError(f"Workspace file not found: {workspace_file}")
-
-    # Load the workspace file
-    with open(workspace_file, "r") as f:
-        workspace_data = json.load(f)
-
-    # Add folder if it doesn't exist
-    # if not any(folder.get("path") == str(rel_path) for folder in workspace_data["folders"]):
-    workspace_data["folders"].append({"path": str(folder_path)})
-
-    # Write back the updated workspace file
-    with open(workspace_file, "w") as f:
-        json.dump(workspace_data, f, indent=2)
+    workspace = Workspace.load(Path(workspace_path).resolve())
+    workspace.add_project(get_project_type(folder_path), folder_path)
+    workspace.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,225 @@
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import fire  # type: ignore[import-untyped]
+from create_examples import (
+    get_example_fingerprint,
+    load_examples_config,
+    redirect_output,
+    render_example,
+)
+from example_sources import run_git
+from fingerprint import get_cache_dir, hash_data
+
+REPO_ROOT = Path(__file__).parent.parent
+# Memory backed directory to render into, falling back to the default temp directory
+TMPFS_DIR = Path("/dev/shm")
+GIT_MODE_FILE = "100644"
+GIT_MODE_EXECUTABLE = "100755"
+GIT_MODE_SYMLINK = "120000"
+
+
+def get_rendered_manifest(path: Path) -> dict[str, tuple[str, str]]:
+    """
+    Build the manifest of a rendered tree in the same form git stores it.
+
+    Args:
+        path (Path): Root of the rendered tree
+
+    Returns:
+        dict: Relative posix path to (git mode, git blob hash) for every file
+    """
+    manifest = {}
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = Path(root) / name
+            relative_path = file_path.relative_to(path).as_posix()
+            if file_path.is_symlink():
+                mode = GIT_MODE_SYMLINK
+                content = os.fsencode(os.readlink(file_path))
+            else:
+                mode = (
+                    GIT_MODE_EXECUTABLE
+                    if os.access(file_path, os.X_OK)
+                    else GIT_MODE_FILE
+                )
+                content = file_path.read_bytes()
+            manifest[relative_path] = (mode, hash_git_blob(content))
+    return manifest
+
+
+def get_committed_manifest(example_path: str) -> dict[str, tuple[str, str]]:
+    """
+    Read the manifest of an example from the git index, without reading its files.
+
+    Args:
+        example_path (str): Path of the example relative to the repo root
+
+    Returns:
+        dict: Path relative to the example to (git mode, git blob hash) for every file
+    """
+    output = run_git("ls-files", "--stage", "-z", "--", example_path)
+    manifest = {}
+    for entry in output.split("\0"):
+        if not entry:
+            continue
+        info, path = entry.split("\t", 1)
+        mode, blob_hash, _ = info.split(" ")
+        relative_path = Path(path).relative_to(example_path).as_posix()
+        manifest[relative_path] = (mode, blob_hash)
+    return manifest
+
+
+def hash_git_blob(content: bytes) -> str:
+    """Return the object id git gives a blob with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def get_ignored_paths(paths: list[str]) -> set[str]:
+    """Return the paths, relative to the repo root, that git ignores."""
+    if not paths:
+        return set()
+    result = subprocess.run(
+        ["git", "check-ignore", "--stdin", "-z"],
+        check=False,
+        cwd=REPO_ROOT,
+        input="\0".join(paths),
+        capture_output=True,
+        text=True,
+    )
+    # check-ignore exits with 1 when none of the paths are ignored
+    if result.returncode not in (0, 1):
+        raise RuntimeError(f"git check-ignore failed: {result.stderr}")
+    return {path for path in result.stdout.split("\0") if path}
+
+
+def compare_manifests(
+    rendered: dict[str, tuple[str, str]], committed: dict[str, tuple[str, str]]
+) -> dict[str, list[str]]:
+    """
+    Compare the manifest of a render with the committed one.
+
+    Returns:
+        dict: Sorted paths that are 'added' by the render, 'deleted' from it, have
+            'modified' content or only a 'mode' change
+    """
+    differences: dict[str, list[str]] = {
+        "added": [],
+        "deleted": [],
+        "modified": [],
+        "mode": [],
+    }
+    for path in sorted(rendered.keys() | committed.keys()):
+        if path not in committed:
+            differences["added"].append(path)
+        elif path not in rendered:
+            differences["deleted"].append(path)
+        elif rendered[path][1] != committed[path][1]:
+            differences["modified"].append(path)
+        elif rendered[path][0] != committed[path][0]:
+            differences["mode"].append(path)
+    return differences
+
+
+def verify_example(
+    example: dict[str, Any],
+    render_dir: Path,
+    use_cache: bool = True,
+    tree_hashes: dict[str, str] | None = None,
+) -> dict[str, list[str]]:
+    """
+    Render an example outside of examples/ and compare it with the committed example.
+
+    When the same template inputs were already verified against the same committed
+    manifest, the result is taken from .cache/verified-examples without rendering.
+
+    Args:
+        example (dict): Example configuration from examples.yml
+        render_dir (Path): Directory to render the example into
+        use_cache (bool, optional): Whether to use the rendered template and
+            verification caches
+        tree_hashes (dict, optional): Memo of source path to tree hash shared between examples
+
+    Returns:
+        dict: Differences between the render and the committed example
+    """
+    example_path = f"examples/{example['id']}"
+    committed = get_committed_manifest(example_path)
+    verified_key = hash_data(
+        [get_example_fingerprint(example, tree_hashes)["fingerprint"], committed]
+    )
+    verified_marker = get_cache_dir("verified-examples") / verified_key
+    if use_cache and verified_marker.exists():
+        return compare_manifests(committed, committed)
+
+    # Render into a directory named like the example, copier exposes the folder name
+    render_path = render_dir / example["id"]
+    render_example(example, render_path, use_cache)
+
+    rendered = get_rendered_manifest(render_path)
+    ignored = get_ignored_paths([f"{example_path}/{path}" for path in rendered])
+    rendered = {
+        path: entry
+        for path, entry in rendered.items()
+        if f"{example_path}/{path}" not in ignored
+    }
+    differences = compare_manifests(rendered, committed)
+    if not any(differences.values()):
+        verified_marker.touch()
+    return differences
+
+
+def main(example_id: str | None = None, cache: bool = True) -> None:
+    """
+    Verify that the committed examples match what their templates generate.
+
+    Each example is rendered into a memory backed temporary directory and compared with
+    the git index by path, content hash and mode. Nothing under examples/ is written.
+
+    Args:
+        example_id (str, optional): Specific example ID to verify. If None, all examples will be verified.
+        cache (bool, optional): Whether to reuse cached renders of templates and earlier verification results from .cache. Defaults to True.
+    """
+    config = load_examples_config()
+    examples = [
+        ex for ex in config["examples"] if not example_id or ex["id"] == example_id
+    ]
+    if not examples:
+        print(f"No example found with ID: {example_id}")
+        sys.exit(1)
+
+    outdated = []
+    tree_hashes: dict[str, str] = {}
+    temp_root = TMPFS_DIR if os.access(TMPFS_DIR, os.W_OK) else None
+    with tempfile.TemporaryDirectory(dir=temp_root) as render_dir:
+        for example in examples:
+            # Copier's own output isn't useful here, only the comparison is reported
+            with open(os.devnull, "w") as devnull, redirect_output(devnull):
+                differences = verify_example(
+                    example, Path(render_dir), cache, tree_hashes
+                )
+            changed = sum(len(paths) for paths in differences.values())
+            if not changed:
+                print(f"Up to date: {example['id']}")
+                continue
+            outdated.append(example["id"])
+            print(f"Outdated: {example['id']} ({changed} file(s) differ)")
+            for kind, paths in differences.items():
+                for path in paths:
+                    print(f"  {kind:<8} {path}")
+
+    if outdated:
+        print(
+            f"\n{len(outdated)} example(s) don't match their templates: "
+            f"{', '.join(outdated)}. Run 'make create-examples' to update them."
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
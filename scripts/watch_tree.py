@@ -0,0 +1,201 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+# Constants from linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+IGNORED_DIR_NAMES = {".git", "__pycache__", "node_modules", ".venv"}
+
+
+class TreeWatcher:
+    """
+    Watch files and directory trees for changes.
+
+    Changes are reported in debounced batches: a batch is returned once no new change
+    arrived for the debounce interval, so saving many files at once triggers one batch.
+    inotify is used on Linux, and other platforms fall back to polling modification times.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[Path],
+        debounce: float = 0.5,
+        poll_interval: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            paths (Iterable[Path]): Files and directories to watch, recursively
+            debounce (float, optional): Seconds without changes that end a batch
+            poll_interval (float, optional): Seconds between scans when polling
+        """
+        self.paths = [Path(path).absolute() for path in paths]
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._libc = _load_libc()
+        self._fd: int | None = None
+        self._watches: dict[int, Path] = {}
+        self._snapshot: dict[Path, tuple[float, int]] = {}
+
+    def __enter__(self) -> "Self":
+        if self._libc is not None:
+            self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+            if self._fd < 0:
+                self._fd = None
+        if self._fd is not None:
+            for path in self.paths:
+                self._add_watches(path)
+        else:
+            self._snapshot = self._scan()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def wait_for_changes(self) -> set[Path]:
+        """
+        Block until a debounced batch of changes is available.
+
+        Returns:
+            set: Paths that were created, modified, moved or deleted
+        """
+        changed = self._next_changes(timeout=None)
+        while True:
+            more = self._next_changes(timeout=self.debounce)
+            if not more:
+                return changed
+            changed |= more
+
+    def _next_changes(self, timeout: float | None) -> set[Path]:
+        if self._fd is None:
+            return self._poll(timeout)
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        data = os.read(self._fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, so anything under the watched paths may have changed
+                changed.update(self.paths)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            path = directory / name if name else directory
+            if not self._is_watched(path):
+                continue
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # Watch new directories, and report what was created in them before
+                self._add_watches(path)
+                changed.update(p for p in path.rglob("*") if p.is_file())
+        return changed
+
+    def _is_watched(self, path: Path) -> bool:
+        """Check whether a path is under a watched path and not in an ignored directory."""
+        if IGNORED_DIR_NAMES.intersection(path.parts):
+            return False
+        return any(path == p or p in path.parents for p in self.paths)
+
+    def _add_watches(self, path: Path) -> None:
+        assert self._libc is not None
+        if path.is_file():
+            self._add_watch(path.parent)
+            return
+        for root, dirs, _ in os.walk(path):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIR_NAMES]
+            self._add_watch(Path(root))
+
+    def _add_watch(self, directory: Path) -> None:
+        assert self._libc is not None
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = directory
+
+    def _poll(self, timeout: float | None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            interval = self.poll_interval
+            if deadline is not None:
+                interval = min(interval, max(deadline - time.monotonic(), 0))
+            time.sleep(interval)
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def _scan(self) -> dict[Path, tuple[float, int]]:
+        snapshot = {}
+        for path in self.paths:
+            files = [path] if path.is_file() else []
+            if path.is_dir():
+                for root, dirs, names in os.walk(path):
+                    dirs[:] = [d for d in dirs if d not in IGNORED_DIR_NAMES]
+                    files.extend(Path(root) / name for name in names)
+            for file in files:
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[file] = (stat.st_mtime, stat.st_mode)
+        return snapshot
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") else None